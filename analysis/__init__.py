@@ -1,7 +1,7 @@
 """Analysis and visualization module for simulation results."""
 
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Any
 
 # Ensure the analysis directory exists
 Path(__file__).parent.mkdir(exist_ok=True)
@@ -9,8 +9,25 @@ Path(__file__).parent.mkdir(exist_ok=True)
 __all__ = [
     "plot_simulation_results", 
     "analyze_results",
-    "save_analysis"
+    "analyze_runs",
+    "analyze_store",
+    "save_analysis",
+    "run_sensitivity"
 ]
 
-from .visualization import plot_simulation_results
-from .analysis import analyze_results, save_analysis
+# Submodules pull in pandas and plotly, so they are only imported on first use
+_EXPORTS = {
+    "plot_simulation_results": "visualization",
+    "analyze_results": "analysis",
+    "analyze_runs": "analysis",
+    "analyze_store": "analysis",
+    "save_analysis": "analysis",
+    "run_sensitivity": "sensitivity",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        from importlib import import_module
+        return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,6 +5,9 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from models.base_model import Trajectory
+from simulation.results_store import COMPONENTS, ResultRecords, ResultsStore
+
 
 def analyze_results(results: Dict[str, Any]) -> Dict[str, Any]:
     """Analyze simulation results and generate key metrics.
@@ -67,10 +70,9 @@ def _analyze_production_tech(tech_data: Dict[str, Any]) -> Dict[str, Any]:
         improvements = []
         for tech in tech_data["technology_evolution"]:
             if isinstance(tech, dict) and "trajectory_or_curve" in tech:
-                trajectory = tech["trajectory_or_curve"].get("trajectory", [])
-                if trajectory and len(trajectory) > 1:
-                    start = trajectory[0][1]
-                    end = trajectory[-1][1]
+                trajectory = Trajectory.coerce(tech["trajectory_or_curve"].get("trajectory"))
+                if trajectory is not None and len(trajectory) > 1:
+                    start, end = trajectory.values[[0, -1]].tolist()
                     improvement = ((end - start) / abs(start)) * 100 if start != 0 else 0
                     improvements.append({
                         "technology": tech.get("technology_name", "Unknown"),
@@ -93,10 +95,9 @@ def _analyze_client_needs(client_data: Dict[str, Any]) -> Dict[str, Any]:
         priorities = []
         for priority in client_data["priority_evolution"]:
             if isinstance(priority, dict) and "evolution_trend" in priority:
-                trajectory = priority["evolution_trend"].get("trajectory", [])
-                if trajectory and len(trajectory) > 1:
-                    start = trajectory[0][1]
-                    end = trajectory[-1][1]
+                trajectory = Trajectory.coerce(priority["evolution_trend"].get("trajectory"))
+                if trajectory is not None and len(trajectory) > 1:
+                    start, end = trajectory.values[[0, -1]].tolist()
                     change = end - start
                     priorities.append({
                         "priority_area": priority.get("priority_area", "Unknown"),
@@ -148,13 +149,51 @@ def _calculate_performance_metrics(analysis: Dict[str, Any]) -> Dict[str, float]
     return metrics
 
 
-def save_analysis(analysis: Dict[str, Any], output_dir: str) -> None:
+def analysis_to_records(analysis: Dict[str, Any]) -> ResultRecords:
+    """Flatten analysis results into long-format rows for a results store."""
+    records = ResultRecords()
+    records.add_mapping("performance", "performance_metrics", analysis.get("performance_metrics", {}))
+    
+    for component in ["sustainability", "production_tech", "client_needs"]:
+        component_analysis = analysis.get(component, {})
+        records.add_mapping(component, "metrics", component_analysis.get("metrics", {}))
+        
+        for rate in component_analysis.get("adoption_rates", []):
+            records.add(component, "average_adoption_rate", rate["fertilizer_type"],
+                        rate["average_adoption_rate"])
+        for improvement in component_analysis.get("technology_improvements", []):
+            records.add(component, "improvement_percent", improvement["technology"],
+                        improvement["improvement_percent"])
+        for change in component_analysis.get("priority_changes", []):
+            for field in ["start_value", "end_value", "change"]:
+                records.add(component, field, change["priority_area"], change[field])
+    
+    return records
+
+
+def save_analysis(
+    analysis: Dict[str, Any],
+    output_dir: Optional[str] = None,
+    store: Optional[ResultsStore] = None,
+    scenario: str = "default",
+    run_id: Optional[str] = None
+) -> None:
     """Save analysis results to files.
     
     Args:
         analysis: Dictionary containing analysis results
-        output_dir: Directory to save the analysis results
+        output_dir: Directory to save the analysis results as CSV files
+        store: Results store receiving the analysis in its ``analysis``
+            table instead of CSV files
+        scenario: Scenario name used as the store partition
+        run_id: Run identifier of the analyzed results in the store
     """
+    if store is not None:
+        store.append_records("analysis", analysis_to_records(analysis), scenario, run_id)
+        return
+    if output_dir is None:
+        raise ValueError("Either output_dir or store must be given")
+    
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
@@ -188,3 +227,144 @@ def save_analysis(analysis: Dict[str, Any], output_dir: str) -> None:
                 pd.DataFrame(analysis[component]["priority_changes"]).to_csv(
                     component_path / "priority_changes.csv", index=False
                 )
+
+
+def _run_keys(table: pd.DataFrame) -> List[str]:
+    """Return the columns identifying a run in a long-format table."""
+    return [key for key in ("scenario", "run_id") if key in table.columns]
+
+
+def _endpoints(rows: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """First and last value of every (run, entity) time series with two or more points."""
+    rows = rows.sort_values(keys + ["entity", "year"], kind="stable")
+    grouped = rows.groupby(keys + ["entity"], observed=True, sort=False)["value"]
+    endpoints = grouped.agg(["first", "last", "size"]).reset_index()
+    endpoints = endpoints[endpoints["size"] > 1].drop(columns="size")
+    return endpoints.rename(columns={"first": "start_value", "last": "end_value"})
+
+
+def analyze_runs(table: Any) -> Dict[str, pd.DataFrame]:
+    """Analyze many stored runs at once.
+    
+    Computes the metrics of ``analyze_results`` for every run of a
+    long-format results table with grouped, vectorized operations.
+    
+    Args:
+        table: Long-format rows as read by ``ResultsStore.read`` (a pandas
+            DataFrame or an Arrow table) holding any number of runs
+            
+    Returns:
+        Tidy DataFrames keyed by ``scenario`` (when present) and ``run_id``:
+        ``adoption_rates``, ``technology_improvements``, ``priority_changes``,
+        ``metrics`` (one row per component metric) and
+        ``performance_metrics`` (one row per run)
+    """
+    if not isinstance(table, pd.DataFrame):
+        table = table.to_pandas()
+    keys = _run_keys(table)
+    series = table["series"]
+    
+    # Average of the minimum and maximum market growth of each fertilizer type
+    bounds = table[series.isin(["fertilizer_adoption_min_percentage", "fertilizer_adoption_max_percentage"])]
+    adoption_rates = (
+        bounds.groupby(keys + ["entity"], observed=True, sort=False)["value"].mean()
+        .reset_index()
+        .rename(columns={"entity": "fertilizer_type", "value": "average_adoption_rate"})
+    )
+    
+    # Relative change of each technology trend between its first and last points
+    improvements = _endpoints(
+        table[(table["component"] == "production_tech") & (series == "technology_evolution")], keys
+    )
+    start = improvements["start_value"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        improvement = (improvements["end_value"].to_numpy() - start) / np.abs(start) * 100
+    technology_improvements = improvements[keys + ["entity"]].rename(columns={"entity": "technology"})
+    technology_improvements["improvement_percent"] = np.where(start != 0, improvement, 0.0)
+    
+    # Absolute change of each client priority trend
+    priority_changes = _endpoints(
+        table[(table["component"] == "client_needs") & (series == "priority_evolution")], keys
+    ).rename(columns={"entity": "priority_area"})
+    priority_changes["change"] = priority_changes["end_value"] - priority_changes["start_value"]
+    
+    component_metrics = (series == "metrics") & table["component"].isin(list(COMPONENTS))
+    metrics = (
+        table.loc[component_metrics, keys + ["component", "entity", "value"]]
+        .rename(columns={"entity": "metric"})
+        .reset_index(drop=True)
+    )
+    
+    performance = _batch_performance_metrics(
+        table[keys].drop_duplicates(), keys, metrics, technology_improvements, priority_changes
+    )
+    return {
+        "adoption_rates": adoption_rates,
+        "technology_improvements": technology_improvements.reset_index(drop=True),
+        "priority_changes": priority_changes.reset_index(drop=True),
+        "metrics": metrics,
+        "performance_metrics": performance,
+    }
+
+
+def _batch_performance_metrics(
+    runs: pd.DataFrame,
+    keys: List[str],
+    metrics: pd.DataFrame,
+    technology_improvements: pd.DataFrame,
+    priority_changes: pd.DataFrame
+) -> pd.DataFrame:
+    """Per-run counterpart of ``_calculate_performance_metrics``."""
+    def per_run(frame: pd.DataFrame, column: str, name: str) -> pd.DataFrame:
+        return frame.groupby(keys, observed=True, sort=False)[column].mean().rename(name).reset_index()
+    
+    sustainable_share = metrics[
+        (metrics["component"] == "sustainability") & (metrics["metric"] == "sustainable_share")
+    ]
+    performance = runs.reset_index(drop=True)
+    for frame, column, name in (
+        (sustainable_share, "value", "sustainability_score"),
+        (technology_improvements, "improvement_percent", "technology_advancement"),
+        (priority_changes, "end_value", "client_satisfaction"),
+    ):
+        performance = performance.merge(per_run(frame, column, name), on=keys, how="left")
+    
+    performance = performance.fillna({
+        "sustainability_score": 0.0, "technology_advancement": 0.0, "client_satisfaction": 0.0
+    })
+    performance["sustainability_score"] *= 100
+    performance["overall_score"] = (
+        performance["sustainability_score"] * 0.4
+        + performance["technology_advancement"] * 0.3
+        + performance["client_satisfaction"] * 10 * 0.3
+    ).clip(0, 100)
+    return performance
+
+
+def analyze_store(
+    store: Optional[ResultsStore] = None,
+    filters: Optional[List[Tuple[str, str, Any]]] = None
+) -> Dict[str, pd.DataFrame]:
+    """Analyze every run of a results store matching the filters.
+    
+    Only the rows ``analyze_runs`` uses are read from the ``runs`` table.
+    
+    Args:
+        store: Results store (defaults to ``settings.RESULTS_STORE_DIR``)
+        filters: Extra predicates pushed down to the Parquet reader, e.g.
+            ``[("scenario", "=", "demo")]``
+            
+    Returns:
+        Tidy DataFrames as returned by ``analyze_runs``
+    """
+    store = store or ResultsStore()
+    series = [
+        "metrics", "fertilizer_adoption_min_percentage", "fertilizer_adoption_max_percentage",
+        "technology_evolution", "priority_evolution",
+    ]
+    table = store.read(
+        "runs",
+        columns=["scenario", "run_id", "component", "series", "entity", "year", "value"],
+        filters=[("series", "in", series)] + list(filters or [])
+    )
+    return analyze_runs(table)
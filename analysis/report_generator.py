@@ -1,55 +1,329 @@
 """Generate comprehensive HTML reports for simulation results."""
 
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
-import json
-import pandas as pd
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+import html
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import plotly.io as pio
 from datetime import datetime
-import webbrowser
+
+# Figures with more points than this are downsampled in the page and their
+# full data is written to a side file loaded on demand
+MAX_INLINE_POINTS = 20_000
+
+# Points kept per trace of a downsampled figure
+MAX_POINTS_PER_TRACE = 2_000
+
+PLOTLY_CDN_URL = "https://cdn.plot.ly/plotly-{version}.min.js"
+
+REPORT_CSS = """
+        body {
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 20px;
+            line-height: 1.6;
+        }
+        .header {
+            background-color: #2c3e50;
+            color: white;
+            padding: 20px;
+            margin-bottom: 20px;
+            border-radius: 5px;
+        }
+        .section {
+            margin-bottom: 40px;
+            padding: 20px;
+            background-color: #fff;
+            border-radius: 5px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .plot {
+            margin: 20px 0;
+            border: 1px solid #eee;
+            border-radius: 5px;
+            padding: 15px;
+        }
+        .metric-card {
+            border-left: 4px solid #3498db;
+            background-color: #f8f9fa;
+            border-radius: 4px;
+            padding: 15px;
+            margin: 10px 0;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+        }
+        .metric-card h3 {
+            margin-top: 0;
+            color: #2c3e50;
+        }
+        .metrics-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(250px, 1fr));
+            gap: 15px;
+            margin: 20px 0;
+        }
+        .note {
+            color: #7f8c8d;
+            font-size: 0.9em;
+        }
+        h1, h2 {
+            color: #2c3e50;
+        }
+        h2 {
+            border-bottom: 2px solid #eee;
+            padding-bottom: 10px;
+            margin-top: 30px;
+        }
+"""
+
+# Loads the full-resolution data of a downsampled figure from its side file.
+# A <script> tag is used instead of fetch() so reports also work from file://
+REPORT_JS = """
+        function loadFullData(id, src) {
+            window.reportData = window.reportData || {};
+            var script = document.createElement("script");
+            script.src = src;
+            script.onload = function () {
+                var figure = window.reportData[id];
+                Plotly.react(id, figure.data, figure.layout);
+            };
+            document.head.appendChild(script);
+        }
+"""
+
+
+def count_points(figure: go.Figure) -> int:
+    """Return the number of data points of all traces of a figure."""
+    return sum(len(trace.y) if trace.y is not None else 0 for trace in figure.data)
+
+
+def downsample_figure(figure: go.Figure, max_points: int = MAX_POINTS_PER_TRACE) -> go.Figure:
+    """Thin every long trace of a figure to about ``max_points`` evenly spaced points.
+    
+    The first and last points of each trace are always kept.
+    
+    Args:
+        figure: Figure to downsample (left unchanged)
+        max_points: Points kept per trace
+    
+    Returns:
+        Downsampled copy of the figure
+    """
+    figure = go.Figure(figure)
+    for trace in figure.data:
+        if trace.y is None or len(trace.y) <= max_points:
+            continue
+        keep = np.unique(np.linspace(0, len(trace.y) - 1, max_points).round().astype(int))
+        trace.y = np.asarray(trace.y)[keep]
+        if trace.x is not None:
+            trace.x = np.asarray(trace.x)[keep]
+    return figure
+
+
+class ReportWriter:
+    """Streams an HTML report to disk one section at a time.
+    
+    Only the section being written is held in memory. plotly.js is included
+    once in the page head, and each figure is rendered by a small script
+    placed right after its container. Figures with more than
+    ``max_inline_points`` points are downsampled in the page, and their full
+    data goes to a side file under ``<report>_data/`` that the page loads on
+    request.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        include_plotlyjs: str = "cdn",
+        max_inline_points: int = MAX_INLINE_POINTS,
+        max_points_per_trace: int = MAX_POINTS_PER_TRACE
+    ) -> None:
+        """Initialize the writer.
+        
+        Args:
+            path: Report file to write
+            include_plotlyjs: ``"cdn"`` to reference plotly.js or ``"inline"``
+                to embed it (once) for offline viewing
+            max_inline_points: Points above which a figure is downsampled
+            max_points_per_trace: Points kept per trace when downsampling
+        """
+        self.path = Path(path)
+        self.data_dir = self.path.with_name(f"{self.path.stem}_data")
+        self.include_plotlyjs = include_plotlyjs
+        self.max_inline_points = max_inline_points
+        self.max_points_per_trace = max_points_per_trace
+        self.n_figures = 0
+        self._file: Optional[TextIO] = None
+    
+    def __enter__(self) -> "ReportWriter":
+        self.open()
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def open(self, title: str = "Fertilizer Industry Simulation Report") -> None:
+        """Open the file and write the page head."""
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(
+            "<!DOCTYPE html>\n<html>\n<head>\n"
+            f"    <meta charset=\"utf-8\">\n    <title>{html.escape(title)}</title>\n"
+        )
+        if self.include_plotlyjs == "inline":
+            from plotly.offline import get_plotlyjs
+            self._file.write("    <script>")
+            self._file.write(get_plotlyjs())
+            self._file.write("</script>\n")
+        else:
+            # Match the plotly.js version the figures were built against
+            from plotly.offline import get_plotlyjs_version
+            url = PLOTLY_CDN_URL.format(version=get_plotlyjs_version())
+            self._file.write(f"    <script src=\"{url}\"></script>\n")
+        self._file.write(
+            f"    <script>{REPORT_JS}    </script>\n    <style>{REPORT_CSS}    </style>\n"
+            "</head>\n<body>\n"
+            "    <div class=\"header\">\n"
+            f"        <h1>{html.escape(title)}</h1>\n"
+            f"        <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>\n"
+            "    </div>\n"
+        )
+    
+    def write_metrics(self, title: str, metrics: Dict[str, Any]) -> None:
+        """Write a section of metric cards.
+        
+        Args:
+            title: Section title
+            metrics: Metric values keyed by name
+        """
+        self._file.write(f"    <div class=\"section\">\n        <h2>{html.escape(title)}</h2>\n")
+        self._file.write("        <div class=\"metrics-grid\">\n")
+        if not metrics:
+            self._file.write("            <p>No summary metrics available</p>\n")
+        for metric, value in metrics.items():
+            display = f"{value:,.2f}" if isinstance(value, (int, float)) else html.escape(str(value))
+            self._file.write(
+                f"            <div class=\"metric-card\">"
+                f"<h3>{html.escape(metric.replace('_', ' ').title())}</h3>"
+                f"<p>{display}</p></div>\n"
+            )
+        self._file.write("        </div>\n    </div>\n")
+    
+    def write_figure(self, name: str, figure: go.Figure) -> None:
+        """Write one figure section.
+        
+        Args:
+            name: Section name
+            figure: Figure to render
+        """
+        plot_id = f"plot-{self.n_figures}"
+        self.n_figures += 1
+        self._file.write(
+            f"    <div class=\"section\">\n"
+            f"        <h2>{html.escape(name.replace('_', ' ').title())}</h2>\n"
+            f"        <div id=\"{plot_id}\" class=\"plot\"></div>\n"
+        )
+        
+        n_points = count_points(figure)
+        inline = figure
+        if n_points > self.max_inline_points:
+            data_file = self._write_data_file(plot_id, figure)
+            inline = downsample_figure(figure, self.max_points_per_trace)
+            self._file.write(
+                f"        <p class=\"note\">Showing a downsampled view of {n_points:,} points. "
+                f"<a href=\"#\" onclick=\"loadFullData('{plot_id}', '{data_file}'); return false;\">"
+                f"Load full resolution</a></p>\n"
+            )
+        
+        self._file.write("        <script>\n            (function () {\n                var figure = ")
+        self._file.write(pio.to_json(inline, validate=False))
+        self._file.write(
+            f";\n                Plotly.newPlot(\"{plot_id}\", figure.data, figure.layout);\n"
+            "            })();\n        </script>\n    </div>\n"
+        )
+    
+    def _write_data_file(self, plot_id: str, figure: go.Figure) -> str:
+        """Write the full data of a figure to its side file.
+        
+        Returns:
+            Path of the side file relative to the report
+        """
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        data_path = self.data_dir / f"{plot_id}.js"
+        with open(data_path, "w", encoding="utf-8") as file:
+            file.write(f"window.reportData[\"{plot_id}\"] = ")
+            file.write(pio.to_json(figure, validate=False))
+            file.write(";\n")
+        return f"{self.data_dir.name}/{data_path.name}"
+    
+    def write_note(self, text: str) -> None:
+        """Write a paragraph of text."""
+        self._file.write(f"    <p class=\"note\">{html.escape(text)}</p>\n")
+    
+    def close(self) -> None:
+        """Write the page footer and close the file."""
+        if self._file is None:
+            return
+        if not self.n_figures:
+            self._file.write("    <p>No visualizations available</p>\n")
+        self._file.write("</body>\n</html>\n")
+        self._file.close()
+        self._file = None
+
 
 class ReportGenerator:
     """Generate comprehensive HTML reports for simulation results."""
     
-    def __init__(self, results: Dict[str, Any], output_dir: Path) -> None:
-        """Initialize with simulation results and output directory."""
+    def __init__(self, results: Dict[str, Any], output_dir: Path, include_plotlyjs: str = "cdn") -> None:
+        """Initialize with simulation results and output directory.
+        
+        Args:
+            results: Simulation results
+            output_dir: Directory of the report
+            include_plotlyjs: ``"cdn"`` or ``"inline"``
+        """
         self.results = results
-        self.output_dir = output_dir
+        self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.figures: List[Tuple[str, go.Figure]] = []
+        self.include_plotlyjs = include_plotlyjs
     
     def generate_report(self) -> Path:
         """Generate and save the HTML report.
         
+        Figures are built and written one at a time, so the report is never
+        held in memory as a whole.
+        
         Returns:
             Path to the generated report file
         """
-        # Create all visualizations
-        self._create_summary_visualizations()
-        self._create_sustainability_visualizations()
-        self._create_production_tech_visualizations()
-        self._create_client_needs_visualizations()
-        
-        # Generate HTML content
-        html_content = self._generate_html()
-        
-        # Save the report
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_path = self.output_dir / f"simulation_report_{timestamp}.html"
         
-        with open(report_path, 'w', encoding='utf-8') as file:
-            file.write(html_content)
-            
+        with ReportWriter(report_path, include_plotlyjs=self.include_plotlyjs) as writer:
+            writer.write_metrics("Summary Metrics", self._scalar_summary_metrics())
+            for name, figure in self.iter_figures():
+                writer.write_figure(name, figure)
+        
         return report_path
     
-    def _create_summary_visualizations(self) -> None:
+    def iter_figures(self) -> Iterator[Tuple[str, go.Figure]]:
+        """Yield the report figures one at a time."""
+        yield from self._create_summary_visualizations()
+        yield from self._create_sustainability_visualizations()
+        yield from self._create_timeseries_visualizations()
+        yield from self._create_monte_carlo_visualizations()
+    
+    def _scalar_summary_metrics(self) -> Dict[str, float]:
+        return {
+            name: value for name, value in self.results.get("summary_metrics", {}).items()
+            if isinstance(value, (int, float))
+        }
+    
+    def _create_summary_visualizations(self) -> Iterator[Tuple[str, go.Figure]]:
         """Create summary visualizations."""
-        if "summary_metrics" not in self.results:
+        metrics = self._scalar_summary_metrics()
+        if not metrics:
             return
-            
-        metrics = self.results["summary_metrics"]
         
         # Create a bar chart of key metrics
         figure = px.bar(
@@ -59,186 +333,89 @@ class ReportGenerator:
             labels={"x": "Metric", "y": "Value"}
         )
         figure.update_layout(showlegend=False)
-        self.figures.append(("summary_metrics", figure))
+        yield "summary_metrics", figure
     
-    def _create_sustainability_visualizations(self) -> None:
+    def _years(self) -> Optional[np.ndarray]:
+        period = self.results.get("metadata", {}).get("simulation_period")
+        if not period:
+            return None
+        return np.arange(period["start_year"], period["end_year"] + 1)
+    
+    def _create_sustainability_visualizations(self) -> Iterator[Tuple[str, go.Figure]]:
         """Create sustainability-related visualizations."""
-        if "sustainability" not in self.results:
+        curves = self.results.get("sustainability", {}).get("adoption_curves")
+        years = self._years()
+        if not curves or years is None:
             return
-            
-        sustainability = self.results["sustainability"]
         
-        # Example: Plot adoption curves
-        if "fertilizer_adoption_curves" in sustainability:
-            data_frame = pd.DataFrame(sustainability["fertilizer_adoption_curves"])
-            figure = px.line(
-                data_frame, 
-                x="year", 
-                y="adoption_rate", 
-                color="fertilizer_type",
-                title="Fertilizer Adoption Over Time"
-            )
-            self.figures.append(("fertilizer_adoption", figure))
-    
-    def _create_production_tech_visualizations(self) -> None:
-        """Create production technology visualizations."""
-        # Implementation for production technology visualizations
-        pass
-    
-    def _create_client_needs_visualizations(self) -> None:
-        """Create client needs visualizations."""
-        # Implementation for client needs visualizations
-        pass
-    
-    def _generate_html(self) -> str:
-        """Generate the complete HTML report.
-        
-        Returns:
-            str: The complete HTML content
-        """
-        # HTML header with embedded CSS
-        html_template = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Fertilizer Industry Simulation Report</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        body {{ 
-            font-family: Arial, sans-serif; 
-            margin: 0; 
-            padding: 20px; 
-            line-height: 1.6;
-        }}
-        .header {{ 
-            background-color: #2c3e50; 
-            color: white; 
-            padding: 20px; 
-            margin-bottom: 20px; 
-            border-radius: 5px;
-        }}
-        .section {{ 
-            margin-bottom: 40px; 
-            padding: 20px;
-            background-color: #fff;
-            border-radius: 5px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .plot {{ 
-            margin: 20px 0; 
-            border: 1px solid #eee;
-            border-radius: 5px;
-            padding: 15px;
-        }}
-        .metric-card {{
-            border-left: 4px solid #3498db;
-            background-color: #f8f9fa;
-            border-radius: 4px;
-            padding: 15px;
-            margin: 10px 0;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-        }}
-        .metric-card h3 {{
-            margin-top: 0;
-            color: #2c3e50;
-        }}
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(250px, 1fr));
-            gap: 15px;
-            margin: 20px 0;
-        }}
-        h1, h2 {{
-            color: #2c3e50;
-        }}
-        h2 {{
-            border-bottom: 2px solid #eee;
-            padding-bottom: 10px;
-            margin-top: 30px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>Fertilizer Industry Simulation Report</h1>
-        <p>Generated on {date}</p>
-    </div>
-    
-    <div class="section">
-        <h2>Summary Metrics</h2>
-        <div class="metrics-grid">
-            {summary_metrics}
-        </div>
-    </div>
-    
-    {visualizations}
-    
-    <script>
-        // Plotly figures will be rendered here
-        {plotly_js}
-    </script>
-</body>
-</html>
-""".format(
-            date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            summary_metrics=self._generate_summary_metrics(),
-            visualizations=self._generate_visualizations(),
-            plotly_js=self._generate_plotly_js()
+        figure = go.Figure([
+            go.Scatter(x=years, y=values, mode="lines", name=name)
+            for name, values in curves.items()
+        ])
+        figure.update_layout(
+            title="Fertilizer and Technology Adoption Over Time",
+            xaxis_title="Year", yaxis_title="Adoption (%)"
         )
+        yield "fertilizer_adoption", figure
+    
+    def _create_timeseries_visualizations(self) -> Iterator[Tuple[str, go.Figure]]:
+        """Create one figure per group of the integrated state."""
+        timeseries = self.results.get("timeseries")
+        if not timeseries:
+            return
         
-        return html_template
-        
-    def _generate_summary_metrics(self) -> str:
-        """Generate HTML for summary metrics."""
-        summary_metrics = ""
-        if "summary_metrics" in self.results:
-            for metric, value in self.results["summary_metrics"].items():
-                summary_metrics += (
-                    f'<div class="metric-card">'
-                    f'<h3>{metric.replace("_", " ").title()}</h3>'
-                    f'<p>{value}</p>'
-                    f'</div>'
-                )
-        return summary_metrics or "<p>No summary metrics available</p>"
-        
-    def _generate_visualizations(self) -> str:
-        """Generate HTML for visualizations."""
-        plot_divs = []
-        for i, (name, _) in enumerate(self.figures):
-            plot_divs.append(
-                f'<div class="section">'
-                f'<h2>{name.replace("_", " ").title()}</h2>'
-                f'<div id="plot-{i}" class="plot"></div>'
-                f'</div>'
-            )
-        return "\n".join(plot_divs) or "<p>No visualizations available</p>"
+        titles = {
+            "adoption": "Adoption Shares (%)",
+            "capacity": "Production Capacity Index",
+            "emissions": "Emissions Index (100 = no reduction)",
+        }
+        for group, title in titles.items():
+            series = timeseries.get(group)
+            if not series:
+                continue
+            figure = go.Figure([
+                go.Scatter(x=timeseries["time"], y=values, mode="lines", name=name)
+                for name, values in series.items()
+            ])
+            figure.update_layout(title=title, xaxis_title="Year")
+            yield f"{group}_state", figure
+    
+    def _create_monte_carlo_visualizations(self) -> Iterator[Tuple[str, go.Figure]]:
+        """Create percentile band charts of the Monte Carlo summary metrics."""
+        monte_carlo = self.results.get("monte_carlo")
+        if not monte_carlo:
+            return
         
-    def _generate_plotly_js(self) -> str:
-        """Generate JavaScript for Plotly visualizations."""
-        plot_js = []
-        for i, (_, figure) in enumerate(self.figures):
-            plot_config = {
-                'data': figure.to_dict(),
-                'layout': figure.layout.to_plotly_json()
-            }
-            plot_js.append(
-                f'Plotly.newPlot('  # noqa: E501
-                f'"plot-{i}", '  # noqa: E131
-                f'{plot_config["data"]}, '  # noqa: E131
-                f'{plot_config["layout"]});'  # noqa: E131
+        years = monte_carlo["metadata"]["years"]
+        percentiles = monte_carlo["metadata"]["percentiles"]
+        low, high = f"p{min(percentiles):g}", f"p{max(percentiles):g}"
+        for name, bands in monte_carlo.get("summary_metrics", {}).items():
+            figure = go.Figure([
+                go.Scatter(x=years, y=bands[high], mode="lines", line={"width": 0}, name=high),
+                go.Scatter(
+                    x=years, y=bands[low], mode="lines", line={"width": 0},
+                    fill="tonexty", fillcolor="rgba(52, 152, 219, 0.3)", name=f"{low}-{high}"
+                ),
+                go.Scatter(x=years, y=bands.get("p50", bands["mean"]), mode="lines", name="median"),
+            ])
+            figure.update_layout(
+                title=f"{name.replace('_', ' ').title()} ({monte_carlo['metadata']['n_simulations']:,} runs)",
+                xaxis_title="Year"
             )
-        return "\n".join(plot_js) or "// No plots to display"
+            yield f"monte_carlo_{name}", figure
 
 
-def generate_report(results: Dict[str, Any], output_dir: Path) -> Path:
+def generate_report(results: Dict[str, Any], output_dir: Path, include_plotlyjs: str = "cdn") -> Path:
     """Generate a comprehensive HTML report for the simulation results.
     
     Args:
         results: Dictionary containing simulation results
         output_dir: Directory to save the report
-        
+        include_plotlyjs: ``"cdn"`` to reference plotly.js or ``"inline"`` to
+            embed it once for offline viewing
+    
     Returns:
         Path to the generated HTML report
     """
-    generator = ReportGenerator(results, output_dir)
+    generator = ReportGenerator(results, output_dir, include_plotlyjs=include_plotlyjs)
     return generator.generate_report()
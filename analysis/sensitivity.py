@@ -0,0 +1,378 @@
+"""Global sensitivity analysis of scenario inputs.
+
+Samples the numeric inputs of a scenario with a Saltelli (Sobol indices) or
+Morris (elementary effects) design, evaluates the designs in batches across
+worker processes and estimates the indices with vectorized estimators.
+"""
+
+import fnmatch
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Scenario sections whose numeric fields are sampled by default
+DEFAULT_SECTIONS: Tuple[str, ...] = ("sustainability", "production_technology", "client_needs")
+
+# Relative half-width of the sampling range around each nominal value
+DEFAULT_RELATIVE_RANGE = 0.2
+
+# Summary metrics of the integrated state, which depend on the scenario inputs
+DEFAULT_OUTPUTS: Tuple[str, ...] = ("final_adoption_share", "emissions_reduction")
+
+SENSITIVITY_METHODS = ("sobol", "morris")
+
+# Keys that hold years or counts rather than sampled quantities
+_EXCLUDED_KEYS = {"target_year", "base_year", "start_year", "end_year", "year"}
+
+
+@dataclass
+class Parameter:
+    """A sampled scenario input.
+    
+    Attributes:
+        path: Dotted configuration path of the value
+        nominal: Value in the base scenario
+        low: Lower sampling bound
+        high: Upper sampling bound
+    """
+    
+    path: str
+    nominal: float
+    low: float
+    high: float
+
+
+def _numeric_leaves(value: Any, path: str) -> Iterator[Tuple[str, float]]:
+    """Yield (path, value) for every sampled numeric leaf below a config node."""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key not in _EXCLUDED_KEYS:
+                yield from _numeric_leaves(child, f"{path}.{key}")
+    elif isinstance(value, list):
+        for i, child in enumerate(value):
+            if path.endswith(".trajectory") and isinstance(child, list) and len(child) == 2:
+                # A (year, value) trajectory point: only the value is sampled
+                yield from _numeric_leaves(child[1], f"{path}.{i}.1")
+            else:
+                yield from _numeric_leaves(child, f"{path}.{i}")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield path, float(value)
+
+
+def discover_parameters(
+    config: Dict[str, Any],
+    sections: Sequence[str] = DEFAULT_SECTIONS,
+    include: Optional[Sequence[str]] = None,
+    relative_range: float = DEFAULT_RELATIVE_RANGE
+) -> List[Parameter]:
+    """List the numeric scenario inputs to sample.
+    
+    Covers every number under the given sections, such as percentage range
+    bounds and the values of trajectory points (never their years). Each
+    input is sampled within ``relative_range`` of its nominal value, kept
+    non-negative, and percentage range bounds are capped at 100.
+    
+    Args:
+        config: Scenario configuration
+        sections: Top-level sections to search
+        include: Glob patterns the paths must match (e.g.
+            ``"sustainability.*.market_growth.*"``), all paths by default
+        relative_range: Relative half-width of the sampling range
+    
+    Returns:
+        Parameters in configuration order, skipping inputs whose range is
+        empty (such as a nominal value of 0)
+    """
+    parameters = []
+    for section in sections:
+        for path, nominal in _numeric_leaves(config.get(section, {}), section):
+            if include and not any(fnmatch.fnmatchcase(path, pattern) for pattern in include):
+                continue
+            low = max(nominal * (1 - relative_range), 0.0)
+            high = nominal * (1 + relative_range)
+            if path.endswith("percentage"):
+                high = min(high, 100.0)
+            if high > low:
+                parameters.append(Parameter(path, nominal, low, high))
+    return parameters
+
+
+def _scale(unit: np.ndarray, parameters: Sequence[Parameter]) -> np.ndarray:
+    """Map points of the unit hypercube onto the parameter bounds."""
+    low = np.array([p.low for p in parameters])
+    high = np.array([p.high for p in parameters])
+    return low + unit * (high - low)
+
+
+def saltelli_design(parameters: Sequence[Parameter], n: int, seed: Optional[int] = None) -> np.ndarray:
+    """Generate a Saltelli design for first-order and total Sobol indices.
+    
+    Matrices A and B are the two halves of a scrambled Sobol sequence in 2d
+    dimensions, and AB_i is A with column i taken from B.
+    
+    Args:
+        parameters: Sampled inputs (d of them)
+        n: Base sample size (a power of two keeps the sequence balanced)
+        seed: Scrambling seed
+    
+    Returns:
+        Design of shape [n * (d + 2), d], stacked as A, B, AB_1, ..., AB_d
+    """
+    from scipy.stats import qmc
+    
+    d = len(parameters)
+    base = qmc.Sobol(2 * d, scramble=True, seed=seed).random(n)
+    a, b = base[:, :d], base[:, d:]
+    ab = np.repeat(a[np.newaxis], d, axis=0)
+    columns = np.arange(d)
+    ab[columns, :, columns] = b.T
+    return _scale(np.concatenate([a, b, ab.reshape(d * n, d)]), parameters)
+
+
+def sobol_indices(
+    outputs: np.ndarray,
+    d: int,
+    n_bootstrap: int = 0,
+    seed: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """Estimate first-order and total Sobol indices from a Saltelli design.
+    
+    Uses the Saltelli (2010) first-order and Jansen total-effect estimators,
+    computed for all inputs and outputs at once. Rows with a NaN output in
+    any of A, B or AB_i are dropped.
+    
+    Args:
+        outputs: Model outputs of shape [n * (d + 2), k] in design order
+        d: Number of inputs
+        n_bootstrap: Bootstrap resamples for the confidence intervals
+        seed: Bootstrap seed
+    
+    Returns:
+        ``S1`` and ``ST`` of shape [d, k], plus ``S1_conf`` and ``ST_conf``
+        (95% half-widths) when bootstrapping
+    """
+    outputs = np.asarray(outputs, dtype=np.float64)
+    if outputs.ndim == 1:
+        outputs = outputs[:, np.newaxis]
+    n = len(outputs) // (d + 2)
+    f_a, f_b = outputs[:n], outputs[n:2 * n]
+    f_ab = outputs[2 * n:].reshape(d, n, -1)
+    valid = ~(np.isnan(f_a) | np.isnan(f_b) | np.isnan(f_ab).any(axis=0)).any(axis=1)
+    f_a, f_b, f_ab = f_a[valid], f_b[valid], f_ab[:, valid]
+    
+    def estimate(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # rows: [..., m] resampling indices -> indices of shape [..., d, k]
+        a, b, ab = f_a[rows], f_b[rows], f_ab[:, rows]
+        variance = np.concatenate([a, b], axis=-2).var(axis=-2)
+        variance = np.where(variance > 0, variance, np.nan)
+        first = (b * (ab - a)).mean(axis=-2) / variance
+        total = 0.5 * ((a - ab) ** 2).mean(axis=-2) / variance
+        return np.moveaxis(first, 0, -2), np.moveaxis(total, 0, -2)
+    
+    first, total = estimate(np.arange(len(f_a)))
+    indices = {"S1": first, "ST": total}
+    if n_bootstrap:
+        rows = np.random.default_rng(seed).integers(0, len(f_a), (n_bootstrap, len(f_a)))
+        first_samples, total_samples = estimate(rows)
+        # Bootstrap estimates have shape [n_bootstrap, d, k]
+        indices["S1_conf"] = 1.96 * np.nanstd(first_samples, axis=0)
+        indices["ST_conf"] = 1.96 * np.nanstd(total_samples, axis=0)
+    return indices
+
+
+def morris_design(
+    parameters: Sequence[Parameter],
+    r: int,
+    levels: int = 4,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """Generate Morris one-at-a-time trajectories.
+    
+    Each of the ``r`` trajectories starts at a random grid point and moves
+    every input once by ``delta = levels / (2 * (levels - 1))``, in random
+    order and direction.
+    
+    Args:
+        parameters: Sampled inputs (d of them)
+        r: Number of trajectories
+        levels: Grid levels per input (even)
+        seed: Random seed
+    
+    Returns:
+        Design of shape [r * (d + 1), d]
+    """
+    rng = np.random.default_rng(seed)
+    d = len(parameters)
+    delta = levels / (2 * (levels - 1))
+    
+    # Start points on the grid such that x + delta stays inside [0, 1]
+    start_levels = np.arange(levels // 2) / (levels - 1)
+    x = rng.choice(start_levels, size=(r, 1, d))
+    lower = np.tril(np.ones((d + 1, d)), -1)
+    directions = rng.choice([-1.0, 1.0], size=(r, 1, d))
+    order = rng.permuted(np.tile(np.arange(d), (r, 1)), axis=1)
+    
+    # B* = (x + delta / 2 * ((2B - 1) D + 1)) P, applied per trajectory
+    steps = x + delta / 2 * ((2 * lower - 1)[np.newaxis] * directions + 1)
+    trajectories = np.take_along_axis(steps, order[:, np.newaxis, :], axis=2)
+    return _scale(trajectories.reshape(r * (d + 1), d), parameters)
+
+
+def morris_indices(
+    design: np.ndarray,
+    outputs: np.ndarray,
+    parameters: Sequence[Parameter]
+) -> Dict[str, np.ndarray]:
+    """Compute Morris elementary-effect statistics.
+    
+    Args:
+        design: Design of shape [r * (d + 1), d] from ``morris_design``
+        outputs: Model outputs of shape [r * (d + 1), k]
+        parameters: Sampled inputs
+    
+    Returns:
+        ``mu``, ``mu_star`` and ``sigma`` of shape [d, k], with effects
+        expressed per unit of the normalized [0, 1] input range
+    """
+    d = len(parameters)
+    outputs = np.asarray(outputs, dtype=np.float64)
+    if outputs.ndim == 1:
+        outputs = outputs[:, np.newaxis]
+    span = np.array([p.high - p.low for p in parameters])
+    span = np.where(span > 0, span, 1.0)
+    
+    unit = design.reshape(-1, d + 1, d) / span
+    steps = np.diff(unit, axis=1)                           # [r, d, d]
+    moved = np.abs(steps).argmax(axis=2)                    # input moved at each step
+    delta = np.take_along_axis(steps, moved[..., np.newaxis], axis=2)[..., 0]
+    changes = np.diff(outputs.reshape(-1, d + 1, outputs.shape[1]), axis=1)
+    effects = changes / delta[..., np.newaxis]              # [r, d, k]
+    
+    # Reorder the effects of each trajectory by input
+    by_input = np.empty_like(effects)
+    np.put_along_axis(by_input, moved[..., np.newaxis], effects, axis=1)
+    return {
+        "mu": np.nanmean(by_input, axis=0),
+        "mu_star": np.nanmean(np.abs(by_input), axis=0),
+        "sigma": np.nanstd(by_input, axis=0, ddof=1) if len(by_input) > 1 else np.zeros(by_input.shape[1:])
+    }
+
+
+def _evaluate_chunk(
+    config: Dict[str, Any],
+    paths: Sequence[str],
+    values: np.ndarray,
+    outputs: Sequence[str],
+    seed: Optional[int]
+) -> np.ndarray:
+    """Evaluate one chunk of a design inside a worker process."""
+    import contextlib
+    import io
+    
+    from simulation.graph import IncrementalRunner
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        return IncrementalRunner(seed=seed).run_batch(config, paths, values, outputs)
+
+
+def evaluate_design(
+    config: Dict[str, Any],
+    parameters: Sequence[Parameter],
+    design: np.ndarray,
+    outputs: Sequence[str] = DEFAULT_OUTPUTS,
+    max_workers: Optional[int] = None,
+    chunk_size: int = 256,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """Evaluate the summary metrics of every design row.
+    
+    Rows are split into chunks that run through
+    ``IncrementalRunner.run_batch`` on a process pool. Every row uses the
+    same seed, so the stochastic metrics act as common random numbers and
+    output differences come from the inputs alone.
+    
+    Args:
+        config: Base scenario configuration
+        parameters: Sampled inputs, one per design column
+        design: Input values of shape [n_rows, d]
+        outputs: Summary metrics to evaluate
+        max_workers: Worker processes (``1`` evaluates in this process)
+        chunk_size: Rows per task
+        seed: Root random seed of the runs
+    
+    Returns:
+        Outputs of shape [n_rows, len(outputs)]
+    """
+    paths = [p.path for p in parameters]
+    chunks = [design[i:i + chunk_size] for i in range(0, len(design), chunk_size)]
+    if max_workers == 1 or len(chunks) == 1:
+        results = [_evaluate_chunk(config, paths, chunk, outputs, seed) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            results = list(executor.map(
+                _evaluate_chunk,
+                *zip(*((config, paths, chunk, outputs, seed) for chunk in chunks))
+            ))
+    return np.concatenate(results) if results else np.empty((0, len(outputs)))
+
+
+def run_sensitivity(
+    config: Dict[str, Any],
+    method: str = "sobol",
+    n: int = 256,
+    outputs: Sequence[str] = DEFAULT_OUTPUTS,
+    include: Optional[Sequence[str]] = None,
+    relative_range: float = DEFAULT_RELATIVE_RANGE,
+    max_workers: Optional[int] = None,
+    n_bootstrap: int = 100,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """Run a global sensitivity analysis of a scenario.
+    
+    Args:
+        config: Scenario configuration
+        method: ``"sobol"`` (n * (d + 2) runs) or ``"morris"`` (n * (d + 1) runs)
+        n: Base sample size (Sobol) or number of trajectories (Morris)
+        outputs: Summary metrics to analyse
+        include: Glob patterns selecting the sampled inputs
+        relative_range: Relative half-width of the sampling ranges
+        max_workers: Worker processes
+        n_bootstrap: Bootstrap resamples of the Sobol confidence intervals
+        seed: Seed of the design and the runs
+    
+    Returns:
+        Dictionary with the sampled parameters and, per output, the indices
+        of every parameter
+    """
+    if method not in SENSITIVITY_METHODS:
+        raise ValueError(f"Unknown sensitivity method '{method}', expected one of {SENSITIVITY_METHODS}")
+    parameters = discover_parameters(config, include=include, relative_range=relative_range)
+    if not parameters:
+        raise ValueError("No numeric scenario inputs match the selection")
+    
+    if method == "sobol":
+        design = saltelli_design(parameters, n, seed=seed)
+    else:
+        design = morris_design(parameters, n, seed=seed)
+    values = evaluate_design(config, parameters, design, outputs, max_workers=max_workers, seed=seed)
+    if method == "sobol":
+        indices = sobol_indices(values, len(parameters), n_bootstrap=n_bootstrap, seed=seed)
+    else:
+        indices = morris_indices(design, values, parameters)
+    
+    return {
+        "method": method,
+        "n_evaluations": len(design),
+        "n_failed": int(np.isnan(values).any(axis=1).sum()),
+        "parameters": [vars(p) for p in parameters],
+        "indices": {
+            output: {
+                p.path: {name: float(index[i, k]) for name, index in indices.items()}
+                for i, p in enumerate(parameters)
+            }
+            for k, output in enumerate(outputs)
+        }
+    }
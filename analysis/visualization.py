@@ -2,6 +2,9 @@
 Visualization utilities for simulation results with enhanced charts and interactivity.
 """
 
+import importlib.util
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple, Union
 import json
@@ -9,9 +12,13 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
 from plotly.subplots import make_subplots
 from plotly.colors import qualitative
 
+from models.base_model import Trajectory
+
 # Color scheme for consistent styling
 COLOR_SCHEME = {
     'primary': '#2c3e50',
@@ -39,49 +46,222 @@ CHART_CONFIG = {
     }
 }
 
+# Percentiles of the ensemble bands (the median is always drawn)
+DEFAULT_BANDS = (5, 50, 95)
+
+# Static image export defaults
+IMAGE_FORMAT = "png"
+IMAGE_SCALE = 2
 
-def plot_simulation_results(results: Dict[str, Any], output_dir: str) -> Dict[str, go.Figure]:
+
+def plot_simulation_results(
+    results: Dict[str, Any],
+    output_dir: str,
+    write_html: bool = True,
+    write_images: bool = True,
+    image_format: str = IMAGE_FORMAT,
+    image_scale: float = IMAGE_SCALE,
+    max_workers: Optional[int] = None
+) -> Dict[str, go.Figure]:
     """Generate and save visualizations for simulation results.
     
+    All figures are built first and then exported together by
+    ``render_figures``.
+    
     Args:
         results: Dictionary containing simulation results
         output_dir: Directory to save the generated plots
+        write_html: Write an interactive HTML file per figure
+        write_images: Export a static image per figure
+        image_format: Static image format (png, jpg, webp, svg or pdf)
+        image_scale: Static image scale factor
+        max_workers: Threads writing HTML files (defaults to the executor's default)
         
     Returns:
         Dictionary mapping figure names to Plotly figure objects
     """
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+    figures = collect_figures(results)
+    render_figures(
+        figures,
+        output_dir,
+        write_html=write_html,
+        write_images=write_images,
+        image_format=image_format,
+        image_scale=image_scale,
+        max_workers=max_workers
+    )
+    return figures
+
+
+def collect_figures(results: Dict[str, Any]) -> Dict[str, go.Figure]:
+    """Build every figure available for a set of simulation results.
     
+    Args:
+        results: Dictionary containing simulation results
+        
+    Returns:
+        Dictionary mapping figure names to Plotly figure objects
+    """
     figures = {}
     
     # Create summary metrics dashboard
-    summary_fig = _create_summary_dashboard(results, output_path)
+    summary_fig = _create_summary_dashboard(results)
     if summary_fig:
         figures["summary"] = summary_fig
     
     # Create detailed visualizations for each component
     if "sustainability" in results:
-        sustainability_figs = _plot_sustainability_metrics(results["sustainability"], output_path)
-        figures.update(sustainability_figs)
+        figures.update(_plot_sustainability_metrics(results["sustainability"], _years(results)))
     
     if "production_tech" in results:
-        tech_figs = _plot_production_tech_metrics(results["production_tech"], output_path)
-        figures.update(tech_figs)
+        figures.update(_plot_production_tech_metrics(results["production_tech"]))
     
     if "client_needs" in results:
-        client_figs = _plot_client_needs_metrics(results["client_needs"], output_path)
-        figures.update(client_figs)
-    
-    # Save all figures as HTML for interactive viewing
-    for name, fig in figures.items():
-        if fig is not None:
-            fig.write_html(str(output_path / f"{name}.html"), config=CHART_CONFIG)
+        figures.update(_plot_client_needs_metrics(results["client_needs"]))
     
     return figures
 
 
-def _create_summary_dashboard(results: Dict[str, Any], output_dir: Path) -> Optional[go.Figure]:
+def render_figures(
+    figures: Dict[str, go.Figure],
+    output_dir: Union[str, Path],
+    write_html: bool = True,
+    write_images: bool = True,
+    image_format: str = IMAGE_FORMAT,
+    image_scale: float = IMAGE_SCALE,
+    max_workers: Optional[int] = None
+) -> List[Path]:
+    """Export a set of figures as HTML files and static images.
+    
+    HTML files are written concurrently on a thread pool and reference a
+    single ``plotly.min.js`` written once next to them, instead of each
+    embedding the library. Static images are exported in one batched
+    Kaleido session while the HTML files are being written.
+    
+    Args:
+        figures: Dictionary mapping figure names to Plotly figure objects
+        output_dir: Directory to save the files
+        write_html: Write ``<name>.html`` for each figure
+        write_images: Write ``<name>.<image_format>`` for each figure
+        image_format: Static image format (png, jpg, webp, svg or pdf)
+        image_scale: Static image scale factor
+        max_workers: Threads writing HTML files (defaults to the executor's default)
+        
+    Returns:
+        Paths of the written files
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    figures = {name: fig for name, fig in figures.items() if fig is not None}
+    if not figures:
+        return []
+    
+    if write_images and importlib.util.find_spec("kaleido") is None:
+        print("⚠️ Kaleido is not installed, skipping static image export")
+        write_images = False
+    
+    written: List[Path] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = []
+        if write_html:
+            bundle_path = output_path / "plotly.min.js"
+            if not bundle_path.exists():
+                bundle_path.write_text(get_plotlyjs(), encoding="utf-8")
+            for name, fig in figures.items():
+                path = output_path / f"{name}.html"
+                pending.append(executor.submit(
+                    fig.write_html, str(path), config=CHART_CONFIG, include_plotlyjs="directory"
+                ))
+                written.append(path)
+        
+        if write_images:
+            paths = [output_path / f"{name}.{image_format}" for name in figures]
+            pio.write_images(list(figures.values()), paths, format=image_format, scale=image_scale)
+            written.extend(paths)
+        
+        for future in pending:
+            future.result()
+    
+    return written
+
+
+def plot_ensemble(
+    ensemble: Any,
+    metric: str,
+    n_paths: int = 100,
+    seed: int = 0
+) -> go.Figure:
+    """Plot a metric of an on-disk Monte Carlo ensemble.
+    
+    Only the percentile bands of the metric and ``n_paths`` randomly chosen
+    replicate paths are read from the memory-mapped file.
+    
+    Args:
+        ensemble: Ensemble from ``simulation.ensemble.open_ensemble``
+        metric: Metric name, as ``<component>.<metric>``
+        n_paths: Number of individual replicate paths drawn
+        seed: Seed of the path selection
+        
+    Returns:
+        Plotly figure object
+    """
+    years = ensemble.years
+    bands = ensemble.bands(metric, DEFAULT_BANDS)
+    replicates = np.sort(np.random.default_rng(seed).choice(
+        ensemble.n_replicates, size=min(n_paths, ensemble.n_replicates), replace=False
+    ))
+    paths = np.asarray(ensemble.metric(metric, replicates))
+    low, high = (f"p{q:g}" for q in (min(DEFAULT_BANDS), max(DEFAULT_BANDS)))
+    
+    fig = go.Figure()
+    for i, path in enumerate(paths):
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=path,
+            mode='lines',
+            line=dict(width=0.5, color='rgba(52, 152, 219, 0.15)'),
+            hoverinfo='skip',
+            showlegend=i == 0,
+            name=f'{len(paths)} sampled runs'
+        ))
+    for name, width, dash, color in (
+        (high, 1, 'dash', COLOR_SCHEME['primary']),
+        (low, 1, 'dash', COLOR_SCHEME['primary']),
+        ('p50', 3, None, COLOR_SCHEME['danger']),
+    ):
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=bands[name],
+            mode='lines',
+            line=dict(width=width, dash=dash, color=color),
+            name='median' if name == 'p50' else name
+        ))
+    
+    fig.update_layout(
+        title=f"{metric.split('.', 1)[-1].replace('_', ' ').title()} ({ensemble.n_replicates:,} runs)",
+        xaxis_title='Year',
+        template='plotly_white',
+        height=500
+    )
+    return fig
+
+
+def _years(results: Dict[str, Any]) -> Optional[np.ndarray]:
+    """Return the simulated years recorded in the results metadata."""
+    period = results.get("metadata", {}).get("simulation_period")
+    if not period:
+        return None
+    return np.arange(period["start_year"], period["end_year"] + 1)
+
+
+def _trajectory_xy(trajectory: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the years and values of a trajectory or of its serialized points."""
+    if not isinstance(trajectory, Trajectory):
+        trajectory = Trajectory(trajectory)
+    return trajectory.years, trajectory.values
+
+
+def _create_summary_dashboard(results: Dict[str, Any]) -> Optional[go.Figure]:
     """Create a summary dashboard with key metrics.
     
     Returns:
@@ -128,11 +308,11 @@ def _create_summary_dashboard(results: Dict[str, Any], output_dir: Path) -> Opti
         )
     
     # 2. Gauge for overall score
-    if 'sustainability_score' in metrics:
+    if 'overall_sustainability_score' in metrics:
         fig.add_trace(
             go.Indicator(
                 mode="gauge+number+delta",
-                value=metrics.get('sustainability_score', 0),
+                value=metrics.get('overall_sustainability_score', 0),
                 title={'text': "Sustainability Score"},
                 gauge={
                     'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': COLOR_SCHEME['dark']},
@@ -189,24 +369,46 @@ def _create_summary_dashboard(results: Dict[str, Any], output_dir: Path) -> Opti
     )
     
     return fig
-    
-    # Save the figure
-    fig.write_html(str(output_dir / "summary_dashboard.html"))
-    fig.write_image(str(output_dir / "summary_dashboard.png"), scale=2)
 
 
-def _plot_sustainability_metrics(sustainability_data: Dict[str, Any], output_dir: Path) -> Dict[str, go.Figure]:
+def _plot_sustainability_metrics(
+    sustainability_data: Dict[str, Any],
+    years: Optional[np.ndarray] = None
+) -> Dict[str, go.Figure]:
     """Create visualizations for sustainability metrics.
     
     Args:
         sustainability_data: Dictionary containing sustainability metrics
-        output_dir: Directory to save the generated plots
+        years: Simulated years, needed to plot the yearly adoption curves
         
     Returns:
         Dictionary mapping figure names to Plotly figure objects
     """
     figures = {}
     
+    # Fitted adoption curves of fertilizers and technologies
+    curves = sustainability_data.get("adoption_curves")
+    if curves and years is not None:
+        fig = go.Figure()
+        for (name, values), color in zip(curves.items(), itertools.cycle(qualitative.Plotly)):
+            fig.add_trace(go.Scatter(
+                x=years,
+                y=values,
+                name=name,
+                line=dict(width=2, color=color)
+            ))
+        
+        fig.update_layout(
+            title=f"Fertilizer Market Share Projection ({years[0]}-{years[-1]})",
+            xaxis_title="Year",
+            yaxis_title="Market Share (%)",
+            template="plotly_white",
+            height=600,
+            width=900
+        )
+        
+        figures["fertilizer_adoption"] = fig
+    
     # Carbon footprint over time
     if "carbon_footprint" in sustainability_data:
         df = pd.DataFrame(sustainability_data["carbon_footprint"])
@@ -379,31 +581,85 @@ def _plot_sustainability_metrics(sustainability_data: Dict[str, Any], output_dir
         figures["water_usage"] = fig
     
     return figures
-            fig.add_trace(go.Scatter(
-                x=years,
-                y=mean_vals,
-                name=f"{adoption.fertilizer_type} (Mean)",
-                line=dict(width=2)
-            ))
+
+
+def _plot_trajectories(
+    series: Dict[str, Any],
+    title: str,
+    yaxis_title: str
+) -> go.Figure:
+    """Create a line chart with one trace per named trajectory."""
+    fig = go.Figure()
+    for (name, trajectory), color in zip(series.items(), itertools.cycle(qualitative.Plotly)):
+        years, values = _trajectory_xy(trajectory)
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=values,
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2, color=color)
+        ))
+    
+    fig.update_layout(
+        title=dict(
+            text=f'<b>{title}</b>',
+            x=0.5,
+            xanchor='center',
+            font=dict(size=20)
+        ),
+        xaxis_title='Year',
+        yaxis_title=yaxis_title,
+        template='plotly_white',
+        height=500,
+        margin=dict(t=80, b=80, l=80, r=40),
+        hovermode='x unified'
+    )
+    return fig
+
+
+def _plot_production_tech_metrics(tech_data: Dict[str, Any]) -> Dict[str, go.Figure]:
+    """Create visualizations for production technology metrics.
+    
+    Args:
+        tech_data: Dictionary containing production technology results
         
-        fig.update_layout(
-            title="Fertilizer Market Share Projection (2025-2040)",
-            xaxis_title="Year",
-            yaxis_title="Market Share (%)",
-            template="plotly_white",
-            height=600,
-            width=900
+    Returns:
+        Dictionary mapping figure names to Plotly figure objects
+    """
+    if not tech_data.get("technology_evolution"):
+        return {}
+    
+    # One line per technology evolution trend
+    series = {
+        f"{tech['technology_name']} ({tech['metric_type']})": tech["trajectory_or_curve"]["trajectory"]
+        for tech in tech_data["technology_evolution"]
+    }
+    return {
+        "technology_evolution": _plot_trajectories(
+            series, "Production Technology Evolution", "Value"
         )
-        
-        fig.write_html(str(output_dir / "fertilizer_adoption.html"))
-        fig.write_image(str(output_dir / "fertilizer_adoption.png"), scale=2)
+    }
 
 
-def _plot_production_tech_metrics(tech_data: Dict[str, Any], output_dir: Path) -> None:
-    """Create visualizations for production technology metrics."""
-    if "technology_evolution" not in tech_data:
-        return
+def _plot_client_needs_metrics(client_data: Dict[str, Any]) -> Dict[str, go.Figure]:
+    """Create visualizations for client needs metrics.
     
-    # Create a line plot for each technology evolution
-    fig = go.Figure()
+    Args:
+        client_data: Dictionary containing client needs results
+        
+    Returns:
+        Dictionary mapping figure names to Plotly figure objects
+    """
+    if not client_data.get("priority_evolution"):
+        return {}
     
+    # One line per client priority trend
+    series = {
+        priority["priority_area"]: priority["evolution_trend"]["trajectory"]
+        for priority in client_data["priority_evolution"]
+    }
+    return {
+        "client_priorities": _plot_trajectories(
+            series, "Client Priority Evolution", "Priority (%)"
+        )
+    }
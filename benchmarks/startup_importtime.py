@@ -0,0 +1,122 @@
+"""Startup benchmark for the command-line interface.
+
+Runs lightweight CLI commands under ``python -X importtime`` and fails when
+heavy modules leak into their import graph or when the total import time
+exceeds the budget. Exits with status 1 on regression, so it can be used as
+a CI gate::
+
+    python benchmarks/startup_importtime.py --budget-ms 300
+
+The forbidden-module check also runs in the test suite
+(``tests/test_startup.py``); the time budget is left to this script, since
+timings depend on the machine.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Commands that must start without loading the heavy stack
+COMMANDS: List[List[str]] = [
+    ["--help"],
+    ["list-scenarios"],
+    ["show-config"],
+]
+
+# Modules that only the commands needing them may import
+FORBIDDEN_MODULES: Tuple[str, ...] = (
+    "pandas",
+    "plotly",
+    "scipy",
+    "pyarrow",
+    "webbrowser",
+    "analysis.visualization",
+    "analysis.report_generator",
+)
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(args: List[str]) -> Tuple[float, Dict[str, float]]:
+    """Run a CLI command under ``-X importtime``.
+    
+    Args:
+        args: Command-line arguments passed to ``main.py``
+        
+    Returns:
+        Total import time in milliseconds and the cumulative import time of
+        every imported module in milliseconds
+        
+    Raises:
+        RuntimeError: If the command exits with a non-zero status
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", str(ROOT / "main.py"), *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"main.py {' '.join(args)} failed:\n{completed.stderr[-2000:]}")
+    modules = {}
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        modules[module] = int(cumulative) / 1000
+        # Top-level imports are indented by a single space
+        if len(indent) == 1:
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def leaked_modules(modules: Dict[str, float]) -> List[str]:
+    """Return the imported modules that are (or belong to) ``FORBIDDEN_MODULES``."""
+    return sorted(
+        module for module in modules
+        if any(module == name or module.startswith(f"{name}.") for name in FORBIDDEN_MODULES)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget-ms", type=float, default=None,
+        help="Maximum total import time per command in milliseconds"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="Runs per command; the fastest run is reported"
+    )
+    options = parser.parse_args()
+    
+    failed = False
+    for args in COMMANDS:
+        runs = [measure(args) for _ in range(options.repeat)]
+        total_ms, modules = min(runs, key=lambda run: run[0])
+        leaked = leaked_modules(modules)
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+        
+        print(f"main.py {' '.join(args)}: {total_ms:.1f} ms")
+        for module, cumulative_ms in slowest:
+            print(f"    {cumulative_ms:8.1f} ms  {module}")
+        
+        if leaked:
+            failed = True
+            print(f"  FAIL: heavy modules imported: {', '.join(leaked)}")
+        if options.budget_ms is not None and total_ms > options.budget_ms:
+            failed = True
+            print(f"  FAIL: {total_ms:.1f} ms exceeds the {options.budget_ms:.0f} ms budget")
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
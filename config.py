@@ -16,6 +16,8 @@ class Settings(BaseSettings):
     SIMULATION_DIR: Path = BASE_DIR / "simulations"
     SCENARIO_DIR: Path = SIMULATION_DIR / "scenarios"
     REPORT_DIR: Path = BASE_DIR / "reports"
+    RESULTS_STORE_DIR: Path = DATA_DIR / "simulations" / "results"
+    ENSEMBLE_DIR: Path = DATA_DIR / "simulations" / "ensembles"
     
     # Simulation defaults
     DEFAULT_START_YEAR: int = 2025
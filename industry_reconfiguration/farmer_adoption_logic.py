@@ -1,4 +1,437 @@
-# This module will contain logic related to farmer adoption and demand evolution.
-# It will likely use models from models.farmer_adoption_models
+"""Agent-based simulation of farmer adoption of sustainable practices.
 
-pass 
\ No newline at end of file
+Farms are stored as a struct of NumPy arrays (one array per attribute, one
+entry per farm) rather than as Python objects, and peer influence is a
+sparse matrix product over a CSR neighbor graph, so every update touches all
+farms in a handful of vectorized operations.
+
+Each practice is calibrated from its ``SustainablePracticeAdoption`` trend
+with a Bass fit: the ceiling decides which farms are eligible at all, the
+innovation coefficient drives spontaneous adoption and the imitation
+coefficient scales the share of adopting neighbors. Since adopters cluster
+in the peer graph, non-adopters see fewer adopting peers than the Bass curve
+assumes, so the hazard of every practice is rescaled with pilot runs until
+the simulated adoption tracks the observed trend.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+from scipy import sparse
+
+from industry_transformation.sustainability_transition_logic import fit_curves
+from models.base_model import Trajectory
+from models.farmer_adoption_models import FarmerAdoptionAndDemandEvolution
+
+DEFAULT_REGIONS = ("North America", "Latin America", "Europe", "Asia", "Africa")
+DEFAULT_CROPS = ("Cereals", "Oilseeds", "Fruits & Vegetables", "Other")
+
+# Median farm size in hectares and the spread of the log-normal size distribution
+MEDIAN_FARM_SIZE = 20.0
+FARM_SIZE_SIGMA = 1.2
+
+# Elasticity of the adoption hazard with respect to relative farm size
+SIZE_ELASTICITY = 0.2
+
+# Relative increase of the adoption hazard at 100% financing availability
+FINANCING_EFFECT = 0.5
+
+# Neighbors per farm in the peer graph
+DEFAULT_NEIGHBORS = 8
+
+# Farms in the pilot runs that calibrate the hazard, and the number of runs
+CALIBRATION_FARMS = 20_000
+CALIBRATION_ROUNDS = 4
+
+SeedLike = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+
+@dataclass
+class FarmPopulation:
+    """Farm attributes as parallel arrays, one entry per farm.
+    
+    Attributes:
+        farm_size: Farm size in hectares, shape [n_farms]
+        region: Region index, shape [n_farms]
+        crop_mix: Share of the farm area under each crop, shape [n_farms, n_crops]
+        adopted: Whether each farm has adopted each practice, shape [n_farms, n_practices]
+        eligible: Whether each practice can be adopted by the farm at all,
+            shape [n_farms, n_practices]
+        regions: Region names
+        crops: Crop names
+        practices: Practice names
+    """
+    
+    farm_size: np.ndarray
+    region: np.ndarray
+    crop_mix: np.ndarray
+    adopted: np.ndarray
+    eligible: np.ndarray
+    regions: List[str]
+    crops: List[str]
+    practices: List[str]
+    
+    def __len__(self) -> int:
+        return len(self.farm_size)
+    
+    @classmethod
+    def generate(
+        cls,
+        n_farms: int,
+        practices: Sequence[str],
+        regions: Sequence[str] = DEFAULT_REGIONS,
+        crops: Sequence[str] = DEFAULT_CROPS,
+        region_weights: Optional[Sequence[float]] = None,
+        median_size: float = MEDIAN_FARM_SIZE,
+        seed: SeedLike = None
+    ) -> "FarmPopulation":
+        """Draw a synthetic farm population.
+        
+        Sizes are log-normal, regions are drawn with ``region_weights`` and
+        crop mixes are Dirichlet distributed. Farms are sorted by region so
+        that each region occupies a contiguous block of the arrays.
+        
+        Args:
+            n_farms: Number of farms
+            practices: Practice names
+            regions: Region names
+            crops: Crop names
+            region_weights: Relative number of farms per region (defaults to equal)
+            median_size: Median farm size in hectares
+            seed: Seed or generator of the draws
+        
+        Returns:
+            Population with no adopters and every practice eligible
+        """
+        rng = np.random.default_rng(seed)
+        weights = np.ones(len(regions)) if region_weights is None else np.asarray(region_weights, dtype=np.float64)
+        region = np.sort(rng.choice(len(regions), size=n_farms, p=weights / weights.sum())).astype(np.int16)
+        farm_size = rng.lognormal(np.log(median_size), FARM_SIZE_SIGMA, n_farms).astype(np.float32)
+        crop_mix = rng.dirichlet(np.ones(len(crops)), n_farms).astype(np.float32)
+        return cls(
+            farm_size=farm_size,
+            region=region,
+            crop_mix=crop_mix,
+            adopted=np.zeros((n_farms, len(practices)), dtype=bool),
+            eligible=np.ones((n_farms, len(practices)), dtype=bool),
+            regions=list(regions),
+            crops=list(crops),
+            practices=list(practices)
+        )
+    
+    def adoption_share(self) -> np.ndarray:
+        """Share of farms (in percent) that adopted each practice, per region.
+        
+        Returns:
+            Array of shape [n_regions, n_practices]
+        """
+        counts = np.bincount(self.region, minlength=len(self.regions)).astype(np.float64)
+        adopted = np.stack([
+            np.bincount(self.region, weights=column, minlength=len(self.regions))
+            for column in self.adopted.T
+        ], axis=1)
+        return 100.0 * adopted / np.maximum(counts, 1)[:, np.newaxis]
+    
+    def adopted_area_share(self) -> np.ndarray:
+        """Share of the farmed area (in percent) under each practice.
+        
+        Returns:
+            Array of shape [n_practices]
+        """
+        area = self.farm_size.astype(np.float64)
+        return 100.0 * (area @ self.adopted) / area.sum()
+
+
+def build_neighbor_graph(
+    region: np.ndarray,
+    n_neighbors: int = DEFAULT_NEIGHBORS,
+    seed: SeedLike = None
+) -> sparse.csr_matrix:
+    """Draw a random peer graph where farms only know farms of their own region.
+    
+    Requires ``region`` to be sorted, as produced by
+    :meth:`FarmPopulation.generate`. Each farm gets ``n_neighbors`` random
+    peers (without self-loops, with possible repeats), and rows are
+    normalized so the product with the adoption flags gives the share of
+    adopting peers.
+    
+    Args:
+        region: Sorted region index of every farm
+        n_neighbors: Peers per farm
+        seed: Seed or generator of the draws
+    
+    Returns:
+        Row-stochastic [n_farms, n_farms] CSR matrix
+    """
+    rng = np.random.default_rng(seed)
+    n_farms = len(region)
+    if np.any(np.diff(region) < 0):
+        raise ValueError("Farms must be sorted by region")
+    
+    # Block of each farm's region and its position within the block
+    _, start, size = np.unique(region, return_index=True, return_counts=True)
+    block = np.repeat(np.arange(len(start)), size)
+    block_start, block_size = start[block], size[block]
+    position = np.arange(n_farms) - block_start
+    
+    # Offsets in [1, size - 1] never map a farm onto itself
+    offsets = 1 + np.floor(
+        rng.random((n_farms, n_neighbors)) * np.maximum(block_size - 1, 1)[:, np.newaxis]
+    ).astype(np.int64)
+    neighbors = block_start[:, np.newaxis] + (position[:, np.newaxis] + offsets) % block_size[:, np.newaxis]
+    
+    # Farms alone in their region get no peers
+    weights = np.where(block_size > 1, 1.0 / n_neighbors, 0.0).astype(np.float32)
+    index_dtype = np.int32 if n_farms * n_neighbors < np.iinfo(np.int32).max else np.int64
+    indptr = np.arange(0, n_farms * n_neighbors + 1, n_neighbors, dtype=index_dtype)
+    graph = sparse.csr_matrix(
+        (np.repeat(weights, n_neighbors), neighbors.ravel().astype(index_dtype), indptr),
+        shape=(n_farms, n_farms)
+    )
+    graph.sum_duplicates()
+    return graph
+
+
+class FarmerAdoptionSimulator:
+    """Advances the adoption flags of a farm population through time.
+    
+    In each step a non-adopting, eligible farm adopts a practice with
+    probability ``1 - exp(-h * dt)``, where the hazard is::
+
+        h = (p + q * peer_share / ceiling) * (size / median_size) ** size_elasticity
+            * (1 + financing_effect * financing / 100)
+    
+    ``peer_share`` is the share of the farm's neighbors that have adopted,
+    and ``financing`` is the availability of adoption financing (in
+    percent) at that time.
+    """
+    
+    def __init__(
+        self,
+        population: FarmPopulation,
+        graph: sparse.csr_matrix,
+        innovation: Sequence[float],
+        imitation: Sequence[float],
+        ceiling: Sequence[float],
+        financing: Optional[Trajectory] = None,
+        size_elasticity: float = SIZE_ELASTICITY,
+        financing_effect: float = FINANCING_EFFECT,
+        seed: SeedLike = None
+    ) -> None:
+        """Initialize the simulator.
+        
+        Args:
+            population: Farm population, updated in place
+            graph: Row-stochastic peer graph of the population
+            innovation: Innovation coefficient p of each practice
+            imitation: Imitation coefficient q of each practice
+            ceiling: Share of farms (in percent) eligible for each practice
+            financing: Financing availability over time, in percent
+            size_elasticity: Elasticity of the hazard with respect to farm size
+            financing_effect: Hazard increase at full financing availability
+            seed: Seed or generator of the adoption draws
+        """
+        self.population = population
+        self.graph = graph
+        self.innovation = np.asarray(innovation, dtype=np.float32)
+        self.imitation = np.asarray(imitation, dtype=np.float32)
+        self.ceiling = np.clip(np.asarray(ceiling, dtype=np.float32) / 100, 1e-6, 1.0)
+        self.financing = financing
+        self.financing_effect = financing_effect
+        self.rng = np.random.default_rng(seed)
+        
+        size = population.farm_size
+        self.size_factor = ((size / np.median(size)) ** size_elasticity).astype(np.float32)[:, np.newaxis]
+    
+    @classmethod
+    def from_model(
+        cls,
+        model: FarmerAdoptionAndDemandEvolution,
+        n_farms: int,
+        start_year: int,
+        regions: Sequence[str] = DEFAULT_REGIONS,
+        region_weights: Optional[Sequence[float]] = None,
+        n_neighbors: int = DEFAULT_NEIGHBORS,
+        seed: Union[None, int, np.random.SeedSequence] = None,
+        calibration_rounds: int = CALIBRATION_ROUNDS
+    ) -> "FarmerAdoptionSimulator":
+        """Calibrate a simulator from a farmer adoption model.
+        
+        Each practice's penetration trend is fitted with a Bass curve;
+        practices without trend points are skipped. Farms become eligible
+        with probability ``ceiling``, and the share of farms given by the
+        curve in ``start_year`` adopt from the outset. Financing
+        availability is the mean of the financing model trends. The hazards
+        are then rescaled with :meth:`calibrate` on a pilot population of at
+        most ``CALIBRATION_FARMS`` farms.
+        
+        Args:
+            model: Validated farmer adoption model
+            n_farms: Number of farms to simulate
+            start_year: First simulated year
+            regions: Region names
+            region_weights: Relative number of farms per region
+            n_neighbors: Peers per farm
+            seed: Root seed of the population, graph and adoption draws
+            calibration_rounds: Pilot runs of the hazard calibration (0 to
+                keep the Bass coefficients as fitted)
+        
+        Returns:
+            Calibrated simulator
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        population_seed, graph_seed, eligibility_seed, run_seed, pilot_seed = seed.spawn(5)
+        
+        practices = [
+            practice for practice in model.sustainable_practice_adoption
+            if practice.implementation_rate_or_penetration.trajectory is not None
+            and len(practice.implementation_rate_or_penetration.trajectory)
+        ]
+        curves = fit_curves(
+            [practice.practice_type for practice in practices],
+            [practice.implementation_rate_or_penetration.trajectory for practice in practices],
+            method="bass"
+        )
+        population = FarmPopulation.generate(
+            n_farms, curves.names, regions=regions, region_weights=region_weights, seed=population_seed
+        )
+        
+        rng = np.random.default_rng(eligibility_seed)
+        draws = rng.random((n_farms, len(curves)), dtype=np.float32)
+        share_eligible = curves.ceiling / 100
+        population.eligible = draws < share_eligible
+        initial = curves.evaluate([start_year])[:, 0, 0, 0] / 100
+        # Reuse the eligibility draw so the initial adopters are eligible farms
+        population.adopted = draws < initial
+        
+        financing = [
+            item.evolution_or_adoption.trajectory for item in model.financing_model_adaptation
+            if item.evolution_or_adoption.trajectory is not None and len(item.evolution_or_adoption.trajectory)
+        ]
+        financing_trend = None
+        if financing:
+            years = np.unique(np.concatenate([trajectory.years for trajectory in financing]))
+            financing_trend = Trajectory(
+                years=years, values=np.mean([trajectory.at(years) for trajectory in financing], axis=0)
+            )
+        
+        simulator = cls(
+            population,
+            build_neighbor_graph(population.region, n_neighbors, seed=graph_seed),
+            curves.innovation,
+            curves.imitation,
+            curves.ceiling,
+            financing=financing_trend,
+            seed=run_seed
+        )
+        if calibration_rounds > 0 and len(practices):
+            pilot = cls.from_model(
+                model, min(n_farms, CALIBRATION_FARMS), start_year, regions, region_weights,
+                n_neighbors, seed=pilot_seed, calibration_rounds=0
+            )
+            scale = pilot.calibrate(
+                [practice.implementation_rate_or_penetration.trajectory for practice in practices],
+                start_year,
+                rounds=calibration_rounds
+            )
+            simulator.innovation *= scale
+            simulator.imitation *= scale
+        return simulator
+    
+    def calibrate(
+        self,
+        trajectories: Sequence[Trajectory],
+        start_year: int,
+        rounds: int = CALIBRATION_ROUNDS
+    ) -> np.ndarray:
+        """Rescale the hazard of every practice to track its observed trend.
+        
+        Each round simulates from ``start_year`` to the last observed year
+        and multiplies the hazard of a practice by the ratio of its observed
+        to its simulated gain in adoption since ``start_year``, summed over
+        the observed years. Practices without observations after
+        ``start_year`` keep their hazard. The population and random stream
+        are reset after every round.
+        
+        Args:
+            trajectories: Observed adoption share (in percent of all farms)
+                of every practice
+            start_year: First simulated year
+            rounds: Number of pilot runs
+        
+        Returns:
+            Total scale applied to the hazard of every practice
+        """
+        end_year = int(max(trajectory.years.max() for trajectory in trajectories))
+        initial = self.population.adopted.copy()
+        rng_state = self.rng.bit_generator.state
+        scale = np.ones(len(trajectories), dtype=np.float32)
+        for _ in range(rounds if end_year > start_year else 0):
+            shares = [100.0 * self.population.adopted.mean(axis=0)]
+            for year in range(start_year, end_year):
+                self.step(year)
+                shares.append(100.0 * self.population.adopted.mean(axis=0))
+            shares = np.stack(shares)
+            self.population.adopted = initial.copy()
+            self.rng.bit_generator.state = rng_state
+            
+            factor = np.ones_like(scale)
+            for i, trajectory in enumerate(trajectories):
+                observed = (trajectory.years > start_year) & (trajectory.years <= end_year)
+                simulated = shares[trajectory.years[observed] - start_year, i] - shares[0, i]
+                target = trajectory.values[observed] - shares[0, i]
+                if simulated.sum() > 0 and target.sum() > 0:
+                    factor[i] = np.clip(target.sum() / simulated.sum(), 0.2, 5.0)
+            self.innovation *= factor
+            self.imitation *= factor
+            scale *= factor
+        return scale
+    
+    def hazard(self, year: float) -> np.ndarray:
+        """Adoption hazard of every farm and practice at a given time.
+        
+        Args:
+            year: Current (fractional) year
+        
+        Returns:
+            Array of shape [n_farms, n_practices]
+        """
+        peer_share = self.graph @ self.population.adopted.astype(np.float32)
+        hazard = self.innovation + (self.imitation / self.ceiling) * peer_share
+        hazard *= self.size_factor
+        if self.financing is not None:
+            hazard *= 1.0 + self.financing_effect * float(self.financing.at(year)) / 100
+        return hazard
+    
+    def step(self, year: float, dt: float = 1.0) -> None:
+        """Advance the population by one time step.
+        
+        Args:
+            year: Year at the start of the step
+            dt: Step length in years
+        """
+        population = self.population
+        probability = -np.expm1(-self.hazard(year) * dt)
+        draws = self.rng.random(probability.shape, dtype=np.float32)
+        population.adopted |= population.eligible & (draws < probability)
+    
+    def run(self, start_year: int, end_year: int, dt: float = 1.0) -> np.ndarray:
+        """Simulate adoption over a horizon.
+        
+        Args:
+            start_year: First simulated year
+            end_year: Last simulated year (inclusive)
+            dt: Step length in years
+        
+        Returns:
+            Adoption shares in percent of shape [n_steps, n_regions, n_practices],
+            starting with the initial state
+        """
+        n_steps = int(np.floor((end_year - start_year) / dt + 1e-9))
+        shares = [self.population.adoption_share()]
+        for k in range(n_steps):
+            self.step(start_year + k * dt, dt)
+            shares.append(self.population.adoption_share())
+        return np.stack(shares)
@@ -0,0 +1,484 @@
+"""Least-cost nutrient flows through the fertilizer supply network.
+
+The network of plants, ports, warehouses and demand regions is turned into
+one sparse linear program that is built once and re-solved every year with
+HiGHS. Only the year-dependent vectors change between years (demand,
+capacities and transport costs), so the constraint matrix is never rebuilt.
+With ``highspy`` installed the same HiGHS instance is modified in place and
+each solve starts from the previous year's optimal basis; otherwise each
+year is solved with ``scipy.optimize.linprog(method="highs")`` on the
+prebuilt matrices.
+
+Variables are the flow on every arc, the production of every plant and the
+unmet demand of every region (priced at ``UNMET_DEMAND_PENALTY`` so every
+year stays feasible). Rows are the flow balance of every node and the
+throughput limit of every port and warehouse.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from models.base_model import Trajectory
+from models.manufacturing_supply_chain_models import ManufacturingAndSupplyChainReconfiguration
+
+NODE_TYPES: Tuple[str, ...] = ("plant", "port", "warehouse", "region")
+PLANT, PORT, WAREHOUSE, REGION = range(len(NODE_TYPES))
+
+# Cost per tonne of demand left unserved, well above any delivered cost
+UNMET_DEMAND_PENALTY = 1e4
+
+LP_BACKENDS = ("auto", "highspy", "scipy")
+
+# HiGHS model status reported for every ``linprog`` status code, so both
+# backends share one vocabulary
+LINPROG_STATUS = {
+    0: "Optimal",
+    1: "Iteration limit reached",
+    2: "Infeasible",
+    3: "Unbounded",
+    4: "Solve error",
+}
+
+
+@dataclass
+class SupplyNetwork:
+    """Nodes and arcs of a supply network as parallel arrays.
+    
+    Attributes:
+        names: Node names
+        node_type: Index into ``NODE_TYPES`` of every node
+        capacity: Production capacity of plants and throughput capacity of
+            ports and warehouses, in tonnes per year (unused for regions)
+        cost: Production cost of plants and handling cost of ports and
+            warehouses, per tonne
+        demand: Base-year demand of regions in tonnes (0 for other nodes)
+        demand_growth: Annual demand growth rate of every node
+        arc_from: Source node of every arc
+        arc_to: Destination node of every arc
+        arc_cost: Transport cost of every arc per tonne
+        arc_capacity: Capacity of every arc in tonnes per year (inf if unlimited)
+    """
+    
+    names: List[str]
+    node_type: np.ndarray
+    capacity: np.ndarray
+    cost: np.ndarray
+    demand: np.ndarray
+    demand_growth: np.ndarray
+    arc_from: np.ndarray
+    arc_to: np.ndarray
+    arc_cost: np.ndarray
+    arc_capacity: np.ndarray
+    
+    @property
+    def n_nodes(self) -> int:
+        return len(self.names)
+    
+    @property
+    def n_arcs(self) -> int:
+        return len(self.arc_from)
+    
+    def nodes_of(self, node_type: int) -> np.ndarray:
+        """Indices of the nodes of one type."""
+        return np.flatnonzero(self.node_type == node_type)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SupplyNetwork":
+        """Create a network from a configuration mapping.
+        
+        Args:
+            config: Mapping with a ``nodes`` list (name, type, and capacity,
+                cost, demand, demand_growth where relevant) and an ``arcs``
+                list (from, to, cost and optional capacity)
+        
+        Returns:
+            Supply network
+        """
+        nodes = config["nodes"]
+        names = [node["name"] for node in nodes]
+        index = {name: i for i, name in enumerate(names)}
+        arcs = config.get("arcs", [])
+        return cls(
+            names=names,
+            node_type=np.array([NODE_TYPES.index(node["type"]) for node in nodes], dtype=np.int8),
+            capacity=np.array([node.get("capacity", np.inf) for node in nodes], dtype=np.float64),
+            cost=np.array([node.get("cost", 0.0) for node in nodes], dtype=np.float64),
+            demand=np.array([node.get("demand", 0.0) for node in nodes], dtype=np.float64),
+            demand_growth=np.array([node.get("demand_growth", 0.0) for node in nodes], dtype=np.float64),
+            arc_from=np.array([index[arc["from"]] for arc in arcs], dtype=np.int64),
+            arc_to=np.array([index[arc["to"]] for arc in arcs], dtype=np.int64),
+            arc_cost=np.array([arc["cost"] for arc in arcs], dtype=np.float64),
+            arc_capacity=np.array([arc.get("capacity", np.inf) for arc in arcs], dtype=np.float64)
+        )
+    
+    @classmethod
+    def synthetic(
+        cls,
+        n_plants: int,
+        n_ports: int,
+        n_warehouses: int,
+        n_regions: int,
+        connections: int = 3,
+        seed: Optional[int] = None
+    ) -> "SupplyNetwork":
+        """Draw a random layered network (plants -> ports -> warehouses -> regions).
+        
+        Nodes are placed at random on a unit square and every node is linked
+        to its ``connections`` nearest nodes in the next layer, with
+        transport cost proportional to distance. Plants can also ship
+        directly to their nearest warehouses.
+        
+        Args:
+            n_plants: Number of plants
+            n_ports: Number of ports
+            n_warehouses: Number of warehouses
+            n_regions: Number of demand regions
+            connections: Arcs from each node to the next layer
+            seed: Random seed
+        
+        Returns:
+            Supply network with total capacity about 20% above demand
+        """
+        rng = np.random.default_rng(seed)
+        counts = (n_plants, n_ports, n_warehouses, n_regions)
+        node_type = np.repeat(np.arange(len(NODE_TYPES)), counts).astype(np.int8)
+        position = rng.random((len(node_type), 2))
+        demand = np.where(node_type == REGION, rng.lognormal(np.log(1e5), 0.5, len(node_type)), 0.0)
+        
+        # Plants share 120% of demand; hubs can each handle a generous share of it
+        total = demand.sum()
+        capacity = np.select(
+            [node_type == PLANT, node_type == PORT, node_type == WAREHOUSE],
+            [1.2 * total / n_plants * rng.uniform(0.5, 1.5, len(node_type)),
+             2.0 * total / n_ports, 2.0 * total / n_warehouses],
+            np.inf
+        )
+        cost = np.select(
+            [node_type == PLANT, node_type == PORT, node_type == WAREHOUSE],
+            [rng.uniform(150, 350, len(node_type)), np.full(len(node_type), 8.0), np.full(len(node_type), 5.0)],
+            0.0
+        )
+        
+        layers = [np.flatnonzero(node_type == t) for t in range(len(NODE_TYPES))]
+        links = list(zip(layers[:-1], layers[1:])) + [(layers[PLANT], layers[WAREHOUSE])]
+        arc_from, arc_to = [], []
+        for sources, targets in links:
+            k = min(connections, len(targets))
+            distance = np.linalg.norm(position[sources, None] - position[None, targets], axis=-1)
+            nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+            arc_from.append(np.repeat(sources, k))
+            arc_to.append(targets[nearest].ravel())
+        arc_from, arc_to = np.concatenate(arc_from), np.concatenate(arc_to)
+        arc_cost = 5.0 + 100.0 * np.linalg.norm(position[arc_from] - position[arc_to], axis=1)
+        
+        names = [f"{NODE_TYPES[t]}_{i}" for t, count in enumerate(counts) for i in range(count)]
+        return cls(
+            names=names,
+            node_type=node_type,
+            capacity=capacity,
+            cost=cost,
+            demand=demand,
+            demand_growth=np.where(node_type == REGION, rng.uniform(0.0, 0.03, len(node_type)), 0.0),
+            arc_from=arc_from,
+            arc_to=arc_to,
+            arc_cost=arc_cost,
+            arc_capacity=np.full(len(arc_from), np.inf)
+        )
+
+
+@dataclass
+class YearInputs:
+    """Year-dependent inputs of the flow problem.
+    
+    Attributes:
+        demand: Demand of every region node, in tonnes
+        plant_capacity: Production capacity of every plant node
+        hub_capacity: Throughput capacity of every port and warehouse node
+        transport_multiplier: Factor applied to every arc's transport cost
+    """
+    
+    demand: np.ndarray
+    plant_capacity: np.ndarray
+    hub_capacity: np.ndarray
+    transport_multiplier: float = 1.0
+
+
+@dataclass
+class FlowSolution:
+    """Optimal flows of one year.
+    
+    ``status`` is the HiGHS model status (``"Optimal"``, ``"Infeasible"``,
+    ``"Unbounded"``, ...) whichever backend solved the year.
+    """
+    
+    year: int
+    status: str
+    total_cost: float
+    flows: np.ndarray
+    production: np.ndarray
+    unmet_demand: np.ndarray
+    iterations: int = 0
+    
+    def to_dict(self, network: SupplyNetwork, tolerance: float = 1e-6) -> Dict[str, Any]:
+        """Summarize the solution with node names, keeping only non-zero flows."""
+        plants, regions = network.nodes_of(PLANT), network.nodes_of(REGION)
+        used = np.flatnonzero(self.flows > tolerance)
+        return {
+            "year": self.year,
+            "status": self.status,
+            "total_cost": self.total_cost,
+            "production": {network.names[i]: float(v) for i, v in zip(plants, self.production)},
+            "unmet_demand": {network.names[i]: float(v) for i, v in zip(regions, self.unmet_demand)},
+            "flows": [
+                {"from": network.names[network.arc_from[a]], "to": network.names[network.arc_to[a]],
+                 "tonnes": float(self.flows[a])}
+                for a in used
+            ]
+        }
+
+
+@dataclass
+class SupplyScenarioDrivers:
+    """Trends that move the network inputs over time, all in percent.
+    
+    Attributes:
+        transport_cost_reduction: Reduction of transport costs
+        hub_capacity_increase: Increase of port and warehouse throughput
+        plant_capacity_change: Change of plant production capacity
+    """
+    
+    transport_cost_reduction: Optional[Trajectory] = None
+    hub_capacity_increase: Optional[Trajectory] = None
+    plant_capacity_change: Optional[Trajectory] = None
+    
+    @staticmethod
+    def _mean(trajectories: Sequence[Optional[Trajectory]]) -> Optional[Trajectory]:
+        trajectories = [t for t in trajectories if t is not None and len(t)]
+        if not trajectories:
+            return None
+        years = np.unique(np.concatenate([t.years for t in trajectories]))
+        return Trajectory(years=years, values=np.mean([t.at(years) for t in trajectories], axis=0))
+    
+    @classmethod
+    def from_model(cls, model: ManufacturingAndSupplyChainReconfiguration) -> "SupplyScenarioDrivers":
+        """Derive the drivers from a supply chain reconfiguration model.
+        
+        Logistics optimization trends reduce transport costs, resilience
+        enhancement trends add hub throughput and supply/demand balance
+        trends change plant capacity; entries of each kind are averaged.
+        """
+        return cls(
+            transport_cost_reduction=cls._mean([
+                item.potential_innovation_or_development.trajectory for item in model.logistics_optimization
+            ]),
+            hub_capacity_increase=cls._mean([
+                item.implementation_or_improvement.trajectory for item in model.supply_chain_resilience_enhancement
+            ]),
+            plant_capacity_change=cls._mean([
+                item.reconfiguration_or_management_approach.trajectory
+                for item in model.supply_demand_balance_evolution
+            ])
+        )
+    
+    def inputs(self, network: SupplyNetwork, year: int, base_year: int) -> YearInputs:
+        """Network inputs of one year."""
+        def percent(trajectory: Optional[Trajectory]) -> float:
+            return 0.0 if trajectory is None else float(trajectory.at(year)) / 100
+        
+        regions = network.nodes_of(REGION)
+        hubs = np.flatnonzero((network.node_type == PORT) | (network.node_type == WAREHOUSE))
+        growth = (1.0 + network.demand_growth[regions]) ** (year - base_year)
+        return YearInputs(
+            demand=network.demand[regions] * growth,
+            plant_capacity=network.capacity[network.nodes_of(PLANT)] * (1.0 + percent(self.plant_capacity_change)),
+            hub_capacity=network.capacity[hubs] * (1.0 + percent(self.hub_capacity_increase)),
+            transport_multiplier=max(1.0 - percent(self.transport_cost_reduction), 0.0)
+        )
+
+
+class SupplyChainSolver:
+    """Solves the least-cost flow problem of a network year after year."""
+    
+    def __init__(
+        self,
+        network: SupplyNetwork,
+        backend: str = "auto",
+        unmet_penalty: float = UNMET_DEMAND_PENALTY
+    ) -> None:
+        """Build the sparse linear program of a network.
+        
+        Args:
+            network: Supply network
+            backend: ``"highspy"`` for warm-started solves of one HiGHS
+                instance, ``"scipy"`` for ``linprog`` or ``"auto"`` to use
+                highspy when it is installed
+            unmet_penalty: Cost per tonne of unmet demand
+        """
+        if backend not in LP_BACKENDS:
+            raise ValueError(f"Unknown LP backend '{backend}', expected one of {LP_BACKENDS}")
+        self.network = network
+        self.plants = network.nodes_of(PLANT)
+        self.regions = network.nodes_of(REGION)
+        self.hubs = np.flatnonzero((network.node_type == PORT) | (network.node_type == WAREHOUSE))
+        n_nodes, n_arcs = network.n_nodes, network.n_arcs
+        n_plants, n_regions, n_hubs = len(self.plants), len(self.regions), len(self.hubs)
+        
+        # Column blocks: arc flows, plant production, unmet regional demand
+        self.flow_cols = np.arange(n_arcs)
+        self.production_cols = n_arcs + np.arange(n_plants)
+        self.unmet_cols = n_arcs + n_plants + np.arange(n_regions)
+        n_cols = n_arcs + n_plants + n_regions
+        
+        # Row blocks: node balances (inflow - outflow + production + unmet = demand),
+        # then hub throughput (inflow <= capacity)
+        arcs = np.arange(n_arcs)
+        hub_row = np.full(n_nodes, -1)
+        hub_row[self.hubs] = n_nodes + np.arange(n_hubs)
+        into_hub = hub_row[network.arc_to] >= 0
+        rows = np.concatenate([
+            network.arc_to, network.arc_from, self.plants, self.regions, hub_row[network.arc_to[into_hub]]
+        ])
+        cols = np.concatenate([arcs, arcs, self.production_cols, self.unmet_cols, arcs[into_hub]])
+        values = np.concatenate([
+            np.ones(n_arcs), -np.ones(n_arcs), np.ones(n_plants), np.ones(n_regions), np.ones(into_hub.sum())
+        ])
+        self.matrix = sparse.csc_matrix((values, (rows, cols)), shape=(n_nodes + n_hubs, n_cols))
+        self.balance_rows = np.arange(n_nodes)
+        self.hub_rows = n_nodes + np.arange(n_hubs)
+        
+        # Handling costs are paid on the flow entering a hub
+        self.transport_cost = network.arc_cost
+        self.handling_cost = np.where(into_hub, network.cost[network.arc_to], 0.0)
+        self.cost = np.concatenate([
+            self.transport_cost + self.handling_cost, network.cost[self.plants], np.full(n_regions, unmet_penalty)
+        ])
+        self.col_lower = np.zeros(n_cols)
+        self.col_upper = np.concatenate([network.arc_capacity, network.capacity[self.plants], np.full(n_regions, np.inf)])
+        self.row_lower = np.zeros(self.matrix.shape[0])
+        self.row_upper = np.zeros(self.matrix.shape[0])
+        self.row_lower[self.hub_rows] = -np.inf
+        self.row_upper[self.hub_rows] = network.capacity[self.hubs]
+        
+        self.backend = self._resolve_backend(backend)
+        self._highs = None
+    
+    @staticmethod
+    def _resolve_backend(backend: str) -> str:
+        if backend == "scipy":
+            return backend
+        try:
+            import highspy  # noqa: F401
+        except ImportError:
+            if backend == "highspy":
+                raise
+            return "scipy"
+        return "highspy"
+    
+    def _apply(self, inputs: YearInputs) -> None:
+        """Write the year-dependent inputs into the LP vectors."""
+        self.cost[self.flow_cols] = self.transport_cost * inputs.transport_multiplier + self.handling_cost
+        self.col_upper[self.production_cols] = inputs.plant_capacity
+        self.row_lower[self.regions] = self.row_upper[self.regions] = inputs.demand
+        self.row_upper[self.hub_rows] = inputs.hub_capacity
+    
+    def _solve_highspy(self) -> Tuple[str, float, np.ndarray, int]:
+        import highspy
+        
+        if self._highs is None:
+            highs = highspy.Highs()
+            highs.setOptionValue("output_flag", False)
+            lp = highspy.HighsLp()
+            lp.num_col_, lp.num_row_ = self.matrix.shape[1], self.matrix.shape[0]
+            lp.col_cost_, lp.col_lower_, lp.col_upper_ = self.cost, self.col_lower, self.col_upper
+            lp.row_lower_, lp.row_upper_ = self.row_lower, self.row_upper
+            lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+            lp.a_matrix_.start_ = self.matrix.indptr
+            lp.a_matrix_.index_ = self.matrix.indices
+            lp.a_matrix_.value_ = self.matrix.data
+            highs.passModel(lp)
+            self._highs = highs
+        else:
+            # Modifying costs and bounds keeps the current basis, so the
+            # simplex solve starts from last year's optimum
+            highs = self._highs
+            flow_and_production = np.concatenate([self.flow_cols, self.production_cols])
+            highs.changeColsCost(len(self.flow_cols), self.flow_cols, self.cost[self.flow_cols])
+            highs.changeColsBounds(
+                len(flow_and_production), flow_and_production,
+                self.col_lower[flow_and_production], self.col_upper[flow_and_production]
+            )
+            changed_rows = np.concatenate([self.regions, self.hub_rows])
+            highs.changeRowsBounds(
+                len(changed_rows), changed_rows, self.row_lower[changed_rows], self.row_upper[changed_rows]
+            )
+        
+        highs.run()
+        status = highs.modelStatusToString(highs.getModelStatus())
+        info = highs.getInfo()
+        return status, info.objective_function_value, np.asarray(highs.getSolution().col_value), info.simplex_iteration_count
+    
+    def _solve_scipy(self) -> Tuple[str, float, np.ndarray, int]:
+        from scipy.optimize import linprog
+        
+        matrix = self.matrix.tocsr()
+        equality = self.row_lower == self.row_upper
+        result = linprog(
+            self.cost,
+            A_ub=matrix[~equality], b_ub=self.row_upper[~equality],
+            A_eq=matrix[equality], b_eq=self.row_upper[equality],
+            bounds=np.column_stack((self.col_lower, self.col_upper)),
+            method="highs"
+        )
+        x = result.x if result.x is not None else np.full(matrix.shape[1], np.nan)
+        status = LINPROG_STATUS.get(result.status, "Unknown")
+        return status, float(result.fun) if result.success else np.nan, x, int(result.nit)
+    
+    def solve_year(self, year: int, inputs: YearInputs) -> FlowSolution:
+        """Solve the flow problem of one year.
+        
+        Args:
+            year: Year of the inputs
+            inputs: Demand, capacities and cost factor of the year
+        
+        Returns:
+            Optimal flows of the year
+        """
+        self._apply(inputs)
+        solve = self._solve_highspy if self.backend == "highspy" else self._solve_scipy
+        status, total_cost, x, iterations = solve()
+        return FlowSolution(
+            year=year,
+            status=status,
+            total_cost=total_cost,
+            flows=x[self.flow_cols],
+            production=x[self.production_cols],
+            unmet_demand=x[self.unmet_cols],
+            iterations=iterations
+        )
+    
+    def solve(
+        self,
+        years: Sequence[int],
+        drivers: Optional[SupplyScenarioDrivers] = None
+    ) -> List[FlowSolution]:
+        """Solve consecutive years, each starting from the previous solution.
+        
+        Args:
+            years: Years to solve, in order
+            drivers: Trends moving the inputs (none keeps only demand growth)
+        
+        Returns:
+            Optimal flows of every year
+            
+        Raises:
+            ValueError: If ``years`` is empty
+        """
+        years = list(years)
+        if not years:
+            raise ValueError("At least one year is needed to solve the supply network")
+        drivers = drivers or SupplyScenarioDrivers()
+        base_year = years[0]
+        return [self.solve_year(year, drivers.inputs(self.network, year, base_year)) for year in years]
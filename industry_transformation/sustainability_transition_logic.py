@@ -1,4 +1,477 @@
-# This module will contain logic related to sustainability transition.
-# It will likely use models from models.sustainability_transition_models
+"""Diffusion curves for sustainable fertilizer and technology adoption.
 
-pass 
\ No newline at end of file
+Every ``FertilizerAdoption`` and ``TechnologyPenetration`` entry is fitted to
+a logistic or Bass curve, and all curves are stored as parameter arrays so
+they can be evaluated together as one broadcast NumPy computation over
+(technology x region x year x replicate).
+
+Both curve families share one parameterization. A Bass curve with
+innovation coefficient ``p`` and imitation coefficient ``q``, launched at
+``t0``, factors into a logistic term and a launch term::
+
+    F(t) = K * (1 - exp(-r * (t - t0))) / (1 + exp(-r * (t - tm)))
+
+with ``r = p + q`` and ``tm = t0 + ln(q / p) / r``. A logistic curve is the
+limit ``t0 -> -inf``, where the launch term is 1.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.special import expit
+
+from models.base_model import Trajectory
+from models.sustainability_transition_models import (
+    FertilizerAdoption,
+    SustainabilityTransition,
+    TechnologyPenetration,
+)
+
+# Share of the ceiling reached by the largest observed value when the
+# ceiling is not given explicitly
+SATURATION = 0.9
+
+# Bounds keeping fitted shares strictly inside (0, ceiling)
+_SHARE_EPS = 1e-3
+
+# Smallest innovation coefficient of a fitted Bass curve
+MIN_INNOVATION = 1e-4
+
+# Levenberg-Marquardt iterations refining Bass fits on the observed points
+BASS_ITERATIONS = 50
+
+DIFFUSION_METHODS = ("logistic", "bass")
+
+
+@dataclass
+class DiffusionCurves:
+    """Parameters of a set of adoption curves, one entry per technology.
+    
+    Attributes:
+        names: Technology (or fertilizer type) names
+        ceiling: Saturation share in percent
+        rate: Growth rate per year (``p + q`` for Bass curves)
+        midpoint: Inflection year of the logistic term
+        launch: Launch year of Bass curves (``-inf`` for logistic curves)
+    """
+    
+    names: List[str]
+    ceiling: np.ndarray
+    rate: np.ndarray
+    midpoint: np.ndarray
+    launch: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    @classmethod
+    def logistic(
+        cls,
+        names: Sequence[str],
+        ceiling: np.ndarray,
+        rate: np.ndarray,
+        midpoint: np.ndarray
+    ) -> "DiffusionCurves":
+        """Create logistic curves."""
+        ceiling, rate, midpoint = np.broadcast_arrays(
+            *(np.asarray(a, dtype=np.float64) for a in (ceiling, rate, midpoint))
+        )
+        return cls(list(names), ceiling.copy(), rate.copy(), midpoint.copy(), np.full(len(names), -np.inf))
+    
+    @classmethod
+    def bass(
+        cls,
+        names: Sequence[str],
+        ceiling: np.ndarray,
+        innovation: np.ndarray,
+        imitation: np.ndarray,
+        launch: np.ndarray
+    ) -> "DiffusionCurves":
+        """Create Bass curves from their innovation (p) and imitation (q) coefficients."""
+        ceiling, p, q, launch = np.broadcast_arrays(
+            *(np.asarray(a, dtype=np.float64) for a in (ceiling, innovation, imitation, launch))
+        )
+        rate = p + q
+        # ln(q / p) is -inf for q = 0 (pure innovation), where the logistic term is 1
+        with np.errstate(divide="ignore"):
+            midpoint = launch + np.log(q / p) / rate
+        return cls(list(names), ceiling.copy(), rate, midpoint, launch.copy())
+    
+    @classmethod
+    def concat(cls, *curves: "DiffusionCurves") -> "DiffusionCurves":
+        """Join several curve sets into one."""
+        return cls(
+            [name for c in curves for name in c.names],
+            *(np.concatenate([getattr(c, field) for c in curves])
+              for field in ("ceiling", "rate", "midpoint", "launch"))
+        )
+    
+    @property
+    def innovation(self) -> np.ndarray:
+        """Bass innovation coefficient p (0 for logistic and flat curves)."""
+        with np.errstate(over="ignore", invalid="ignore"):
+            innovation = self.rate / (1.0 + np.exp(self.rate * (self.midpoint - self.launch)))
+        return np.where(self.rate == 0, 0.0, innovation)
+    
+    @property
+    def imitation(self) -> np.ndarray:
+        """Bass imitation coefficient q (the rate for logistic curves)."""
+        return self.rate - self.innovation
+    
+    def evaluate(
+        self,
+        years: Sequence[float],
+        region_ceiling: Optional[Sequence[float]] = None,
+        region_lag: Optional[Sequence[float]] = None,
+        ceiling_scale: Optional[np.ndarray] = None,
+        rate_scale: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Evaluate every curve in one broadcast computation.
+        
+        Args:
+            years: Years to evaluate (may be fractional)
+            region_ceiling: Multiplier of the ceiling per region (defaults to
+                a single region with multiplier 1)
+            region_lag: Adoption delay per region in years
+            ceiling_scale: Multiplier of the ceiling per replicate, of shape
+                [n_replicates] or [n_curves, n_replicates]
+            rate_scale: Multiplier of the rate per replicate, shaped like
+                ``ceiling_scale``
+        
+        Returns:
+            Adoption shares in percent, of shape
+            [n_curves, n_regions, n_years, n_replicates]
+        """
+        years = np.asarray(years, dtype=np.float64)
+        region_ceiling = np.ones(1) if region_ceiling is None else np.asarray(region_ceiling, dtype=np.float64)
+        region_lag = np.zeros_like(region_ceiling) if region_lag is None else np.asarray(region_lag, dtype=np.float64)
+        
+        def per_replicate(scale: Optional[np.ndarray]) -> np.ndarray:
+            # -> [n_curves or 1, 1, 1, n_replicates]
+            scale = np.ones(1) if scale is None else np.asarray(scale, dtype=np.float64)
+            return np.atleast_2d(scale)[:, np.newaxis, np.newaxis, :]
+        
+        def per_curve(values: np.ndarray) -> np.ndarray:
+            return values[:, np.newaxis, np.newaxis, np.newaxis]
+        
+        # Regional lag delays adoption: [1, n_regions, n_years, 1]
+        t = (years[np.newaxis, :] - region_lag[:, np.newaxis])[np.newaxis, :, :, np.newaxis]
+        rate = per_curve(self.rate) * per_replicate(rate_scale)
+        ceiling = (
+            per_curve(self.ceiling)
+            * region_ceiling[np.newaxis, :, np.newaxis, np.newaxis]
+            * per_replicate(ceiling_scale)
+        )
+        
+        shares = expit(rate * (t - per_curve(self.midpoint)))
+        launched = np.isfinite(self.launch)
+        if launched.any():
+            since_launch = np.maximum(t - np.where(launched, self.launch, 0.0)[:, None, None, None], 0.0)
+            shares = shares * np.where(
+                per_curve(launched), -np.expm1(-rate * since_launch), 1.0
+            )
+        return np.minimum(ceiling * shares, 100.0)
+
+
+def _ceiling(values: np.ndarray, mask: np.ndarray, forecast: np.ndarray) -> np.ndarray:
+    """Choose the saturation share of each curve.
+    
+    Uses the forecast maximum where one is given (NaN otherwise), and
+    otherwise scales the largest observed value by ``SATURATION``.
+    """
+    observed = np.where(mask, values, -np.inf).max(axis=1)
+    ceiling = np.where(np.isnan(forecast), observed / SATURATION, forecast)
+    # The ceiling must stay above every observation for the logit to exist
+    ceiling = np.maximum(ceiling, observed * (1 + _SHARE_EPS))
+    return np.clip(ceiling, _SHARE_EPS, 100.0)
+
+
+def _masked_linear_fit(
+    x: np.ndarray, y: np.ndarray, mask: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit ``y = intercept + slope * x`` for every row at once, ignoring masked points.
+    
+    Rows without any point get a zero intercept and slope, and rows whose
+    points share one ``x`` get a zero slope through the mean of ``y``.
+    """
+    w = mask.astype(np.float64)
+    # Empty rows divide by one instead of zero; their sums are zero anyway
+    n = np.maximum(w.sum(axis=1), 1.0)
+    x_mean = (w * x).sum(axis=1) / n
+    y_mean = (w * y).sum(axis=1) / n
+    dx = np.where(mask, x - x_mean[:, np.newaxis], 0.0)
+    dy = np.where(mask, y - y_mean[:, np.newaxis], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    slope = np.divide((dx * dy).sum(axis=1), sxx, out=np.zeros_like(sxx), where=sxx > 0)
+    return y_mean - slope * x_mean, slope
+
+
+def fit_logistic(
+    names: Sequence[str],
+    years: np.ndarray,
+    values: np.ndarray,
+    mask: np.ndarray,
+    ceiling: np.ndarray
+) -> DiffusionCurves:
+    """Fit logistic curves to padded observations by logit regression.
+    
+    Args:
+        names: Curve names
+        years: Observation years of shape [n, max_points]
+        values: Observed shares in percent, same shape
+        mask: Which observations are real
+        ceiling: Saturation share of each curve
+    
+    Returns:
+        Fitted logistic curves
+    """
+    share = np.clip(values / ceiling[:, np.newaxis], _SHARE_EPS, 1 - _SHARE_EPS)
+    intercept, rate = _masked_linear_fit(years, np.log(share / (1 - share)), mask)
+    # Declining series give negative rates; constant ones have no inflection,
+    # and a zero-rate logistic sits at half its ceiling everywhere
+    flat = rate == 0
+    midpoint = np.divide(-intercept, rate, out=np.zeros_like(rate), where=~flat)
+    ceiling = np.where(flat, 2 * ceiling * expit(intercept), ceiling)
+    return DiffusionCurves.logistic(names, ceiling, rate, midpoint)
+
+
+def _bass_shares(
+    years: np.ndarray,
+    ceiling: np.ndarray,
+    p: np.ndarray,
+    q: np.ndarray,
+    launch: np.ndarray
+) -> np.ndarray:
+    """Evaluate one Bass curve per row at years of shape [n, points]."""
+    since_launch = np.maximum(years - launch[:, np.newaxis], 0.0)
+    decay = np.exp(-(p + q)[:, np.newaxis] * since_launch)
+    return ceiling[:, np.newaxis] * (1 - decay) / (1 + (q / p)[:, np.newaxis] * decay)
+
+
+def _refine_bass(
+    years: np.ndarray,
+    values: np.ndarray,
+    mask: np.ndarray,
+    ceiling: np.ndarray,
+    p: np.ndarray,
+    q: np.ndarray,
+    launch: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Least-squares fit of (p, q, launch) on the observed points of every row.
+    
+    Runs ``BASS_ITERATIONS`` Levenberg-Marquardt steps on all rows at once,
+    over (ln p, ln(q + MIN_INNOVATION), launch) so both coefficients stay
+    non-negative, with a forward-difference Jacobian. A row only moves when
+    its squared error decreases.
+    """
+    def unpack(theta: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            np.maximum(np.exp(theta[:, 0]), MIN_INNOVATION),
+            np.maximum(np.exp(theta[:, 1]) - MIN_INNOVATION, 0.0),
+            theta[:, 2]
+        )
+    
+    def residuals(theta: np.ndarray) -> np.ndarray:
+        return np.where(mask, _bass_shares(years, ceiling, *unpack(theta)) - values, 0.0)
+    
+    theta = np.column_stack((np.log(p), np.log(q + MIN_INNOVATION), launch))
+    error = residuals(theta)
+    cost = (error ** 2).sum(axis=1)
+    damping = np.full(len(theta), 1e-2)
+    steps = np.eye(3) * 1e-6
+    for _ in range(BASS_ITERATIONS):
+        jacobian = np.stack([(residuals(theta + h) - error) / 1e-6 for h in steps], axis=2)
+        normal = np.einsum("nmi,nmj->nij", jacobian, jacobian)
+        gradient = np.einsum("nmi,nm->ni", jacobian, error)
+        diagonal = np.einsum("nii->ni", normal)
+        system = normal + (damping[:, np.newaxis] * diagonal + 1e-12)[:, :, np.newaxis] * np.eye(3)
+        trial = theta - np.linalg.solve(system, gradient[:, :, np.newaxis])[:, :, 0]
+        trial_error = residuals(trial)
+        trial_cost = (trial_error ** 2).sum(axis=1)
+        better = trial_cost < cost
+        theta = np.where(better[:, np.newaxis], trial, theta)
+        error = np.where(better[:, np.newaxis], trial_error, error)
+        cost = np.where(better, trial_cost, cost)
+        damping = np.where(better, damping / 3, damping * 4)
+    return unpack(theta)
+
+
+def fit_bass(
+    names: Sequence[str],
+    years: np.ndarray,
+    values: np.ndarray,
+    mask: np.ndarray,
+    ceiling: np.ndarray
+) -> DiffusionCurves:
+    """Fit Bass curves to padded observations.
+    
+    Uses the Bass relation ``-d ln(K - F) / dt = p + (q / K) F``, which
+    is linear in F, on consecutive observations, and places the launch year
+    so the curve passes through the first observation. Series where the fit
+    gives a negative imitation coefficient, or with a single pair of
+    observations, fall back to pure innovation, which then passes through
+    both points. Series with more points start from that estimate and are
+    refined by least squares on every observed point, so the curve is not
+    pinned to the first one. Series with a single observation have no growth
+    to fit and fall back to the logistic fit.
+    
+    Args:
+        names: Curve names
+        years: Observation years of shape [n, max_points]
+        values: Observed shares in percent, same shape
+        mask: Which observations are real
+        ceiling: Saturation share of each curve
+    
+    Returns:
+        Fitted Bass curves
+    """
+    k = ceiling[:, np.newaxis]
+    step = np.diff(years, axis=1)
+    pair_mask = mask[:, 1:] & (step > 0)
+    # Integrated over a step, -d ln(K - F) / dt = p + (q / K) F holds with F
+    # at its average over the step, which is exact for pure innovation
+    remaining = np.log(k - values)
+    hazard = np.divide(
+        -np.diff(remaining, axis=1), step, out=np.zeros_like(step), where=pair_mask
+    )
+    level = (values[:, :-1] + values[:, 1:]) / 2
+    p, slope = _masked_linear_fit(level, hazard, pair_mask)
+    p = np.maximum(p, MIN_INNOVATION)
+    q = np.maximum(slope * ceiling, 0.0)
+    
+    # Years since launch at which the curve reaches the first observation
+    first = np.clip(values[:, 0] / ceiling, 0.0, 1 - _SHARE_EPS)
+    since_launch = -np.log((1 - first) / (1 + q / p * first)) / (p + q)
+    launch = years[:, 0] - since_launch
+    
+    refine = pair_mask.sum(axis=1) >= 2
+    if refine.any():
+        refined = _refine_bass(
+            years[refine], values[refine], mask[refine], ceiling[refine],
+            p[refine], q[refine], launch[refine]
+        )
+        for estimate, value in zip((p, q, launch), refined):
+            estimate[refine] = value
+    curves = DiffusionCurves.bass(names, ceiling, p, q, launch)
+    
+    single = ~pair_mask.any(axis=1)
+    if single.any():
+        logistic = fit_logistic(names, years, values, mask, ceiling)
+        for field in ("ceiling", "rate", "midpoint", "launch"):
+            setattr(curves, field, np.where(single, getattr(logistic, field), getattr(curves, field)))
+    return curves
+
+
+def fit_curves(
+    names: Sequence[str],
+    trajectories: Sequence[Trajectory],
+    forecast: Optional[Sequence[float]] = None,
+    method: str = "logistic"
+) -> DiffusionCurves:
+    """Fit diffusion curves to many trajectories at once.
+    
+    Args:
+        names: Curve names
+        trajectories: Observed adoption trajectories (in percent)
+        forecast: Saturation share of each curve, NaN where unknown
+        method: ``"logistic"`` or ``"bass"``
+    
+    Returns:
+        Fitted curves
+    """
+    if method not in DIFFUSION_METHODS:
+        raise ValueError(f"Unknown diffusion method '{method}', expected one of {DIFFUSION_METHODS}")
+    if not trajectories:
+        return DiffusionCurves.logistic([], np.empty(0), np.empty(0), np.empty(0))
+    
+    years, values, mask = Trajectory.stack(trajectories)
+    forecast = np.full(len(trajectories), np.nan) if forecast is None else np.asarray(forecast, dtype=np.float64)
+    ceiling = _ceiling(values, mask, forecast)
+    fit = fit_bass if method == "bass" else fit_logistic
+    return fit(names, years, values, mask, ceiling)
+
+
+def fertilizer_adoption_curves(
+    adoptions: Sequence[FertilizerAdoption],
+    start_year: int
+) -> DiffusionCurves:
+    """Fit logistic curves to fertilizer market growth ranges.
+    
+    Each curve starts at ``min_percentage`` in ``start_year`` and reaches
+    ``max_percentage`` in its ``target_year``, where it is at
+    ``SATURATION`` of its ceiling.
+    
+    Args:
+        adoptions: Fertilizer adoption entries
+        start_year: First simulated year
+    
+    Returns:
+        Logistic curves, one per entry
+    """
+    names = [adoption.fertilizer_type for adoption in adoptions]
+    initial = np.array([a.market_growth.min_percentage for a in adoptions], dtype=np.float64)
+    target = np.array([a.market_growth.max_percentage for a in adoptions], dtype=np.float64)
+    target_year = np.array([a.target_year for a in adoptions], dtype=np.float64)
+    
+    ceiling = np.clip(target / SATURATION, _SHARE_EPS, 100.0)
+    years = np.column_stack((np.full(len(adoptions), float(start_year)), target_year))
+    values = np.column_stack((initial, target))
+    # A target in the start year is fitted through the target alone
+    mask = np.column_stack((target_year != start_year, np.ones(len(adoptions), dtype=bool)))
+    return fit_logistic(names, years, values, mask, ceiling)
+
+
+def technology_penetration_curves(
+    penetrations: Sequence[TechnologyPenetration],
+    method: str = "logistic"
+) -> DiffusionCurves:
+    """Fit diffusion curves to technology penetration trends.
+    
+    Entries without an adoption trend are skipped. A ``penetration_forecast``
+    sets the curve's ceiling to its ``max_percentage``.
+    
+    Args:
+        penetrations: Technology penetration entries
+        method: ``"logistic"`` or ``"bass"``
+    
+    Returns:
+        Fitted curves named "technology (category)"
+    """
+    entries = [
+        p for p in penetrations
+        if p.adoption_rate is not None
+        and p.adoption_rate.trajectory is not None
+        and len(p.adoption_rate.trajectory)
+    ]
+    return fit_curves(
+        [f"{p.technology_name} ({p.category})" for p in entries],
+        [p.adoption_rate.trajectory for p in entries],
+        [p.penetration_forecast.max_percentage if p.penetration_forecast else np.nan for p in entries],
+        method
+    )
+
+
+def sustainability_curves(
+    transition: SustainabilityTransition,
+    start_year: int,
+    method: str = "logistic"
+) -> DiffusionCurves:
+    """Fit the curves of every adoption entry of a sustainability transition.
+    
+    Args:
+        transition: Validated sustainability transition model
+        start_year: First simulated year
+        method: Curve family of the technology penetration trends
+    
+    Returns:
+        Fertilizer adoption curves followed by technology penetration curves
+    """
+    return DiffusionCurves.concat(
+        fertilizer_adoption_curves(transition.fertilizer_adoption_curves, start_year),
+        technology_penetration_curves(
+            transition.controlled_release_tech_penetration
+            + transition.precision_application_tech_adoption,
+            method
+        )
+    )
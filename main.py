@@ -2,25 +2,13 @@ import json
 import typer
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-import pandas as pd
-import plotly.express as px
 from datetime import datetime
-import webbrowser
-
-# Core models
-from models.base_model import Trend, PercentageRange, SimulationPeriod
-from models.sustainability_transition_models import SustainabilityTransition
-from models.production_technology_models import ProductionTechnologyAndProcessInnovation
-from models.client_need_transformation_models import ClientNeedTransformation
-from models.manufacturing_supply_chain_models import ManufacturingAndSupplyChainReconfiguration
-
-# Simulation components
-from simulation.runner import SimulationRunner
-from simulation.scenarios import load_scenario
-from analysis.visualization import plot_simulation_results
-from analysis.report_generator import generate_report
+
 from config import settings
 
+# Models, simulation and reporting components are imported inside the
+# commands that use them, so lightweight commands start quickly.
+
 app = typer.Typer(help="Fertilizer Industry Simulation Framework")
 
 
@@ -42,52 +30,104 @@ def run_simulation(
     scenario: str = typer.Argument("baseline", help="Name of scenario to run"),
     output_dir: str = typer.Option("reports/results", help="Directory to save results"),
     visualize: bool = typer.Option(True, help="Generate visualizations"),
-    save_results: bool = typer.Option(True, help="Save simulation results")
+    save_results: bool = typer.Option(True, help="Save simulation results"),
+    monte_carlo: bool = typer.Option(False, help="Add Monte Carlo percentile bands to the results"),
+    n_simulations: Optional[int] = typer.Option(
+        None, help="Number of Monte Carlo replicates (defaults to DEFAULT_NUM_SIMULATIONS)"
+    ),
+    ensemble: bool = typer.Option(
+        False,
+        help="Write the Monte Carlo replicates to a memory-mapped ensemble under ENSEMBLE_DIR "
+             "(implies --monte-carlo)"
+    ),
+    streaming: bool = typer.Option(
+        False,
+        help="Summarize Monte Carlo replicates with online aggregators in constant memory "
+             "(implies --monte-carlo)"
+    ),
+    workers: int = typer.Option(
+        1, help="Worker processes of the streaming Monte Carlo (needs --streaming, not --ensemble)"
+    ),
+    seed: Optional[int] = typer.Option(None, help="Root random seed (defaults to DEFAULT_SEED)"),
+    store: bool = typer.Option(False, help="Append the run to the Parquet results store"),
+    cache: bool = typer.Option(True, help="Reuse the cached parse and validation of the scenario"),
+    profile: bool = typer.Option(
+        False, help="Time every stage and write a Chrome trace next to the results"
+    )
 ) -> None:
     """Run a simulation with the specified scenario."""
+    if workers > 1 and (not streaming or ensemble):
+        print("❌ --workers only applies to --streaming runs without --ensemble")
+        raise typer.Exit(1)
+    
     print(f"🚀 Starting simulation for scenario: {scenario}")
+    monte_carlo = monte_carlo or ensemble or streaming
+    
+    from models.base_model import model_to_dict, write_json
+    from simulation.runner import SimulationRunner
+    from simulation.scenario_cache import load_validated_scenario
+    from simulation.scenarios import load_scenario
+    from utils.profiling import profiler
+    
+    run_name = f"{scenario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if profile:
+        profiler.enable()
     
     try:
         # Load scenario configuration
-        scenario_config = load_scenario(scenario)
-        
-        # Initialize and run simulation
-        runner = SimulationRunner(scenario_config)
-        print("🚀 Initializing simulation models...")
-        runner.initialize_models()
+        with profiler.span("load_scenario", scenario=scenario, cache=cache):
+            if cache:
+                scenario_config, models = load_validated_scenario(scenario)
+            else:
+                scenario_config, models = load_scenario(scenario), None
         
-        print("🔍 Running simulation...")
-        results = runner.run()
-        print("✅ Simulation completed successfully!")
+        # Initialize and run simulation, reusing the cached models
+        with profiler.span("run"):
+            runner = SimulationRunner(scenario_config, seed=seed)
+            results = runner.run(models=models)
         
-        # Convert results to serializable format
-        def convert_to_serializable(obj):
-            if hasattr(obj, 'dict'):
-                return obj.dict()
-            elif isinstance(obj, (list, tuple)):
-                return [convert_to_serializable(item) for item in obj]
-            elif isinstance(obj, dict):
-                return {key: convert_to_serializable(value) for key, value in obj.items()}
-            elif hasattr(obj, '__dict__'):
-                return {key: convert_to_serializable(value) for key, value in obj.__dict__.items()}
-            return obj
+        if monte_carlo:
+            print("🎲 Running Monte Carlo replicates...")
+            with profiler.span("monte_carlo"):
+                if ensemble:
+                    ensemble_path = settings.ENSEMBLE_DIR / run_name
+                    mapped = runner.write_ensemble(ensemble_path, n_simulations)
+                    results["monte_carlo"] = mapped.to_results(streaming=streaming)
+                    print(f"🗃️ Ensemble written to {ensemble_path}")
+                elif streaming:
+                    results["monte_carlo"] = runner.stream_monte_carlo(n_simulations, max_workers=workers)
+                else:
+                    results["monte_carlo"] = runner.run_monte_carlo(n_simulations)
+            print(f"✅ Completed {results['monte_carlo']['metadata']['n_simulations']} replicates")
         
-        serializable_results = convert_to_serializable(results)
+        # Convert results to serializable format in one compiled pass
+        with profiler.span("serialize"):
+            serializable_results = model_to_dict(results, exclude_none=True)
         
         # Save results if requested
         if save_results:
-            output_path = Path(output_dir) / f"{scenario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            output_path = Path(output_dir) / f"{run_name}.json"
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(serializable_results, f, indent=2, ensure_ascii=False)
+            with profiler.span("write_results"):
+                write_json(serializable_results, output_path, indent=2)
             print(f"💾 Results saved to {output_path}")
         
+        if store:
+            from simulation.results_store import ResultsStore
+            with profiler.span("store_run"):
+                run_id = ResultsStore().append_run(results, scenario)
+            print(f"🗄️ Run {run_id} appended to {settings.RESULTS_STORE_DIR}")
+        
         # Generate visualizations if requested
         if visualize:
             try:
+                import webbrowser
+                from analysis.report_generator import generate_report
+                
                 print("📊 Generating comprehensive report...")
                 report_dir = Path("reports") / "html"
-                report_path = generate_report(serializable_results, report_dir)
+                with profiler.span("report"):
+                    report_path = generate_report(serializable_results, report_dir)
                 print(f"📄 Report generated at: {report_path}")
                 
                 # Open the report in the default web browser
@@ -107,6 +147,16 @@ def run_simulation(
     except Exception as e:
         print(f"❌ Error running simulation: {str(e)}")
         raise typer.Exit(1)
+    
+    finally:
+        if profile:
+            profiler.disable()
+            trace_path = profiler.write(Path(output_dir) / f"{run_name}_trace.json")
+            print(f"⏱️ Profile written to {trace_path}")
+            for name, stats in profiler.summary().items():
+                print(f"   {name:<32} {stats['calls']:>4.0f} × {stats['total_ms']:>10.2f} ms")
+            for name, value in profiler.counters.items():
+                print(f"   {name:<32} {value:>g}")
 
 
 @app.command()
@@ -122,11 +172,120 @@ def list_scenarios() -> None:
         print(f"- {scenario_file.stem}")
 
 
+@app.command()
+def sweep(
+    pattern: str = typer.Argument("*", help="Glob pattern of scenario names to sweep"),
+    param: List[str] = typer.Option(
+        [], "--param", "-p",
+        help="Parameter grid axis as path=values, e.g. "
+             "sustainability.fertilizer_adoption_curves.*.market_growth.min_percentage=5:15:5"
+    ),
+    workers: Optional[int] = typer.Option(None, help="Number of worker processes"),
+    seed: Optional[int] = typer.Option(None, help="Root random seed shared by all variants"),
+    output_dir: str = typer.Option("reports/results", help="Directory to save results")
+) -> None:
+    """Run every scenario variant of a parameter sweep in parallel."""
+    from simulation.sweep import parse_param_grid, run_sweep
+    
+    try:
+        grid = parse_param_grid(param)
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        raise typer.Exit(1)
+    
+    output_path = Path(output_dir) / f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    print(f"🚀 Sweeping scenarios matching '{pattern}' over {len(grid)} parameter(s)...")
+    
+    try:
+        failures = run_sweep(pattern, grid, output_path, max_workers=workers, seed=seed)
+    except FileNotFoundError as e:
+        print(f"❌ {str(e)}")
+        raise typer.Exit(1)
+    
+    print(f"💾 Sweep results saved to {output_path}")
+    if failures:
+        print(f"⚠️ {failures} variant(s) failed, see the error field in the results")
+
+
+@app.command()
+def sensitivity(
+    scenario: str = typer.Argument("baseline", help="Name of scenario to analyse"),
+    method: str = typer.Option("sobol", help="Design and indices: sobol or morris"),
+    samples: int = typer.Option(
+        256, help="Base sample size (sobol, n * (d + 2) runs) or trajectories (morris, n * (d + 1) runs)"
+    ),
+    output: List[str] = typer.Option(
+        ["final_adoption_share", "emissions_reduction"], "--output", "-o",
+        help="Summary metric to analyse"
+    ),
+    include: List[str] = typer.Option(
+        [], "--include", "-i", help="Glob pattern of the scenario inputs to sample (default: all numeric inputs)"
+    ),
+    relative_range: float = typer.Option(0.2, help="Relative half-width of the sampling ranges"),
+    workers: Optional[int] = typer.Option(None, help="Number of worker processes"),
+    seed: Optional[int] = typer.Option(None, help="Seed of the design and the runs"),
+    output_dir: str = typer.Option("reports/results", help="Directory to save results")
+) -> None:
+    """Rank the scenario inputs driving summary metrics (Sobol or Morris)."""
+    from analysis.sensitivity import run_sensitivity
+    from models.base_model import write_json
+    from simulation.scenarios import load_scenario
+    
+    try:
+        config = load_scenario(scenario)
+        print(f"🚀 Running {method} sensitivity analysis of '{scenario}'...")
+        results = run_sensitivity(
+            config, method=method, n=samples, outputs=output, include=include or None,
+            relative_range=relative_range, max_workers=workers, seed=seed
+        )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {str(e)}")
+        raise typer.Exit(1)
+    
+    output_path = Path(output_dir) / f"sensitivity_{scenario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    write_json(results, output_path, indent=2)
+    print(f"💾 Sensitivity indices of {len(results['parameters'])} inputs "
+          f"({results['n_evaluations']} runs) saved to {output_path}")
+    if results["n_failed"]:
+        print(f"⚠️ {results['n_failed']} run(s) did not validate and were skipped")
+    
+    rank_by = "ST" if method == "sobol" else "mu_star"
+    for name, indices in results["indices"].items():
+        top = sorted(indices.items(), key=lambda item: -abs(item[1][rank_by]))[:5]
+        print(f"\n{name} (top inputs by {rank_by}):")
+        for path, values in top:
+            print(f"  {values[rank_by]:8.3f}  {path}")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+    port: int = typer.Option(8080, help="Port to listen on"),
+    workers: Optional[int] = typer.Option(None, help="Number of warm worker processes"),
+    preload: str = typer.Option(
+        "*", help="Glob pattern of scenarios every worker validates on startup"
+    )
+) -> None:
+    """Serve simulation jobs over HTTP from a pool of warm workers."""
+    try:
+        from aiohttp import web
+    except ImportError:
+        print("❌ The simulation service needs aiohttp: pip install -e .[service]")
+        raise typer.Exit(1)
+    from simulation.scenarios import list_scenarios
+    from simulation.service import SimulationService, create_app
+    
+    scenarios = sorted(list_scenarios(preload))
+    service = SimulationService(max_workers=workers, scenarios=scenarios)
+    print(f"🚀 Starting {service.max_workers} worker(s) with {len(scenarios)} preloaded scenario(s)...")
+    web.run_app(create_app(service), host=host, port=port)
+
+
 @app.command()
 def show_config() -> None:
     """Show the current configuration."""
     print("\nCurrent configuration:")
-    print(json.dumps(settings.model_dump(), indent=2))
+    print(json.dumps(settings.model_dump(mode="json"), indent=2))
 
 
 @app.command()
@@ -134,7 +293,22 @@ def demo() -> None:
     """Run a demo simulation with example data."""
     print("Running demo simulation...")
     # Run with a simple demo scenario
-    run_simulation("demo", visualize=True, save_results=True)
+    # Called directly, so every option needs a real value instead of its typer default
+    run_simulation(
+        "demo",
+        output_dir="reports/results",
+        visualize=True,
+        save_results=True,
+        monte_carlo=False,
+        n_simulations=None,
+        ensemble=False,
+        streaming=False,
+        workers=1,
+        seed=None,
+        store=False,
+        cache=True,
+        profile=False
+    )
 
 
 if __name__ == "__main__":
@@ -1,45 +1,110 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Tuple, Dict, Any, Union, TypeVar, Type, Callable
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import core_schema, to_json, to_jsonable_python
+from typing import List, Optional, Tuple, Dict, Any, Union, TypeVar, Iterator, Sequence
 import json
-from datetime import datetime, date, time
+import numpy as np
 from decimal import Decimal
-from enum import Enum
-from uuid import UUID
+from pathlib import Path
 
 T = TypeVar('T')
 
-def model_to_dict(model: Any) -> Any:
-    """Recursively convert a model to a dictionary."""
-    if isinstance(model, (str, int, float, bool, type(None))):
-        return model
-    if isinstance(model, (datetime, date, time)):
-        return model.isoformat()
-    if isinstance(model, Decimal):
-        return float(model)
-    if isinstance(model, (list, tuple)):
-        return [model_to_dict(item) for item in model]
-    if isinstance(model, dict):
-        return {key: model_to_dict(value) for key, value in model.items()}
-    if hasattr(model, 'model_dump'):
-        return model_to_dict(model.model_dump())
-    if hasattr(model, 'dict'):
-        return model_to_dict(model.dict())
-    if hasattr(model, '__dict__'):
-        return model_to_dict(model.__dict__)
-    return str(model)
+def _json_fallback(obj: Any) -> Any:
+    """Convert values the compiled JSON serializers do not handle natively."""
+    if isinstance(obj, Trajectory):
+        return obj.to_list()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, '__dict__'):
+        return obj.__dict__
+    return str(obj)
+
+def model_to_dict(model: Any, exclude_none: bool = False) -> Any:
+    """Convert a model, or any structure containing models, to JSON-compatible data.
+    
+    Uses pydantic-core's compiled serializer in a single pass.
+    
+    Args:
+        model: Model, container or scalar to convert
+        exclude_none: Drop ``None`` fields of nested models
+        
+    Returns:
+        Nested dicts, lists and scalars
+    """
+    return to_jsonable_python(model, exclude_none=exclude_none, fallback=_json_fallback)
+
+def to_json_bytes(
+    obj: Any,
+    indent: Optional[int] = None,
+    exclude_none: bool = False,
+    backend: str = "auto"
+) -> bytes:
+    """Serialize a result tree straight to JSON bytes.
+    
+    Args:
+        obj: Model, container or scalar to serialize
+        indent: Indentation of the output (``None`` for compact output)
+        exclude_none: Drop ``None`` fields of nested models
+        backend: ``"orjson"``, ``"pydantic"`` or ``"auto"`` to use orjson when
+            it is installed and supports the requested indentation
+            
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if backend in ("auto", "orjson") and indent in (None, 2):
+        try:
+            import orjson
+        except ImportError:
+            if backend == "orjson":
+                raise
+        else:
+            def default(value: Any) -> Any:
+                if isinstance(value, BaseModel):
+                    return value.model_dump(mode="json", exclude_none=exclude_none)
+                return _json_fallback(value)
+            
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=default, option=option)
+    
+    return to_json(obj, indent=indent, exclude_none=exclude_none, fallback=_json_fallback)
+
+def write_json(
+    obj: Any,
+    path: Union[str, Path],
+    indent: Optional[int] = None,
+    exclude_none: bool = False,
+    backend: str = "auto"
+) -> Path:
+    """Serialize a result tree and write the bytes to a file.
+    
+    Args:
+        obj: Model, container or scalar to serialize
+        path: Output file
+        indent: Indentation of the output (``None`` for compact output)
+        exclude_none: Drop ``None`` fields of nested models
+        backend: JSON backend, see :func:`to_json_bytes`
+        
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.write_bytes(to_json_bytes(obj, indent=indent, exclude_none=exclude_none, backend=backend))
+    return path
 
 class SerializableModel(BaseModel):
     """Base model with enhanced JSON serialization support."""
     
     def dict(self, *args, **kwargs) -> Dict[str, Any]:
         """Convert model to dictionary with proper handling of nested models."""
-        if hasattr(super(), 'model_dump'):
-            # Pydantic v2
-            result = super().model_dump(*args, **{**kwargs, 'exclude_none': True})
-        else:
-            # Pydantic v1
-            result = super().dict(*args, **{**kwargs, 'exclude_none': True})
-        return model_to_dict(result)
+        return super().model_dump(*args, **{**kwargs, 'mode': 'json', 'exclude_none': True})
     
     def json(self, *args, **kwargs) -> str:
         """Convert model to JSON string with support for nested models and custom types."""
@@ -57,8 +122,201 @@ class PercentageRange(SerializableModel):
     min_percentage: float = Field(..., ge=0, le=100)
     max_percentage: float = Field(..., ge=0, le=100)
 
+class Trajectory:
+    """Array-backed time series of (year, value) points.
+    
+    Years are stored as ``int16`` and values as ``float64`` NumPy arrays. When
+    used as a pydantic field the raw input is only checked to be a sequence;
+    conversion to arrays (and the element-wise checks) happen on first access.
+    """
+    
+    __slots__ = ("_raw", "_years", "_values")
+    
+    def __init__(self, points: Any = None, *, years: Any = None, values: Any = None):
+        """Create a trajectory from (year, value) pairs or from paired arrays.
+        
+        Args:
+            points: Sequence of (year, value) pairs, an array of shape [n, 2]
+                or a ``{"years": [...], "values": [...]}`` mapping
+            years: Years, when given separately from ``values``
+            values: Values, when given separately from ``years``
+        """
+        self._years: Optional[np.ndarray] = None
+        self._values: Optional[np.ndarray] = None
+        if years is not None or values is not None:
+            points = {"years": years, "values": values}
+        self._raw = [] if points is None else points
+    
+    def _materialize(self) -> None:
+        """Convert the raw input into sorted year and value arrays."""
+        raw = self._raw
+        if isinstance(raw, dict):
+            years = np.asarray(raw["years"], dtype=np.float64).ravel()
+            values = np.asarray(raw["values"], dtype=np.float64).ravel()
+            if years.shape != values.shape:
+                raise ValueError("Trajectory years and values must have the same length")
+        else:
+            points = np.asarray(raw, dtype=np.float64)
+            if points.size == 0:
+                points = points.reshape(0, 2)
+            if points.ndim != 2 or points.shape[1] != 2:
+                raise ValueError("Trajectory must be a sequence of (year, value) pairs")
+            years, values = points[:, 0], points[:, 1]
+        
+        if not np.array_equal(years, np.round(years)):
+            raise ValueError("Trajectory years must be integers")
+        order = np.argsort(years, kind="stable")
+        self._years = years[order].astype(np.int16)
+        self._values = np.ascontiguousarray(values[order])
+        self._raw = None
+    
+    @property
+    def years(self) -> np.ndarray:
+        """Years of the trajectory points (``int16``)."""
+        if self._years is None:
+            self._materialize()
+        return self._years
+    
+    @property
+    def values(self) -> np.ndarray:
+        """Values of the trajectory points (``float64``)."""
+        if self._values is None:
+            self._materialize()
+        return self._values
+    
+    def __len__(self) -> int:
+        return len(self.years)
+    
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self.years.tolist(), self.values.tolist())
+    
+    def __getitem__(self, index: int) -> Tuple[int, float]:
+        return int(self.years[index]), float(self.values[index])
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Trajectory):
+            return NotImplemented
+        return np.array_equal(self.years, other.years) and np.array_equal(self.values, other.values)
+    
+    def __repr__(self) -> str:
+        return f"Trajectory({self.to_list()!r})"
+    
+    def __getstate__(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.years, self.values
+    
+    def __setstate__(self, state: Tuple[np.ndarray, np.ndarray]) -> None:
+        self._raw = None
+        self._years, self._values = state
+    
+    def at(self, year: Any) -> Any:
+        """Linearly interpolate the trajectory at one or more years.
+        
+        Years outside the trajectory take the nearest end value.
+        
+        Args:
+            year: A year or an array of years
+            
+        Returns:
+            Interpolated value(s), NaN for an empty trajectory
+        """
+        if len(self) == 0:
+            return np.full(np.shape(year), np.nan) if np.ndim(year) else np.nan
+        return np.interp(year, self.years, self.values)
+    
+    @property
+    def slope(self) -> float:
+        """Least-squares slope of the values per year (0.0 for fewer than two points)."""
+        if len(self) < 2:
+            return 0.0
+        years = self.years.astype(np.float64)
+        centered = years - years.mean()
+        return float(centered @ (self.values - self.values.mean()) / (centered @ centered))
+    
+    def resample(self, years: Any = None, step: int = 1) -> "Trajectory":
+        """Interpolate the trajectory onto new years.
+        
+        Args:
+            years: Target years (defaults to every ``step`` years between the
+                first and last point)
+            step: Spacing of the default target years
+            
+        Returns:
+            New trajectory evaluated at the target years
+        """
+        if years is None:
+            years = np.arange(self.years[0], self.years[-1] + 1, step) if len(self) else []
+        years = np.asarray(years)
+        return Trajectory(years=years, values=self.at(years))
+    
+    def to_list(self) -> List[List[Union[int, float]]]:
+        """Return the points as a list of [year, value] pairs."""
+        return [list(point) for point in self]
+    
+    @staticmethod
+    def stack(trajectories: Sequence["Trajectory"]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pack trajectories of different lengths into padded 2-D arrays.
+        
+        Rows are padded by repeating their last point, so padded segments are
+        flat and interpolation past the end holds the last value.
+        
+        Args:
+            trajectories: Non-empty trajectories
+            
+        Returns:
+            Years (``float64``) and values of shape [n, max_points] and a
+            boolean mask of the real (unpadded) points
+        """
+        counts = np.array([len(trajectory) for trajectory in trajectories], dtype=np.intp)
+        width = int(counts.max()) if len(counts) else 0
+        years = np.empty((len(counts), width))
+        values = np.empty((len(counts), width))
+        for i, trajectory in enumerate(trajectories):
+            years[i] = np.pad(trajectory.years, (0, width - counts[i]), mode="edge")
+            values[i] = np.pad(trajectory.values, (0, width - counts[i]), mode="edge")
+        return years, values, np.arange(width) < counts[:, np.newaxis]
+    
+    @classmethod
+    def coerce(cls, value: Any) -> Optional["Trajectory"]:
+        """Return ``value`` as a trajectory, passing ``None`` through."""
+        if value is None or isinstance(value, cls):
+            return value
+        return cls(value)
+    
+    @classmethod
+    def _validate(cls, value: Any) -> "Trajectory":
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (list, tuple, dict, np.ndarray)):
+            return cls(value)
+        raise ValueError("Trajectory must be a sequence of (year, value) pairs")
+    
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda trajectory: trajectory.to_list(), when_used="json"
+            )
+        )
+    
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> JsonSchemaValue:
+        return {
+            "type": "array",
+            "items": {
+                "type": "array",
+                "prefixItems": [{"type": "integer"}, {"type": "number"}],
+                "minItems": 2,
+                "maxItems": 2
+            }
+        }
+
 class Trend(SerializableModel):
     name: str
     description: Optional[str] = None
     # Example: [(year, value), (year, value)]
-    trajectory: Optional[List[Tuple[int, float]]] = None
\ No newline at end of file
+    trajectory: Optional[Trajectory] = None
@@ -58,12 +58,20 @@ setup(
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
             "pytest-mock>=3.0.0",
+            "aiohttp>=3.9.0",
             "black>=23.0.0",
             "isort>=5.10.0",
             "mypy>=1.0.0",
             "flake8>=6.0.0",
             "pre-commit>=3.3.0",
         ],
+        "fast": [
+            "orjson>=3.9.0",
+            "highspy>=1.7.0",
+        ],
+        "service": [
+            "aiohttp>=3.9.0",
+        ],
         "docs": [
             "sphinx>=5.0.0",
             "sphinx-rtd-theme>=1.0.0",
@@ -6,6 +6,8 @@ from typing import Dict, Any, List, Optional
 # Ensure the simulation directory exists
 Path(__file__).parent.mkdir(exist_ok=True)
 
-__all__ = ["SimulationRunner", "load_scenario"]
+__all__ = ["SimulationRunner", "IncrementalRunner", "load_scenario", "ResultsStore"]
 
 from .runner import SimulationRunner, load_scenario
+from .graph import IncrementalRunner
+from .results_store import ResultsStore
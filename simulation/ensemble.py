@@ -0,0 +1,245 @@
+"""Memory-mapped Monte Carlo ensembles on disk.
+
+An ensemble directory holds ``values.npy``, one array of shape
+[metric, replicate, year], and ``ensemble.json``, a small header naming the
+axes. Replicates are drawn and written in chunks straight into the
+memory-mapped array, so an ensemble never has to fit in memory, and readers
+map the file and only touch the slices they use.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.streaming import StreamingBands
+from .runner import DEFAULT_PERCENTILES, compute_summary_metrics, percentile_bands
+
+if TYPE_CHECKING:
+    from .runner import SimulationRunner
+
+# Bump when the layout of ensemble directories changes
+ENSEMBLE_FORMAT_VERSION = 1
+
+HEADER_FILE = "ensemble.json"
+VALUES_FILE = "values.npy"
+
+# Axis order of the values array
+AXES: Tuple[str, ...] = ("metric", "replicate", "year")
+
+# Replicates drawn and written per chunk
+DEFAULT_CHUNK_SIZE = 65536
+
+# Component of the summary metrics in metric names ("<component>.<metric>")
+SUMMARY = "summary"
+
+
+class Ensemble:
+    """Read-only view of an ensemble directory.
+    
+    Attributes:
+        path: Ensemble directory
+        header: Parsed ``ensemble.json``
+        values: Memory-mapped array of shape [metric, replicate, year]
+    """
+    
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Map an ensemble directory.
+        
+        Args:
+            path: Ensemble directory
+        
+        Raises:
+            FileNotFoundError: If the directory has no ensemble header
+            ValueError: If the ensemble was written by an incompatible version
+        """
+        self.path = Path(path)
+        with open(self.path / HEADER_FILE, "r", encoding="utf-8") as f:
+            self.header: Dict[str, Any] = json.load(f)
+        if self.header.get("format_version") != ENSEMBLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported ensemble format: {self.header.get('format_version')}")
+        self.values: np.ndarray = np.load(self.path / VALUES_FILE, mmap_mode="r")
+        self._index = {name: i for i, name in enumerate(self.metrics)}
+    
+    @property
+    def metrics(self) -> List[str]:
+        """Metric names, as ``<component>.<metric>``."""
+        return self.header["axes"]["metric"]
+    
+    @property
+    def years(self) -> List[int]:
+        return self.header["axes"]["year"]
+    
+    @property
+    def n_replicates(self) -> int:
+        return self.header["axes"]["replicate"]
+    
+    def metric(
+        self,
+        name: str,
+        replicates: Union[slice, Sequence[int], np.ndarray] = slice(None)
+    ) -> np.ndarray:
+        """Return the draws of one metric.
+        
+        Args:
+            name: Metric name, as ``<component>.<metric>``
+            replicates: Replicates to read (all by default)
+        
+        Returns:
+            Array of shape [replicates, year]; a slice stays a lazy view of
+            the file, an index array reads only those rows
+        """
+        if name not in self._index:
+            raise KeyError(f"Unknown ensemble metric '{name}', expected one of {self.metrics}")
+        return self.values[self._index[name], replicates]
+    
+    def iter_chunks(
+        self,
+        name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """Iterate over one metric in blocks of replicates.
+        
+        Yields:
+            First replicate of the block and the block, of shape
+            [chunk, year]
+        """
+        for start in range(0, self.n_replicates, chunk_size):
+            yield start, np.asarray(self.metric(name, slice(start, start + chunk_size)))
+    
+    def mean(self, name: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """Yearly mean of a metric, accumulated chunk by chunk."""
+        total = np.zeros(len(self.years))
+        for _, block in self.iter_chunks(name, chunk_size):
+            total += block.sum(axis=0, dtype=np.float64)
+        return total / self.n_replicates
+    
+    def bands(
+        self,
+        name: str,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Dict[str, List[float]]:
+        """Yearly mean and percentile bands of one metric.
+        
+        Only the draws of this metric are read (one contiguous block of the
+        file). With ``streaming``, they are read ``chunk_size`` replicates at
+        a time into online aggregators instead of being loaded at once, and
+        the percentiles are approximate.
+        """
+        if not streaming:
+            return percentile_bands(np.asarray(self.metric(name), dtype=np.float64), percentiles)
+        aggregate = StreamingBands(len(self.years))
+        for _, block in self.iter_chunks(name, chunk_size):
+            aggregate.update({name: block})
+        return aggregate.bands(percentiles)[name]
+    
+    def to_results(
+        self,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        streaming: bool = False
+    ) -> Dict[str, Any]:
+        """Summarize the ensemble like ``SimulationRunner.run_monte_carlo``.
+        
+        Bands are computed one metric at a time (see :meth:`bands`).
+        
+        Returns:
+            Dictionary with the ``metadata``, the ``metrics`` bands of every
+            sub-model and the ``summary_metrics`` bands
+        """
+        results: Dict[str, Any] = {
+            "metadata": {
+                "n_simulations": self.n_replicates,
+                "seed": self.header["seed"],
+                "percentiles": list(percentiles),
+                "years": self.years,
+                "ensemble": str(self.path),
+            },
+            "metrics": {},
+            "summary_metrics": {},
+        }
+        for name in self.metrics:
+            component, _, metric = name.partition(".")
+            target = results["summary_metrics"] if component == SUMMARY else \
+                results["metrics"].setdefault(component, {})
+            target[metric] = self.bands(name, percentiles, streaming)
+        return results
+
+
+def write_ensemble(
+    runner: "SimulationRunner",
+    path: Union[str, Path],
+    n_simulations: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dtype: Union[str, np.dtype] = np.float64
+) -> Ensemble:
+    """Draw a Monte Carlo ensemble straight into a memory-mapped file.
+    
+    Replicates are drawn ``chunk_size`` at a time from the runner's
+    per-replicate random streams, so the values are identical to those of
+    ``run_monte_carlo`` regardless of the chunk size.
+    
+    Args:
+        runner: Runner of the scenario, built so the integrated state feeds
+            the summary metrics
+        path: Ensemble directory (created)
+        n_simulations: Number of replicates (defaults to the runner's)
+        chunk_size: Replicates drawn and written per chunk
+        dtype: Stored value type (``float32`` halves the file size)
+    
+    Returns:
+        The written ensemble, mapped read-only
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    n_simulations = n_simulations or runner.n_simulations
+    n_years = len(runner.years)
+    
+    state = runner.state
+    if state is None and runner.is_built:
+        state = runner.kernel.run(runner.state_forcing())
+    state_metrics = state.summary_metrics() if state is not None else None
+    
+    # Metric names follow the draws of a single replicate
+    probe = runner.draw_replicates(0, 1)
+    metrics = [f"{component}.{name}" for component, samples in probe.items() for name in samples]
+    summary_names = list(compute_summary_metrics(probe, state_metrics))
+    metrics += [f"{SUMMARY}.{name}" for name in summary_names]
+    
+    values = np.lib.format.open_memmap(
+        path / VALUES_FILE, mode="w+", dtype=dtype, shape=(len(metrics), n_simulations, n_years)
+    )
+    for start in range(0, n_simulations, chunk_size):
+        stop = min(start + chunk_size, n_simulations)
+        samples = runner.draw_replicates(start, stop)
+        summary = compute_summary_metrics(samples, state_metrics)
+        rows = [values for component_samples in samples.values() for values in component_samples.values()]
+        rows += [np.broadcast_to(summary[name], (stop - start, n_years)) for name in summary_names]
+        for i, row in enumerate(rows):
+            values[i, start:stop] = row
+    values.flush()
+    del values
+    
+    header = {
+        "format_version": ENSEMBLE_FORMAT_VERSION,
+        "created": datetime.now().isoformat(),
+        "seed": runner.seed,
+        "dtype": np.dtype(dtype).name,
+        "axes_order": list(AXES),
+        "axes": {
+            "metric": metrics,
+            "replicate": n_simulations,
+            "year": runner.years.tolist(),
+        },
+    }
+    with open(path / HEADER_FILE, "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+    return Ensemble(path)
+
+
+def open_ensemble(path: Union[str, Path]) -> Ensemble:
+    """Map an ensemble directory written by :func:`write_ensemble`."""
+    return Ensemble(path)
@@ -0,0 +1,315 @@
+"""Dependency-tracked, memoized evaluation of a simulation run."""
+
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from simulation.runner import (
+    MODEL_SECTIONS,
+    SimulationRunner,
+    build_models,
+    summarize_results,
+)
+from simulation.sweep import set_config_value
+
+# Memoized node outputs kept per graph
+DEFAULT_CACHE_SIZE = 256
+
+# Scenario keys that shape a run besides the sub-model sections
+PERIOD_KEYS: Tuple[str, ...] = ("start_year", "end_year", "seed")
+KERNEL_KEYS: Tuple[str, ...] = ("start_year", "end_year", "time_step", "adjustment_time")
+
+
+def fingerprint(value: Any) -> str:
+    """Return a stable SHA-256 hex digest of a JSON-like value."""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Node:
+    """A step of the evaluation graph.
+    
+    Attributes:
+        name: Unique node name
+        compute: Called with the configuration and the outputs of ``deps``
+        deps: Names of the nodes whose outputs this node consumes
+        reads: Extracts the part of the configuration the node depends on
+    """
+    
+    name: str
+    compute: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    reads: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+
+class EvaluationGraph:
+    """Evaluates nodes in dependency order, memoizing every output.
+    
+    Each node's key hashes the configuration it reads together with the keys
+    of its dependencies, so a key changes exactly when something upstream
+    changed. Outputs are cached by key, and an evaluation only recomputes
+    nodes whose key is not cached.
+    """
+    
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        """Initialize an empty graph.
+        
+        Args:
+            cache_size: Number of node outputs kept (least recently used first out)
+        """
+        self.nodes: Dict[str, Node] = {}
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self.recomputed: List[str] = []
+    
+    def add(
+        self,
+        name: str,
+        compute: Callable[..., Any],
+        deps: Sequence[str] = (),
+        reads: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> "EvaluationGraph":
+        """Add a node after all of its dependencies.
+        
+        Returns:
+            The graph, for chaining
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node '{name}'")
+        unknown = [dep for dep in deps if dep not in self.nodes]
+        if unknown:
+            raise ValueError(f"Node '{name}' depends on unknown nodes: {unknown}")
+        self.nodes[name] = Node(name, compute, tuple(deps), reads)
+        return self
+    
+    def keys(self, config: Dict[str, Any]) -> Dict[str, str]:
+        """Compute the memoization key of every node for a configuration."""
+        keys: Dict[str, str] = {}
+        for node in self.nodes.values():
+            reads = fingerprint(node.reads(config)) if node.reads else ""
+            keys[node.name] = fingerprint([node.name, reads] + [keys[dep] for dep in node.deps])
+        return keys
+    
+    def evaluate(
+        self,
+        config: Dict[str, Any],
+        targets: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Evaluate the graph, recomputing only nodes whose inputs changed.
+        
+        The names of the recomputed nodes are left in ``recomputed``.
+        Outputs are the memoized objects themselves, shared with later
+        evaluations, so callers must not modify them.
+        
+        Args:
+            config: Scenario configuration
+            targets: Nodes to evaluate (defaults to all); their dependencies
+                are evaluated as needed
+        
+        Returns:
+            Outputs of the evaluated nodes
+        """
+        keys = self.keys(config)
+        needed = set(self.nodes if targets is None else targets)
+        for node in reversed(list(self.nodes.values())):
+            if node.name in needed:
+                needed.update(node.deps)
+        
+        outputs: Dict[str, Any] = {}
+        self.recomputed = []
+        for node in self.nodes.values():
+            if node.name not in needed:
+                continue
+            key = keys[node.name]
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                outputs[node.name] = self._cache[key]
+                continue
+            outputs[node.name] = node.compute(config, *(outputs[dep] for dep in node.deps))
+            self.recomputed.append(node.name)
+            self._cache[key] = outputs[node.name]
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return outputs
+    
+    def clear(self) -> None:
+        """Drop every memoized output."""
+        self._cache.clear()
+
+
+def _select(*keys: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    return lambda config: {key: config.get(key) for key in keys}
+
+
+class IncrementalRunner:
+    """Re-runs a scenario after edits, recomputing only what the edits affect.
+    
+    The run is split into nodes: one validated model per scenario section,
+    one node per sub-model simulation, the time-stepping kernel and the
+    summary metrics. Editing a single section (e.g. one regulatory
+    evolution entry under ``sustainability``) revalidates that section and
+    recomputes only the nodes downstream of it. Random draws come from
+    per-stream counter-based generators, so recomputed nodes draw exactly
+    what a full run would. The results of :meth:`run` are copies, so they
+    may be modified without affecting later runs.
+    
+    Example:
+        >>> runner = IncrementalRunner(seed=42)
+        >>> results = runner.run(config)
+        >>> config["sustainability"]["regional_regulatory_evolution"][0]["region"] = "US"
+        >>> results = runner.run(config)
+        >>> runner.recomputed
+        ['model:sustainability', 'sustainability', 'timeseries', 'market_size', 'summary_metrics']
+    """
+    
+    def __init__(self, seed: Optional[int] = None, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        """Initialize the graph.
+        
+        Args:
+            seed: Root random seed overriding the scenario's ``seed``
+            cache_size: Number of node outputs kept
+        """
+        self.seed = seed
+        self.graph = EvaluationGraph(cache_size)
+        
+        for name, (section, _) in MODEL_SECTIONS.items():
+            self.graph.add(
+                f"model:{name}",
+                lambda config, name=name: build_models(config, [name])[name],
+                reads=lambda config, section=section: config.get(section, {})
+            )
+        
+        components = {
+            "sustainability": (("sustainability",), PERIOD_KEYS + ("diffusion_method",)),
+            "production_tech": (("production_tech",), PERIOD_KEYS),
+            "client_needs": (("client_needs",), PERIOD_KEYS),
+            "timeseries": (("sustainability", "production_tech"), KERNEL_KEYS),
+        }
+        for name, (models, keys) in components.items():
+            self.graph.add(
+                name,
+                lambda config, *deps, name=name, models=models: self._run_component(config, name, models, deps),
+                deps=[f"model:{model}" for model in models],
+                reads=_select(*keys)
+            )
+        
+        self.graph.add(
+            "regional_markets",
+            lambda config: self._runner(config)._run_regional_projection(),
+            reads=lambda config: {
+                **_select(*PERIOD_KEYS, "market_size", "region_groups")(config),
+                "regional_shifts": (config.get("sustainability") or {}).get("regional_shifts"),
+            }
+        )
+        
+        self.graph.add(
+            "market_size",
+            lambda config, model: self._runner(config).use_models({"sustainability": model})._run_market_size(),
+            deps=("model:sustainability",),
+            reads=_select(*PERIOD_KEYS, "market_size")
+        )
+        
+        self.graph.add(
+            "summary_metrics",
+            lambda config, *outputs: summarize_results(
+                dict(zip(("sustainability", "production_tech", "client_needs", "market_size"), outputs)),
+                outputs[-1]
+            ),
+            deps=("sustainability", "production_tech", "client_needs", "market_size", "timeseries")
+        )
+    
+    @property
+    def recomputed(self) -> List[str]:
+        """Nodes recomputed by the last run."""
+        return self.graph.recomputed
+    
+    def _runner(self, config: Dict[str, Any]) -> SimulationRunner:
+        """Return a runner for the run-level settings of a configuration."""
+        return SimulationRunner(config, seed=self.seed)
+    
+    def _run_component(
+        self,
+        config: Dict[str, Any],
+        name: str,
+        models: Sequence[str],
+        deps: Sequence[Any]
+    ) -> Any:
+        runner = self._runner(config).use_models(dict(zip(models, deps)))
+        if name == "timeseries":
+            runner._run_time_stepping()
+            return runner.state
+        return getattr(runner, f"_run_{name}_simulation")()
+    
+    def run(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a scenario, reusing every output its edits did not affect.
+        
+        Args:
+            config: Scenario configuration
+        
+        Returns:
+            Results shaped like those of ``SimulationRunner.run``, copied
+            from the memoized outputs
+        """
+        outputs = self.graph.evaluate(config)
+        results = {
+            "sustainability": outputs["sustainability"],
+            "production_tech": outputs["production_tech"],
+            "client_needs": outputs["client_needs"],
+            "timeseries": outputs["timeseries"].to_dict(),
+            "metadata": self._runner(config).metadata(),
+            "summary_metrics": outputs["summary_metrics"]
+        }
+        if outputs["market_size"] is not None:
+            results["market_size"] = outputs["market_size"]
+        if outputs["regional_markets"] is not None:
+            results["regional_markets"] = outputs["regional_markets"]
+        return copy.deepcopy(results)
+    
+    def run_batch(
+        self,
+        config: Dict[str, Any],
+        paths: Sequence[str],
+        values: np.ndarray,
+        outputs: Sequence[str] = ("final_adoption_share", "emissions_reduction")
+    ) -> np.ndarray:
+        """Evaluate summary metrics for many assignments of scenario values.
+        
+        Rows are evaluated one after another in this process: each row of
+        ``values`` is applied to a copy of ``config`` (only the top-level
+        sections a path touches are copied) and run through the memoized
+        graph, so rows that leave a section unchanged reuse its validated
+        model and simulation. Every row still validates the sections it
+        edits, so to evaluate many rows in parallel, split them across
+        processes (as ``analysis.sensitivity.evaluate_design`` does).
+        
+        Args:
+            config: Base scenario configuration
+            paths: Dotted configuration paths of the columns of ``values``
+            values: Values of shape [n_rows, len(paths)]
+            outputs: Summary metrics to return
+            
+        Returns:
+            Array of shape [n_rows, len(outputs)], NaN for rows whose
+            scenario does not validate
+        """
+        sections = sorted({path.partition(".")[0] for path in paths})
+        results = np.full((len(values), len(outputs)), np.nan)
+        for i, row in enumerate(np.asarray(values, dtype=np.float64)):
+            variant = dict(config)
+            for section in sections:
+                variant[section] = copy.deepcopy(config[section])
+            for path, value in zip(paths, row.tolist()):
+                set_config_value(variant, path, value)
+            try:
+                summary = self.graph.evaluate(variant, targets=["summary_metrics"])["summary_metrics"]
+            except ValidationError:
+                continue
+            results[i] = [summary.get(name, np.nan) for name in outputs]
+        return results
@@ -0,0 +1,265 @@
+"""Columnar Parquet store for simulation and analysis results."""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from uuid import uuid4
+
+import numpy as np
+
+from config import settings
+from models.base_model import Trajectory, model_to_dict
+
+# Columns of every table, besides the ``scenario`` partition key
+COLUMNS: Tuple[str, ...] = ("run_id", "component", "series", "entity", "year", "value")
+
+# Sub-models whose scalar metrics are stored for each run
+COMPONENTS: Tuple[str, ...] = ("sustainability", "production_tech", "client_needs")
+
+
+class ResultRecords:
+    """Column buffers for long-format result rows.
+    
+    Every row is one value identified by the sub-model (``component``), the
+    group of values it belongs to (``series``), the entity it describes and,
+    for time series, the year.
+    """
+    
+    def __init__(self) -> None:
+        self.columns: Dict[str, List[Any]] = {
+            "component": [], "series": [], "entity": [], "year": [], "value": []
+        }
+    
+    def __len__(self) -> int:
+        return len(self.columns["value"])
+    
+    def add(
+        self,
+        component: str,
+        series: str,
+        entity: str,
+        value: Any,
+        year: Optional[int] = None
+    ) -> None:
+        """Append one row."""
+        self.columns["component"].append(component)
+        self.columns["series"].append(series)
+        self.columns["entity"].append(entity)
+        self.columns["year"].append(year)
+        self.columns["value"].append(None if value is None else float(value))
+    
+    def add_mapping(self, component: str, series: str, values: Dict[str, Any]) -> None:
+        """Append one row per numeric entry of a mapping."""
+        for entity, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.add(component, series, entity, value)
+    
+    def add_series(
+        self,
+        component: str,
+        series: str,
+        entity: str,
+        years: Iterable[int],
+        values: Iterable[Any]
+    ) -> None:
+        """Append one row per (year, value) point."""
+        for year, value in zip(years, values):
+            self.add(component, series, entity, value, int(year))
+
+
+def results_to_records(results: Dict[str, Any]) -> ResultRecords:
+    """Flatten a simulation result tree into long-format rows.
+    
+    Args:
+        results: Results as returned by ``SimulationRunner.run``, optionally
+            with the ``monte_carlo`` bands of ``run_monte_carlo``
+            
+    Returns:
+        Rows of the run
+    """
+    data = model_to_dict(results)
+    records = ResultRecords()
+    
+    for component in COMPONENTS:
+        records.add_mapping(component, "metrics", data.get(component, {}).get("metrics", {}))
+    records.add_mapping("summary", "summary_metrics", data.get("summary_metrics", {}))
+    
+    for adoption in data.get("sustainability", {}).get("fertilizer_adoption", []):
+        for bound in ("min_percentage", "max_percentage"):
+            records.add(
+                "sustainability", f"fertilizer_adoption_{bound}", adoption["fertilizer_type"],
+                adoption["market_growth"][bound], adoption.get("target_year")
+            )
+    
+    period = data.get("metadata", {}).get("simulation_period")
+    if period:
+        years = range(period["start_year"], period["end_year"] + 1)
+        for name, values in data.get("sustainability", {}).get("adoption_curves", {}).items():
+            records.add_series("sustainability", "adoption_curves", name, years, values)
+    
+    trend_series = (
+        ("production_tech", "technology_evolution", "technology_name", "trajectory_or_curve"),
+        ("client_needs", "priority_evolution", "priority_area", "evolution_trend"),
+    )
+    for component, series, entity_key, trend_key in trend_series:
+        for item in data.get(component, {}).get(series, []):
+            trajectory = Trajectory.coerce((item.get(trend_key) or {}).get("trajectory"))
+            if trajectory is not None:
+                records.add_series(
+                    component, series, item.get(entity_key, "Unknown"),
+                    trajectory.years, trajectory.values
+                )
+    
+    timeseries = data.get("timeseries")
+    if timeseries:
+        # The year column is integral, so only whole-year steps are stored
+        time = np.asarray(timeseries["time"])
+        yearly = np.flatnonzero(np.isclose(time, np.round(time)))
+        years = np.round(time[yearly]).astype(int)
+        for group in ("adoption", "capacity", "emissions"):
+            for name, values in timeseries.get(group, {}).items():
+                records.add_series("timeseries", group, name, years, np.asarray(values)[yearly])
+    
+    market_size = data.get("market_size")
+    if market_size:
+        years = market_size["years"]
+        records.add_series("market_size", "total", "Total", years, market_size["total"])
+        for series in ("segments", "fertilizer_types"):
+            for name, values in market_size.get(series, {}).items():
+                records.add_series("market_size", series, name, years, values)
+    
+    regional_markets = data.get("regional_markets")
+    if regional_markets:
+        for scope in (regional_markets, regional_markets.get("groups") or {}):
+            for quantity in ("application_rate", "demand", "market_size"):
+                for region, values in scope.get(quantity, {}).items():
+                    records.add_series("regional_markets", quantity, region, scope["years"], values)
+    
+    monte_carlo = data.get("monte_carlo")
+    if monte_carlo:
+        years = monte_carlo["metadata"]["years"]
+        bands = [
+            (component, metrics)
+            for component, metrics in monte_carlo.get("metrics", {}).items()
+        ] + [("summary", monte_carlo.get("summary_metrics", {}))]
+        for component, metrics in bands:
+            for name, metric_bands in metrics.items():
+                for band, values in metric_bands.items():
+                    records.add_series(component, f"monte_carlo_{band}", name, years, values)
+    
+    return records
+
+
+def new_run_id() -> str:
+    """Return a unique, time-ordered run identifier."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:8]}"
+
+
+class ResultsStore:
+    """Partitioned Parquet dataset of simulation outputs.
+    
+    Each table lives in its own directory, is hive-partitioned by
+    ``scenario`` and holds one Parquet file per run. Rows are keyed by
+    ``run_id`` and ``year``, so ``pandas.read_parquet`` can prune whole
+    partitions and files with ``filters``.
+    """
+    
+    def __init__(self, root: Union[str, Path, None] = None) -> None:
+        """Open (or create) a store.
+        
+        Args:
+            root: Store directory (defaults to ``settings.RESULTS_STORE_DIR``)
+        """
+        self.root = Path(root) if root is not None else settings.RESULTS_STORE_DIR
+    
+    def append_run(
+        self,
+        results: Dict[str, Any],
+        scenario: str,
+        run_id: Optional[str] = None
+    ) -> str:
+        """Append the outputs of one simulation run to the ``runs`` table.
+        
+        Args:
+            results: Simulation results
+            scenario: Scenario name (partition key)
+            run_id: Run identifier (generated when omitted)
+            
+        Returns:
+            Identifier of the stored run
+        """
+        return self.append_records("runs", results_to_records(results), scenario, run_id)
+    
+    def append_records(
+        self,
+        table: str,
+        records: ResultRecords,
+        scenario: str,
+        run_id: Optional[str] = None
+    ) -> str:
+        """Append long-format rows to a table as one Arrow record batch.
+        
+        Args:
+            table: Table name
+            records: Rows to append
+            scenario: Scenario name (partition key)
+            run_id: Run identifier (generated when omitted)
+            
+        Returns:
+            Identifier of the stored run
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        run_id = run_id or new_run_id()
+        batch = pa.RecordBatch.from_pydict(
+            {"run_id": [run_id] * len(records), **records.columns},
+            schema=self.schema()
+        )
+        partition = self.root / table / f"scenario={scenario}"
+        partition.mkdir(parents=True, exist_ok=True)
+        pq.write_table(pa.Table.from_batches([batch]), partition / f"{run_id}.parquet")
+        return run_id
+    
+    @staticmethod
+    def schema() -> Any:
+        """Arrow schema of the stored rows (without the partition key)."""
+        import pyarrow as pa
+        
+        return pa.schema([
+            ("run_id", pa.string()),
+            ("component", pa.string()),
+            ("series", pa.string()),
+            ("entity", pa.string()),
+            ("year", pa.int16()),
+            ("value", pa.float64()),
+        ])
+    
+    def read(
+        self,
+        table: str = "runs",
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None
+    ) -> Any:
+        """Read a table into a pandas DataFrame.
+        
+        Args:
+            table: Table name
+            columns: Columns to load (defaults to all, including ``scenario``)
+            filters: Predicates pushed down to the Parquet reader, e.g.
+                ``[("scenario", "=", "demo"), ("year", ">=", 2030)]``
+                
+        Returns:
+            Long-format DataFrame
+        """
+        import pandas as pd
+        
+        path = self.root / table
+        if not path.exists():
+            raise FileNotFoundError(f"Results table not found: {path}")
+        return pd.read_parquet(
+            path,
+            engine="pyarrow",
+            columns=list(columns) if columns is not None else None,
+            filters=filters
+        )
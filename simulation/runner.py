@@ -1,72 +1,296 @@
 """Simulation runner for the fertilizer industry model."""
 
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Sequence, Tuple, Type, Union
 import numpy as np
-import pandas as pd
 from datetime import datetime
 from pathlib import Path
 import yaml
 
-from models.base_model import SimulationPeriod
+from config import settings
+from models.base_model import SerializableModel, SimulationPeriod, Trajectory
 from models.sustainability_transition_models import SustainabilityTransition
 from models.production_technology_models import ProductionTechnologyAndProcessInnovation
 from models.client_need_transformation_models import ClientNeedTransformation
+from industry_transformation.sustainability_transition_logic import (
+    fertilizer_adoption_curves,
+    sustainability_curves,
+)
+from strategic_scenarios.market_size_logic import MarketSizeDrivers, project_market, type_shares
+from strategic_scenarios.regional_market_divergence_logic import RegionalShifts
+from simulation.kernel import DEFAULT_ADJUSTMENT_TIME, KernelResult, TimeSteppingKernel
+from utils.profiling import profiler
+from utils.streaming import DEFAULT_COMPRESSION, StreamingBands
+
+if TYPE_CHECKING:
+    from simulation.ensemble import Ensemble
+
+
+# Uniform (low, high) ranges of the stochastic metrics drawn by each sub-model
+METRIC_RANGES: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "sustainability": {
+        "carbon_footprint_reduction": (0.1, 0.5),
+        "sustainable_share": (0.2, 0.8),
+    },
+    "production_tech": {
+        "efficiency_gain": (0.05, 0.3),
+        "cost_reduction": (0.1, 0.4),
+    },
+    "client_needs": {
+        "sustainability_demand": (0.6, 0.9),
+        "digital_tool_adoption": (0.3, 0.8),
+    },
+}
+
+# Runner attribute -> (scenario section, model class) of the validated sub-models
+MODEL_SECTIONS: Dict[str, Tuple[str, Type[SerializableModel]]] = {
+    "sustainability": ("sustainability", SustainabilityTransition),
+    "production_tech": ("production_technology", ProductionTechnologyAndProcessInnovation),
+    "client_needs": ("client_needs", ClientNeedTransformation),
+}
+
+# Independent random streams spawned from the runner's root SeedSequence.
+# New streams must be appended so that existing streams keep their spawn keys.
+RANDOM_STREAMS: Tuple[str, ...] = ("sustainability", "production_tech", "client_needs", "market_size")
+
+DEFAULT_PERCENTILES: Tuple[float, ...] = (5, 50, 95)
+
+# Replicates drawn per chunk by the streaming Monte Carlo
+STREAMING_CHUNK_SIZE = 65536
+
+
+def build_models(
+    config: Dict[str, Any],
+    names: Optional[Sequence[str]] = None
+) -> Dict[str, SerializableModel]:
+    """Validate the sub-models of a scenario configuration.
+    
+    Args:
+        config: Scenario configuration
+        names: Sub-models to validate (defaults to all of ``MODEL_SECTIONS``)
+        
+    Returns:
+        Validated models keyed by runner attribute name
+    """
+    names = MODEL_SECTIONS if names is None else names
+    models = {}
+    for name in names:
+        section, model_class = MODEL_SECTIONS[name]
+        with profiler.span("validate_model", model=name):
+            models[name] = model_class(**config.get(section, {}))
+        profiler.count("models_validated")
+    return models
+
+
+def compute_summary_metrics(
+    metrics: Dict[str, Dict[str, Any]],
+    state_metrics: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """Aggregate sub-model metrics into the summary metrics.
+    
+    Works element-wise, so the metrics may be scalars or NumPy arrays of
+    Monte Carlo draws.
+    
+    The summary of the integrated state is added as is when it is given.
+    With ``market_size`` metrics (``total`` and
+    ``cagr``), the market value and its growth rate are reported too.
+    
+    Args:
+        metrics: Mapping of sub-model name to its metrics
+        state_metrics: Summary of the integrated state (see
+            ``KernelResult.summary_metrics``)
+        
+    Returns:
+        Dictionary of summary metrics
+    """
+    summary = {
+        "overall_sustainability_score": metrics["sustainability"]["sustainable_share"] * 100,
+        "production_efficiency_gain": metrics["production_tech"]["efficiency_gain"] * 100,
+        "client_sustainability_demand": metrics["client_needs"]["sustainability_demand"] * 100,
+    }
+    market = metrics.get("market_size")
+    if market is not None:
+        summary["market_size"] = market["total"]
+        summary["market_cagr"] = market["cagr"]
+    summary.update(state_metrics or {})
+    return summary
+
+
+def percentile_bands(
+    samples: np.ndarray,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES
+) -> Dict[str, List[float]]:
+    """Summarize replicate draws into per-year percentile bands.
+    
+    Args:
+        samples: Array of shape [n_sims, n_years]
+        percentiles: Percentiles to report, in the range 0-100
+        
+    Returns:
+        Dictionary with the yearly mean and one ``p<q>`` entry per percentile
+    """
+    quantiles = np.percentile(samples, percentiles, axis=0)
+    bands = {"mean": samples.mean(axis=0).tolist()}
+    for q, values in zip(percentiles, quantiles):
+        bands[f"p{q:g}"] = values.tolist()
+    return bands
+
+
+def summarize_results(
+    results: Dict[str, Any],
+    state: Optional[KernelResult] = None
+) -> Dict[str, Any]:
+    """Compute the summary metrics of a run.
+    
+    Args:
+        results: Results holding the ``metrics`` of every sub-model and,
+            optionally, of the ``market_size`` projection
+        state: Integrated state of the run, if any
+        
+    Returns:
+        Dictionary of summary metrics
+    """
+    metrics = {component: results[component]["metrics"] for component in METRIC_RANGES}
+    if results.get("market_size"):
+        metrics["market_size"] = results["market_size"]["metrics"]
+    return compute_summary_metrics(metrics, state.summary_metrics() if state is not None else None)
 
 
 class SimulationRunner:
     """Orchestrates the execution of fertilizer industry simulations."""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], seed: Optional[int] = None):
         """Initialize the simulation with a configuration dictionary.
         
         Args:
             config: Dictionary containing simulation configuration
+            seed: Root random seed (defaults to the scenario's ``seed`` or
+                ``settings.DEFAULT_SEED``)
         """
         self.config = config
         self.simulation_period = SimulationPeriod(
             start_year=config.get("start_year", 2025),
             end_year=config.get("end_year", 2040)
         )
+        self.years = np.arange(self.simulation_period.start_year, self.simulation_period.end_year + 1)
+        self.kernel = TimeSteppingKernel(
+            self.simulation_period.start_year,
+            self.simulation_period.end_year,
+            time_step=config.get("time_step", settings.DEFAULT_TIME_STEP),
+            adjustment_time=config.get("adjustment_time", DEFAULT_ADJUSTMENT_TIME)
+        )
+        self.state: Optional[KernelResult] = None
+        self.market: Optional[MarketSizeDrivers] = None
+        if config.get("market_size"):
+            self.market = MarketSizeDrivers.from_config(config["market_size"], self.simulation_period.start_year)
+        self.n_simulations = config.get("n_simulations", settings.DEFAULT_NUM_SIMULATIONS)
+        self.seed = seed if seed is not None else config.get("seed", settings.DEFAULT_SEED)
+        self.seed_sequence = np.random.SeedSequence(self.seed)
+        self._models: Dict[str, SerializableModel] = {}
         self.results = {}
         
-    def initialize_models(self) -> None:
-        """Initialize all the simulation models based on the configuration."""
-        # Initialize sustainability transition model
-        self.sustainability = SustainabilityTransition(
-            **self.config.get("sustainability", {})
-        )
+    def build(self, models: Optional[Dict[str, SerializableModel]] = None) -> "SimulationRunner":
+        """Validate the sub-models of the scenario (lifecycle step 1).
         
-        # Initialize production technology model
-        self.production_tech = ProductionTechnologyAndProcessInnovation(
-            **self.config.get("production_technology", {})
-        )
+        Idempotent: models are validated at most once per runner. Models
+        passed in are adopted as they are, and any sub-model missing from
+        them is validated from the configuration.
         
-        # Initialize client needs model
-        self.client_needs = ClientNeedTransformation(
-            **self.config.get("client_needs", {})
-        )
+        Args:
+            models: Pre-validated models keyed like ``MODEL_SECTIONS``, e.g.
+                from the scenario cache
+                
+        Returns:
+            The runner, for chaining
+        """
+        models = dict(models or {})
+        missing = [name for name in MODEL_SECTIONS if name not in models and name not in self._models]
+        models.update(build_models(self.config, missing))
+        return self.use_models(models)
     
-    def run(self) -> Dict[str, Any]:
-        """Run the simulation and return results.
+    def use_models(self, models: Dict[str, SerializableModel]) -> "SimulationRunner":
+        """Adopt pre-validated sub-models without validating any others.
         
+        Args:
+            models: Validated models keyed like ``MODEL_SECTIONS``
+            
         Returns:
-            Dictionary containing simulation results
+            The runner, for chaining
         """
-        print("🚀 Initializing simulation models...")
-        self.initialize_models()
+        self._models.update(models)
+        for name, model in models.items():
+            setattr(self, name, model)
+        return self
+    
+    def initialize_models(self, models: Optional[Dict[str, SerializableModel]] = None) -> None:
+        """Initialize all the simulation models based on the configuration.
         
-        print("🔍 Running simulation...")
+        Alias of :meth:`build`, kept for existing callers.
+        """
+        self.build(models)
+    
+    @property
+    def is_built(self) -> bool:
+        """Whether every sub-model has been validated."""
+        return all(name in self._models for name in MODEL_SECTIONS)
+    
+    def prepare(self) -> "SimulationRunner":
+        """Reset the run state before an execution (lifecycle step 2).
+        
+        Returns:
+            The runner, for chaining
+        """
+        self.build()
+        self.results = {}
+        self.state = None
+        return self
+    
+    def execute(self) -> Dict[str, Any]:
+        """Run every sub-model on the prepared state (lifecycle step 3).
         
+        Returns:
+            Dictionary containing simulation results
+        """
         # Run each component of the simulation
-        self.results["sustainability"] = self._run_sustainability_simulation()
-        self.results["production_tech"] = self._run_production_tech_simulation()
-        self.results["client_needs"] = self._run_client_needs_simulation()
+        for component in ("sustainability", "production_tech", "client_needs"):
+            with profiler.span(f"simulate:{component}"):
+                self.results[component] = getattr(self, f"_run_{component}_simulation")()
+        with profiler.span("time_stepping", time_step=self.kernel.time_step):
+            self.results["timeseries"] = self._run_time_stepping()
+        with profiler.span("simulate:market_size"):
+            market_size = self._run_market_size()
+        if market_size is not None:
+            self.results["market_size"] = market_size
+        with profiler.span("simulate:regional_markets"):
+            regional_markets = self._run_regional_projection()
+        if regional_markets is not None:
+            self.results["regional_markets"] = regional_markets
         
         # Combine and process results
-        self._process_results()
+        with profiler.span("process_results"):
+            self._process_results()
+        return self.results
+    
+    def run(self, models: Optional[Dict[str, SerializableModel]] = None) -> Dict[str, Any]:
+        """Run the simulation and return results.
+        
+        Args:
+            models: Pre-validated models to reuse instead of validating the
+                configuration again
+                
+        Returns:
+            Dictionary containing simulation results
+        """
+        if not self.is_built or models:
+            print("🚀 Initializing simulation models...")
+            self.build(models)
+        
+        print("🔍 Running simulation...")
+        self.prepare()
+        results = self.execute()
         
         print("✅ Simulation completed successfully!")
-        return self.results
+        return results
     
     def _run_sustainability_simulation(self) -> Dict[str, Any]:
         """Run the sustainability transition simulation."""
@@ -75,22 +299,27 @@ class SimulationRunner:
         return {
             "fertilizer_adoption": self.sustainability.fertilizer_adoption_curves,
             "technology_penetration": self.sustainability.controlled_release_tech_penetration,
-            "metrics": {
-                "carbon_footprint_reduction": np.random.uniform(0.1, 0.5),
-                "sustainable_share": np.random.uniform(0.2, 0.8)
-            }
+            "adoption_curves": self._run_diffusion(),
+            "metrics": self._draw_metrics("sustainability")
         }
     
+    def _run_diffusion(self) -> Dict[str, List[float]]:
+        """Evaluate the fitted adoption curves over the simulated years."""
+        curves = sustainability_curves(
+            self.sustainability,
+            self.simulation_period.start_year,
+            method=self.config.get("diffusion_method", "logistic")
+        )
+        shares = curves.evaluate(self.years)[:, 0, :, 0]
+        return {name: values.tolist() for name, values in zip(curves.names, shares)}
+    
     def _run_production_tech_simulation(self) -> Dict[str, Any]:
         """Run the production technology simulation."""
         return {
             "technology_evolution": [
                 tech.model_dump() for tech in self.production_tech.production_technology_evolution
             ],
-            "metrics": {
-                "efficiency_gain": np.random.uniform(0.05, 0.3),
-                "cost_reduction": np.random.uniform(0.1, 0.4)
-            }
+            "metrics": self._draw_metrics("production_tech")
         }
     
     def _run_client_needs_simulation(self) -> Dict[str, Any]:
@@ -99,36 +328,446 @@ class SimulationRunner:
             "priority_evolution": [
                 priority.model_dump() for priority in self.client_needs.client_priority_evolution
             ],
+            "metrics": self._draw_metrics("client_needs")
+        }
+    
+    def _run_market_size(self) -> Optional[Dict[str, Any]]:
+        """Project the market size at the CAGR drawn by replicate 0.
+        
+        Like the other sub-models, a single run is replicate 0 of the Monte
+        Carlo ensemble.
+        
+        Returns:
+            Yearly total market value, its split by segment and fertilizer
+            type, and the ``metrics`` feeding the summary (final-year value
+            and CAGR), or None if the scenario has no ``market_size`` block
+        """
+        if self.market is None:
+            return None
+        cagr = self.draw_market_cagr(0, 1)
+        projection = {
+            key: {name: values[0] for name, values in paths.items()}
+            for key, paths in self.project_market(cagr).items()
+        }
+        total = projection["market_size"]["total"]
+        return {
+            "years": self.years.tolist(),
+            "base_year": self.market.base_year,
+            "cagr_range": list(self.market.cagr_range),
+            "total": total.tolist(),
+            "segments": {
+                name: values.tolist() for name, values in projection.get("market_segments", {}).items()
+            },
+            "fertilizer_types": {
+                name: values.tolist()
+                for name, values in projection.get("market_fertilizer_types", {}).items()
+            },
+            "metrics": {"total": float(total[-1]), "cagr": float(cagr[0])},
+        }
+    
+    def project_market(self, cagr: Optional[np.ndarray] = None) -> Optional[Dict[str, Dict[str, np.ndarray]]]:
+        """Project the market size over the simulated years.
+        
+        The fertilizer-type split follows the fitted fertilizer adoption
+        curves once the sustainability model is built.
+        
+        Args:
+            cagr: Growth rate of every replicate in percent, of shape
+                [replicate] (defaults to the central CAGR)
+            
+        Returns:
+            Market paths as returned by
+            ``strategic_scenarios.market_size_logic.project_market``, or None
+            if the scenario has no ``market_size`` block
+        """
+        if self.market is None:
+            return None
+        types = None
+        if "sustainability" in self._models and self.sustainability.fertilizer_adoption_curves:
+            curves = fertilizer_adoption_curves(
+                self.sustainability.fertilizer_adoption_curves, self.simulation_period.start_year
+            )
+            types = type_shares(curves.names, curves.evaluate(self.years)[:, 0, :, 0])
+        return project_market(self.market, self.years, cagr, types)
+    
+    def _run_regional_projection(self) -> Optional[Dict[str, Any]]:
+        """Project regional application rates, demand and market size.
+        
+        Regions come from ``sustainability.regional_shifts`` and are rolled
+        up into the scenario's ``region_groups`` (group -> member regions),
+        if any. The market is split between regions by demand.
+        
+        Returns:
+            Mapping of quantity to yearly values per region, or None if the
+            scenario has no regional shifts
+        """
+        entries = (self.config.get("sustainability") or {}).get("regional_shifts")
+        if not entries:
+            return None
+        projection = RegionalShifts.from_config(entries).project(
+            self.years, market_size=self.market_size_path()
+        )
+        results = projection.to_dict()
+        groups = self.config.get("region_groups")
+        if groups:
+            results["groups"] = projection.rollup(groups).to_dict()
+        return results
+    
+    def market_size_path(self) -> Optional[np.ndarray]:
+        """Total market value per simulated year, at the CAGR of replicate 0.
+        
+        Returns:
+            Array of shape [n_years], or None if the scenario has no
+            ``market_size`` block
+        """
+        if self.market is None:
+            return None
+        return self.market.project(self.years, self.draw_market_cagr(0, 1))[0]
+    
+    def draw_market_cagr(self, start: int, stop: int) -> np.ndarray:
+        """Draw the market CAGR of a range of replicates, in percent.
+        
+        Returns:
+            Array of shape [stop - start]
+        """
+        return self.market.draw_cagr(self.replicate_uniforms("market_size", start, stop, 1)[:, 0])
+    
+    def state_forcing(self) -> Dict[str, Dict[str, Trajectory]]:
+        """Collect the scenario trends that force each state group.
+        
+        Adoption shares follow the technology penetration and circular
+        economy adoption trends, capacity follows the production capacity
+        trends and emissions are indexed to 100 at zero reduction, following
+        the carbon footprint and GHG abatement trends.
+        
+        Returns:
+            Mapping of state group to named trajectories
+        """
+        sustainability = self.sustainability
+        production_tech = self.production_tech
+        
+        adoption = {}
+        for tech in (
+            sustainability.controlled_release_tech_penetration
+            + sustainability.precision_application_tech_adoption
+        ):
+            if tech.adoption_rate is not None:
+                adoption[f"{tech.technology_name} ({tech.category})"] = tech.adoption_rate.trajectory
+        for model in sustainability.circular_economy_model_adoption:
+            adoption[model.model_type] = model.adoption_trajectory.trajectory
+        
+        capacity = {
+            f"{item.factor} ({item.region or 'Global'})": item.pattern_or_assessment.trajectory
+            for item in production_tech.production_capacity_evolution
+        }
+        
+        reductions = {
+            item.product_type: item.reduction_trajectory.trajectory
+            for item in sustainability.carbon_footprint_reduction_trajectories
+        }
+        reductions.update({
+            item.emission_type_or_technology: item.abatement_or_adoption_trajectory.trajectory
+            for item in production_tech.ghg_emission_reduction_pathways
+        })
+        emissions = {
+            name: Trajectory(years=trajectory.years, values=100.0 - trajectory.values)
+            for name, trajectory in reductions.items()
+            if trajectory is not None
+        }
+        
+        return {"adoption": adoption, "capacity": capacity, "emissions": emissions}
+    
+    def _run_time_stepping(self) -> Dict[str, Any]:
+        """Integrate the adoption, capacity and emissions state over the horizon."""
+        self.state = self.kernel.run(self.state_forcing())
+        return self.state.to_dict()
+    
+    def stream(self, name: str) -> np.random.SeedSequence:
+        """Return the seed sequence of a named random stream.
+        
+        The result is identical to the matching child of
+        ``self.seed_sequence.spawn(len(RANDOM_STREAMS))``, but is derived
+        directly from the spawn key so the root sequence is never mutated.
+        
+        Args:
+            name: Stream name, one of ``RANDOM_STREAMS``
+            
+        Returns:
+            Seed sequence of the stream
+        """
+        return np.random.SeedSequence(
+            self.seed_sequence.entropy,
+            spawn_key=self.seed_sequence.spawn_key + (RANDOM_STREAMS.index(name),)
+        )
+    
+    def replicate_uniforms(self, name: str, start: int, stop: int, n_values: int) -> np.ndarray:
+        """Draw uniform [0, 1) numbers for a range of replicates.
+        
+        Each stream drives a counter-based Philox generator and every
+        replicate owns a disjoint block of its counter space, so replicate
+        ``r`` always receives the same numbers no matter how replicates are
+        split into batches or across worker processes.
+        
+        Args:
+            name: Stream name, one of ``RANDOM_STREAMS``
+            start: First replicate (inclusive)
+            stop: Last replicate (exclusive)
+            n_values: Number of values drawn per replicate
+            
+        Returns:
+            Array of shape [stop - start, n_values]
+        """
+        # Philox yields four 64-bit words per counter increment
+        blocks = -(-n_values // 4)
+        bit_generator = np.random.Philox(self.stream(name))
+        bit_generator.advance(start * blocks)
+        draws = np.random.Generator(bit_generator).random((stop - start, blocks * 4))
+        return draws[:, :n_values]
+    
+    def draw_replicates(self, start: int, stop: int) -> Dict[str, Dict[str, np.ndarray]]:
+        """Draw every stochastic metric for a range of replicates.
+        
+        With a ``market_size`` block, every replicate also draws a CAGR and
+        the market paths of :meth:`project_market` are added.
+        
+        Args:
+            start: First replicate (inclusive)
+            stop: Last replicate (exclusive)
+            
+        Returns:
+            Mapping of sub-model to metric arrays of shape [stop - start, n_years]
+        """
+        samples = {
+            component: self._draw_component(component, start, stop)
+            for component in METRIC_RANGES
+        }
+        if self.market is not None:
+            samples.update(self.project_market(self.draw_market_cagr(start, stop)))
+        return samples
+    
+    def _draw_component(self, component: str, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """Draw the stochastic metrics of one sub-model for a range of replicates."""
+        ranges = METRIC_RANGES[component]
+        low, high = np.array(list(ranges.values())).T[:, :, np.newaxis]
+        draws = self.replicate_uniforms(
+            component, start, stop, len(ranges) * len(self.years)
+        ).reshape(stop - start, len(ranges), len(self.years))
+        values = low + (high - low) * draws
+        return {name: values[:, i] for i, name in enumerate(ranges)}
+    
+    def _draw_metrics(self, component: str) -> Dict[str, float]:
+        """Draw the stochastic metrics of a sub-model for a single run.
+        
+        A single run is replicate 0 of the Monte Carlo ensemble, evaluated at
+        the first simulated year.
+        """
+        samples = self._draw_component(component, 0, 1)
+        return {name: float(values[0, 0]) for name, values in samples.items()}
+    
+    def run_monte_carlo(
+        self,
+        n_simulations: Optional[int] = None,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, Any]:
+        """Run all Monte Carlo replicates in a single vectorized pass.
+        
+        Every stochastic metric is drawn as an array of shape
+        [n_simulations, n_years] and the summary metrics are computed on the
+        whole ensemble at once.
+        
+        Args:
+            n_simulations: Number of replicates (defaults to the scenario's
+                ``n_simulations`` or ``settings.DEFAULT_NUM_SIMULATIONS``)
+            percentiles: Percentiles of the reported bands
+            
+        Returns:
+            Dictionary with per-year percentile bands for every sub-model
+            metric and every summary metric
+        """
+        n_simulations = n_simulations or self.n_simulations
+        with profiler.span("monte_carlo:draw", n_simulations=n_simulations):
+            samples = self.draw_replicates(0, n_simulations)
+        profiler.count("monte_carlo_replicates", n_simulations)
+        # The integrated state is deterministic, so it is shared by every replicate
+        state = self.state
+        if state is None and self.is_built:
+            state = self.kernel.run(self.state_forcing())
+        summary = compute_summary_metrics(samples, state.summary_metrics() if state is not None else None)
+        
+        with profiler.span("monte_carlo:percentiles"):
+            return self._monte_carlo_bands(n_simulations, percentiles, samples, summary)
+    
+    def write_ensemble(
+        self,
+        path: Union[str, Path],
+        n_simulations: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> "Ensemble":
+        """Write a Monte Carlo ensemble to memory-mapped files instead of memory.
+        
+        Args:
+            path: Ensemble directory
+            n_simulations: Number of replicates (defaults to the scenario's
+                ``n_simulations`` or ``settings.DEFAULT_NUM_SIMULATIONS``)
+            chunk_size: Replicates drawn per chunk (defaults to
+                ``simulation.ensemble.DEFAULT_CHUNK_SIZE``)
+            
+        Returns:
+            The ensemble, mapped read-only (see ``Ensemble.to_results``)
+        """
+        from simulation.ensemble import DEFAULT_CHUNK_SIZE, write_ensemble
+        
+        n_simulations = n_simulations or self.n_simulations
+        with profiler.span("monte_carlo:ensemble", n_simulations=n_simulations):
+            ensemble = write_ensemble(self, path, n_simulations, chunk_size or DEFAULT_CHUNK_SIZE)
+        profiler.count("monte_carlo_replicates", n_simulations)
+        return ensemble
+    
+    def stream_monte_carlo(
+        self,
+        n_simulations: Optional[int] = None,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        chunk_size: int = STREAMING_CHUNK_SIZE,
+        max_workers: int = 1,
+        compression: int = DEFAULT_COMPRESSION
+    ) -> Dict[str, Any]:
+        """Summarize Monte Carlo replicates without keeping them.
+        
+        Replicates are drawn ``chunk_size`` at a time and folded into online
+        aggregators (exact moments, t-digest percentiles), so memory stays
+        proportional to metrics x years whatever the number of replicates.
+        With several workers, each aggregates a contiguous range of
+        replicates and the partial aggregates are merged. The draws are
+        those of ``run_monte_carlo``; percentiles are approximate.
+        
+        Args:
+            n_simulations: Number of replicates (defaults to the scenario's
+                ``n_simulations`` or ``settings.DEFAULT_NUM_SIMULATIONS``)
+            percentiles: Percentiles of the reported bands
+            chunk_size: Replicates drawn per chunk
+            max_workers: Worker processes (``1`` aggregates in this process)
+            compression: Compression of the quantile digests
+            
+        Returns:
+            Dictionary shaped like ``run_monte_carlo``, whose bands also
+            carry the yearly ``std``, ``min`` and ``max``
+        """
+        n_simulations = n_simulations or self.n_simulations
+        state = self.state
+        if state is None and self.is_built:
+            state = self.kernel.run(self.state_forcing())
+        state_metrics = state.summary_metrics() if state is not None else None
+        
+        n_tasks = max(1, min(max_workers, -(-n_simulations // chunk_size)))
+        bounds = np.linspace(0, n_simulations, n_tasks + 1).astype(int).tolist()
+        tasks = [
+            (self, start, stop, chunk_size, state_metrics, compression)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        with profiler.span("monte_carlo:stream", n_simulations=n_simulations, workers=n_tasks):
+            if n_tasks == 1:
+                partials = [_aggregate_replicates(*tasks[0])]
+            else:
+                with ProcessPoolExecutor(max_workers=n_tasks) as executor:
+                    partials = list(executor.map(_aggregate_replicates, *zip(*tasks)))
+            aggregate = partials[0]
+            for partial in partials[1:]:
+                aggregate.merge(partial)
+        profiler.count("monte_carlo_replicates", n_simulations)
+        
+        with profiler.span("monte_carlo:percentiles"):
+            bands = aggregate.bands(percentiles)
+        results = {
+            "metadata": {
+                "n_simulations": n_simulations,
+                "seed": self.seed,
+                "percentiles": list(percentiles),
+                "years": self.years.tolist(),
+                "streaming": {"chunk_size": chunk_size, "compression": compression},
+            },
+            "metrics": {},
+            "summary_metrics": {},
+        }
+        for name, metric_bands in bands.items():
+            component, _, metric = name.partition(".")
+            target = results["summary_metrics"] if component == "summary" else \
+                results["metrics"].setdefault(component, {})
+            target[metric] = metric_bands
+        return results
+    
+    def _monte_carlo_bands(
+        self,
+        n_simulations: int,
+        percentiles: Sequence[float],
+        samples: Dict[str, Dict[str, np.ndarray]],
+        summary: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Reduce the Monte Carlo draws to per-year percentile bands."""
+        return {
+            "metadata": {
+                "n_simulations": n_simulations,
+                "seed": self.seed,
+                "percentiles": list(percentiles),
+                "years": self.years.tolist()
+            },
             "metrics": {
-                "sustainability_demand": np.random.uniform(0.6, 0.9),
-                "digital_tool_adoption": np.random.uniform(0.3, 0.8)
+                component: {
+                    name: percentile_bands(values, percentiles)
+                    for name, values in component_samples.items()
+                }
+                for component, component_samples in samples.items()
+            },
+            "summary_metrics": {
+                name: percentile_bands(
+                    np.broadcast_to(values, (n_simulations, len(self.years))), percentiles
+                )
+                for name, values in summary.items()
             }
         }
     
-    def _process_results(self) -> None:
-        """Process and aggregate simulation results."""
-        # Add timestamp and metadata
-        self.results["metadata"] = {
+    def metadata(self) -> Dict[str, Any]:
+        """Return the metadata of a run, stamped with the current time."""
+        return {
             "simulation_timestamp": datetime.now().isoformat(),
             "simulation_period": {
                 "start_year": self.simulation_period.start_year,
                 "end_year": self.simulation_period.end_year
             },
+            "time_step": self.kernel.time_step,
             "version": "1.0.0"
         }
-        
-        # Calculate aggregate metrics
-        self.results["summary_metrics"] = {
-            "overall_sustainability_score": (
-                self.results["sustainability"]["metrics"]["sustainable_share"] * 100
-            ),
-            "production_efficiency_gain": (
-                self.results["production_tech"]["metrics"]["efficiency_gain"] * 100
-            ),
-            "client_sustainability_demand": (
-                self.results["client_needs"]["metrics"]["sustainability_demand"] * 100
-            )
+    
+    def _process_results(self) -> None:
+        """Process and aggregate simulation results."""
+        self.results["metadata"] = self.metadata()
+        self.results["summary_metrics"] = summarize_results(self.results, self.state)
+
+
+def _aggregate_replicates(
+    runner: SimulationRunner,
+    start: int,
+    stop: int,
+    chunk_size: int,
+    state_metrics: Optional[Dict[str, float]],
+    compression: int
+) -> StreamingBands:
+    """Fold a range of Monte Carlo replicates into online aggregators.
+    
+    Metrics are named ``<component>.<metric>``, with ``summary`` as the
+    component of the summary metrics.
+    """
+    aggregate = StreamingBands(len(runner.years), compression)
+    for chunk_start in range(start, stop, chunk_size):
+        samples = runner.draw_replicates(chunk_start, min(chunk_start + chunk_size, stop))
+        summary = compute_summary_metrics(samples, state_metrics)
+        named = {
+            f"{component}.{name}": values
+            for component, component_samples in samples.items()
+            for name, values in component_samples.items()
         }
+        named.update({f"summary.{name}": values for name, values in summary.items()})
+        aggregate.update(named)
+    return aggregate
 
 
 def load_scenario(scenario_name: str) -> Dict[str, Any]:
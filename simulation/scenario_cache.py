@@ -0,0 +1,174 @@
+"""Cache of parsed and validated scenarios keyed by YAML content hash."""
+
+import hashlib
+import inspect
+import os
+import pickle
+import re
+import sys
+import typing
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union
+
+import yaml
+from pydantic import BaseModel
+
+from config import settings
+from models.base_model import SerializableModel
+from utils.profiling import profiler
+from .runner import MODEL_SECTIONS, build_models
+from .scenarios import scenario_path
+
+# Bump when the layout of cache entries changes
+CACHE_FORMAT_VERSION = 1
+
+# Name of a cache entry: scenario name, dash, SHA-256 hex digest
+_ENTRY_SUFFIX = re.compile(r"-[0-9a-f]{64}\.pkl")
+
+
+def _describe_model(model_class: Type[BaseModel], seen: Set[type], out: List[str]) -> None:
+    """Append a description of every field of a model and its nested models."""
+    if model_class in seen:
+        return
+    seen.add(model_class)
+    for name, field in model_class.model_fields.items():
+        out.append(
+            f"{model_class.__module__}.{model_class.__qualname__}.{name}:"
+            f"{field.annotation!r}:{field.is_required()}:{field.default!r}:{field.metadata!r}"
+        )
+        pending = [field.annotation]
+        while pending:
+            annotation = pending.pop()
+            if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+                _describe_model(annotation, seen, out)
+            pending.extend(typing.get_args(annotation))
+
+
+@lru_cache(maxsize=None)
+def schema_version() -> str:
+    """Fingerprint of the validated models' schema and code.
+    
+    Derived from the field definitions of every model in ``MODEL_SECTIONS``
+    (recursively), the source of the modules defining them and the source
+    of ``build_models``, so cache entries are invalidated whenever a model,
+    one of its validators or the validation step changes.
+    """
+    out = [f"format:{CACHE_FORMAT_VERSION}"]
+    seen: Set[type] = set()
+    for name, (section, model_class) in MODEL_SECTIONS.items():
+        out.append(f"{name}:{section}")
+        _describe_model(model_class, seen, out)
+    digest = hashlib.sha256("\n".join(out).encode("utf-8"))
+    for module_name in sorted({model_class.__module__ for model_class in seen}):
+        path = getattr(sys.modules.get(module_name), "__file__", None)
+        if path is not None and os.path.exists(path):
+            digest.update(Path(path).read_bytes())
+    digest.update(inspect.getsource(build_models).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ScenarioCache:
+    """On-disk cache of scenario configurations and their validated models.
+    
+    Entries are pickles keyed by the SHA-256 of the scenario YAML bytes and
+    the model schema version, so editing either the scenario or the models
+    produces a new key and the stale entry is replaced on the next load.
+    Entries are trusted local files; do not point the cache at a directory
+    writable by others.
+    """
+    
+    def __init__(self, cache_dir: Union[str, Path, None] = None) -> None:
+        """Initialize the cache.
+        
+        Args:
+            cache_dir: Directory of the cache entries (defaults to
+                ``settings.PROCESSED_DATA_DIR / "scenario_cache"``)
+        """
+        self.cache_dir = (
+            Path(cache_dir) if cache_dir is not None
+            else settings.PROCESSED_DATA_DIR / "scenario_cache"
+        )
+    
+    @staticmethod
+    def key(yaml_bytes: bytes) -> str:
+        """Cache key of a scenario's YAML content."""
+        digest = hashlib.sha256(yaml_bytes)
+        digest.update(schema_version().encode("ascii"))
+        return digest.hexdigest()
+    
+    def load(self, scenario_name: str) -> Tuple[Dict[str, Any], Dict[str, SerializableModel]]:
+        """Load a scenario, reusing the cached parse and validation when possible.
+        
+        Args:
+            scenario_name: Name of the scenario (without .yaml extension)
+            
+        Returns:
+            The scenario configuration and its validated models keyed like
+            ``MODEL_SECTIONS``
+            
+        Raises:
+            FileNotFoundError: If the scenario file does not exist
+        """
+        yaml_bytes = scenario_path(scenario_name).read_bytes()
+        entry = self.cache_dir / f"{scenario_name}-{self.key(yaml_bytes)}.pkl"
+        
+        with profiler.span("scenario_cache:read"):
+            cached = self._read(entry)
+        if cached is not None:
+            profiler.count("scenario_cache_hits")
+            return cached
+        
+        profiler.count("scenario_cache_misses")
+        with profiler.span("parse_yaml"):
+            config = yaml.safe_load(yaml_bytes)
+        models = build_models(config)
+        with profiler.span("scenario_cache:write"):
+            self._write(entry, scenario_name, (config, models))
+        return config, models
+    
+    def clear(self) -> None:
+        """Delete every cache entry."""
+        for entry in self.cache_dir.glob("*.pkl"):
+            entry.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _read(entry: Path) -> Optional[Tuple[Dict[str, Any], Dict[str, SerializableModel]]]:
+        try:
+            with open(entry, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Unreadable entries (e.g. written by an incompatible version) are rebuilt
+            entry.unlink(missing_ok=True)
+            return None
+    
+    def _write(self, entry: Path, scenario_name: str, value: Any) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.cache_dir.glob("*.pkl"):
+            # Only entries of this scenario, not of others sharing its name as a prefix
+            name = stale.name
+            if name.startswith(scenario_name) and _ENTRY_SUFFIX.fullmatch(name[len(scenario_name):]):
+                stale.unlink(missing_ok=True)
+        
+        tmp_path = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry)
+
+
+def load_validated_scenario(
+    scenario_name: str,
+    cache_dir: Union[str, Path, None] = None
+) -> Tuple[Dict[str, Any], Dict[str, SerializableModel]]:
+    """Load a scenario and its validated models through the scenario cache.
+    
+    Args:
+        scenario_name: Name of the scenario (without .yaml extension)
+        cache_dir: Cache directory (defaults to ``data/processed/scenario_cache``)
+        
+    Returns:
+        The scenario configuration and its validated models
+    """
+    return ScenarioCache(cache_dir).load(scenario_name)
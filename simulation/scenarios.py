@@ -18,21 +18,37 @@ def load_scenario(scenario_name: str) -> Dict[str, Any]:
         FileNotFoundError: If the scenario file does not exist
         yaml.YAMLError: If there is an error parsing the YAML file
     """
-    # Construct the path to the scenario file
+    # Load and return the scenario
+    with open(scenario_path(scenario_name), 'r') as f:
+        return yaml.safe_load(f)
+
+
+def scenario_path(scenario_name: str) -> Path:
+    """Return the path of a scenario file.
+    
+    Args:
+        scenario_name: Name of the scenario (without .yaml extension)
+        
+    Returns:
+        Path to the scenario YAML file
+        
+    Raises:
+        FileNotFoundError: If the scenario file does not exist
+    """
     scenario_dir = Path(__file__).parent.parent / "simulations" / "scenarios"
     scenario_file = scenario_dir / f"{scenario_name}.yaml"
     
     if not scenario_file.exists():
         raise FileNotFoundError(f"Scenario file not found: {scenario_file}")
-    
-    # Load and return the scenario
-    with open(scenario_file, 'r') as f:
-        return yaml.safe_load(f)
+    return scenario_file
 
 
-def list_scenarios() -> list[str]:
+def list_scenarios(pattern: str = "*") -> list[str]:
     """List all available scenarios in the scenarios directory.
     
+    Args:
+        pattern: Glob pattern the scenario names must match
+        
     Returns:
         List of scenario names (without .yaml extension)
     """
@@ -41,4 +57,4 @@ def list_scenarios() -> list[str]:
     if not scenario_dir.exists():
         return []
     
-    return [f.stem for f in scenario_dir.glob("*.yaml") if f.is_file()]
+    return [f.stem for f in scenario_dir.glob(f"{pattern}.yaml") if f.is_file()]
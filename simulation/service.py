@@ -0,0 +1,470 @@
+"""Long-running simulation service with warm worker processes.
+
+``SimulationService`` keeps a process pool whose workers import the
+simulation stack once and hold the validated models of every scenario they
+have run, so a job only pays for applying its parameters and running the
+simulation. Jobs are submitted from asyncio code, and every job publishes
+progress events (``queued``, ``started``, ``loaded``, ``simulated``, ...,
+``done`` or ``failed``) that can be streamed while it runs.
+
+``create_app`` exposes the service over HTTP with aiohttp (installed with
+the ``service`` extra):
+
+    POST /jobs                 submit a job, returns its id (202)
+    GET  /jobs/{id}            status, events so far and, once done, the results
+    GET  /jobs/{id}/events     progress events as server-sent events
+    GET  /scenarios            scenarios available to jobs
+    GET  /health               pool size and job counts
+"""
+
+import asyncio
+import contextlib
+import copy
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from models.base_model import to_json_bytes
+
+from .scenarios import list_scenarios, scenario_path
+from .sweep import _load_base_scenario, set_config_value
+
+# Events that end a job's event stream
+TERMINAL_EVENTS = ("done", "failed")
+
+# Internal event sent by a worker after the last progress event of a job
+END_OF_EVENTS = "_end"
+
+# Finished jobs kept for later retrieval (oldest dropped first)
+MAX_FINISHED_JOBS = 1000
+
+# Request fields accepted by ``SimulationService.submit``
+REQUEST_FIELDS = ("scenario", "params", "seed", "monte_carlo", "n_simulations")
+
+# Scenarios validated by this worker: name -> (file mtime, config, models)
+_WORKER_SCENARIOS: Dict[str, Tuple[int, Dict[str, Any], Dict[str, Any]]] = {}
+_WORKER_PROGRESS: Any = None
+
+
+def _init_worker(progress: Any, scenarios: Sequence[str]) -> None:
+    """Import the simulation stack and validate scenarios once per worker."""
+    global _WORKER_PROGRESS
+    _WORKER_PROGRESS = progress
+    from . import runner  # noqa: F401
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in scenarios:
+            _worker_scenario(name)
+
+
+def _worker_scenario(name: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Return a scenario and its validated models, revalidating after edits."""
+    mtime = scenario_path(name).stat().st_mtime_ns
+    cached = _WORKER_SCENARIOS.get(name)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, *_load_base_scenario(name))
+        _WORKER_SCENARIOS[name] = cached
+    return cached[1], cached[2]
+
+
+def _emit(job_id: str, event: str, **data: Any) -> None:
+    if _WORKER_PROGRESS is not None:
+        _WORKER_PROGRESS.put((job_id, {"event": event, "time": time.time(), **data}))
+
+
+def _warm_up() -> int:
+    """No-op task that makes the pool start a worker."""
+    return os.getpid()
+
+
+def _run_job(job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one job inside a worker process.
+    
+    Sub-models whose configuration section is not touched by the job's
+    parameters are reused from the worker's validated scenario.
+    """
+    try:
+        return _simulate_job(job_id, request)
+    finally:
+        # Marks the end of the job's progress events, see ``SimulationService._finalize``
+        _emit(job_id, END_OF_EVENTS)
+
+
+def _simulate_job(job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    from models.base_model import model_to_dict
+    from .runner import MODEL_SECTIONS, SimulationRunner
+    
+    _emit(job_id, "started", pid=os.getpid())
+    params = request.get("params") or {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        config, models = _worker_scenario(request["scenario"])
+        if params:
+            config = copy.deepcopy(config)
+            for path, value in params.items():
+                set_config_value(config, path, value)
+        touched = {path.split(".", 1)[0] for path in params}
+        reused = {
+            name: model for name, model in models.items()
+            if MODEL_SECTIONS[name][0] not in touched
+        }
+        _emit(job_id, "loaded", revalidated=sorted(set(MODEL_SECTIONS) - set(reused)))
+        
+        runner = SimulationRunner(config, seed=request.get("seed"))
+        results = runner.run(models=reused)
+        _emit(job_id, "simulated", summary_metrics=results["summary_metrics"])
+        
+        if request.get("monte_carlo"):
+            results["monte_carlo"] = runner.run_monte_carlo(request.get("n_simulations"))
+            _emit(job_id, "monte_carlo", n_simulations=results["monte_carlo"]["metadata"]["n_simulations"])
+    
+    return model_to_dict(results, exclude_none=True)
+
+
+@dataclass
+class Job:
+    """A submitted simulation job.
+    
+    Attributes:
+        id: Job identifier
+        request: Validated request
+        status: ``queued``, ``running``, ``done`` or ``failed``
+        events: Progress events published so far
+        result: Serialized results once done
+        error: Error message if the job failed
+    """
+    
+    id: str
+    request: Dict[str, Any]
+    status: str = "queued"
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _outcome: Optional["asyncio.Future[Dict[str, Any]]"] = field(default=None, repr=False)
+    _drained: bool = field(default=False, repr=False)
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_EVENTS
+    
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Append an event and wake up the streams waiting on the job."""
+        self.events.append(event)
+        if event["event"] == "started":
+            self.status = "running"
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """Return the job as a JSON-serializable dictionary."""
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "request": self.request,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "events": self.events,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+def validate_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a job request and fill in its defaults.
+    
+    Args:
+        request: Job request with a ``scenario`` name and optionally
+            ``params`` (dotted configuration path -> value, as in sweeps),
+            ``seed``, ``monte_carlo`` and ``n_simulations``
+    
+    Returns:
+        The request with every field of ``REQUEST_FIELDS``
+    
+    Raises:
+        ValueError: If the request is malformed or names an unknown scenario
+    """
+    if not isinstance(request, dict):
+        raise ValueError("Job request must be a JSON object")
+    unknown = sorted(set(request) - set(REQUEST_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown job request fields: {unknown}")
+    scenario = request.get("scenario")
+    # Only names listed in the scenarios directory, so requests cannot reach other files
+    if not isinstance(scenario, str) or scenario not in list_scenarios("*"):
+        raise ValueError(f"Unknown scenario: {scenario!r}")
+    params = request.get("params") or {}
+    if not isinstance(params, dict):
+        raise ValueError("'params' must map configuration paths to values")
+    return {
+        "scenario": scenario,
+        "params": params,
+        "seed": request.get("seed"),
+        "monte_carlo": bool(request.get("monte_carlo", False)),
+        "n_simulations": request.get("n_simulations"),
+    }
+
+
+class SimulationService:
+    """Runs simulation jobs on a pool of warm worker processes.
+    
+    Example:
+        >>> service = SimulationService(max_workers=4, scenarios=["demo_simple"])
+        >>> await service.start()
+        >>> job = service.submit({"scenario": "demo_simple", "params": {"seed": 7}})
+        >>> async for event in service.events(job.id):
+        ...     print(event["event"])
+        >>> await service.close()
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, scenarios: Sequence[str] = ()) -> None:
+        """Configure the service.
+        
+        Args:
+            max_workers: Number of worker processes (defaults to the CPU count)
+            scenarios: Names of the scenarios every worker validates on startup
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.scenarios = list(scenarios)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._progress: Any = None
+        self._pump: Optional[threading.Thread] = None
+    
+    async def start(self) -> None:
+        """Start the worker processes and wait until all of them are warm."""
+        self._loop = asyncio.get_running_loop()
+        context = multiprocessing.get_context()
+        self._progress = context.Queue()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress, self.scenarios)
+        )
+        self._pump = threading.Thread(target=self._pump_progress, name="progress-pump", daemon=True)
+        self._pump.start()
+        await asyncio.gather(*(
+            self._loop.run_in_executor(self.executor, _warm_up) for _ in range(self.max_workers)
+        ))
+    
+    async def close(self) -> None:
+        """Stop the workers, waiting for running jobs."""
+        if self.executor is not None:
+            await self._loop.run_in_executor(None, self.executor.shutdown)
+            self.executor = None
+        if self._pump is not None:
+            self._progress.put(None)
+            self._pump.join()
+            self._pump = None
+    
+    def _pump_progress(self) -> None:
+        """Forward worker progress events to the event loop (runs in a thread)."""
+        while True:
+            item = self._progress.get()
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._publish, *item)
+    
+    def _publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return
+        if event["event"] == END_OF_EVENTS:
+            job._drained = True
+            self._finalize(job)
+        else:
+            job.publish(event)
+    
+    def submit(self, request: Dict[str, Any]) -> Job:
+        """Queue a job on the worker pool.
+        
+        Args:
+            request: Job request, see :func:`validate_request`
+        
+        Returns:
+            The queued job
+        
+        Raises:
+            ValueError: If the request is invalid
+            RuntimeError: If the service is not started
+        """
+        if self.executor is None:
+            raise RuntimeError("Simulation service is not started")
+        job = Job(uuid4().hex[:12], validate_request(request))
+        self.jobs[job.id] = job
+        self._evict()
+        job.publish({"event": "queued", "time": job.created_at})
+        
+        future = self._loop.run_in_executor(self.executor, _run_job, job.id, job.request)
+        future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+    
+    def _finish(self, job: Job, future: "asyncio.Future[Dict[str, Any]]") -> None:
+        job._outcome = future
+        # A worker that died never sends its end-of-events marker
+        if future.cancelled() or isinstance(future.exception(), BrokenProcessPool):
+            job._drained = True
+        self._finalize(job)
+    
+    def _finalize(self, job: Job) -> None:
+        """Publish the terminal event once the results and all progress events are in.
+        
+        Results and progress events travel over different pipes, so either
+        may arrive first.
+        """
+        if job._outcome is None or not job._drained:
+            return
+        future = job._outcome
+        job.finished_at = time.time()
+        if future.cancelled() or future.exception() is not None:
+            error = "cancelled" if future.cancelled() else future.exception()
+            job.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+            job.publish({"event": "failed", "time": job.finished_at, "error": job.error})
+            job.status = "failed"
+        else:
+            job.result = future.result()
+            job.publish({"event": "done", "time": job.finished_at})
+            job.status = "done"
+    
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond ``MAX_FINISHED_JOBS``."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self.jobs[job_id]
+    
+    def get(self, job_id: str) -> Job:
+        """Return a job by id.
+        
+        Raises:
+            KeyError: If the job is unknown
+        """
+        return self.jobs[job_id]
+    
+    async def events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the events of a job, starting with those already published.
+        
+        Args:
+            job_id: Job identifier
+        
+        Yields:
+            Progress events, ending with ``done`` or ``failed``
+        """
+        job = self.get(job_id)
+        index = 0
+        while True:
+            changed = job._changed
+            while index < len(job.events):
+                event = job.events[index]
+                index += 1
+                yield event
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+            await changed.wait()
+    
+    async def run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit a job and wait for its results.
+        
+        Raises:
+            RuntimeError: If the job failed
+        """
+        job = self.submit(request)
+        async for event in self.events(job.id):
+            if event["event"] == "failed":
+                raise RuntimeError(event["error"])
+        return job.result
+    
+    def health(self) -> Dict[str, Any]:
+        """Return the pool size and the number of jobs by status."""
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.max_workers, "scenarios": self.scenarios, "jobs": counts}
+
+
+def create_app(service: SimulationService) -> Any:
+    """Create the aiohttp application serving a simulation service.
+    
+    The service is started and stopped with the application.
+    
+    Args:
+        service: Service running the jobs
+    
+    Returns:
+        An ``aiohttp.web.Application``
+    """
+    from aiohttp import web
+    
+    def json_response(data: Any, status: int = 200) -> web.Response:
+        return web.Response(body=to_json_bytes(data), status=status, content_type="application/json")
+    
+    def job_or_404(request: web.Request) -> Job:
+        try:
+            return service.get(request.match_info["job_id"])
+        except KeyError:
+            error = to_json_bytes({"error": "Unknown job"}).decode()
+            raise web.HTTPNotFound(text=error, content_type="application/json")
+    
+    async def submit(request: web.Request) -> web.Response:
+        try:
+            job = service.submit(await request.json())
+        except ValueError as e:
+            return json_response({"error": str(e)}, status=400)
+        return json_response(
+            {"job_id": job.id, "status": job.status, "events": f"/jobs/{job.id}/events"}, status=202
+        )
+    
+    async def status(request: web.Request) -> web.Response:
+        return json_response(job_or_404(request).to_dict())
+    
+    async def events(request: web.Request) -> web.StreamResponse:
+        job = job_or_404(request)
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+        })
+        await response.prepare(request)
+        async for event in service.events(job.id):
+            if event["event"] == "done":
+                event = {**event, "result": job.result}
+            payload = to_json_bytes(event)
+            await response.write(b"event: " + event["event"].encode() + b"\ndata: " + payload + b"\n\n")
+        await response.write_eof()
+        return response
+    
+    async def scenarios(request: web.Request) -> web.Response:
+        return json_response(sorted(list_scenarios("*")))
+    
+    async def health(request: web.Request) -> web.Response:
+        return json_response(service.health())
+    
+    async def on_startup(app: web.Application) -> None:
+        await service.start()
+    
+    async def on_cleanup(app: web.Application) -> None:
+        await service.close()
+    
+    app = web.Application()
+    app.add_routes([
+        web.post("/jobs", submit),
+        web.get("/jobs/{job_id}", status),
+        web.get("/jobs/{job_id}/events", events),
+        web.get("/scenarios", scenarios),
+        web.get("/health", health),
+    ])
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
@@ -0,0 +1,192 @@
+"""Parallel parameter sweeps over simulation scenarios."""
+
+import contextlib
+import copy
+import io
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import yaml
+
+from pydantic import ValidationError
+
+from .scenario_cache import load_validated_scenario
+from .scenarios import list_scenarios, load_scenario
+
+
+def parse_grid_values(spec: str) -> List[Any]:
+    """Parse the values of one grid axis.
+    
+    Values are either a comma separated list (``"5,10,15"``) or an inclusive
+    ``start:stop:step`` range (``"5:15:5"``). List items are parsed as YAML
+    scalars, so numbers, booleans and strings are all supported.
+    
+    Args:
+        spec: Value specification
+        
+    Returns:
+        List of values for the axis
+    """
+    if spec.count(":") == 2:
+        start, stop, step = (float(part) for part in spec.split(":"))
+        if step <= 0:
+            raise ValueError(f"Range step must be positive: {spec}")
+        count = int((stop - start) / step + 1e-9) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    return [yaml.safe_load(item.strip()) for item in spec.split(",") if item.strip()]
+
+
+def parse_param_grid(params: List[str]) -> Dict[str, List[Any]]:
+    """Parse ``path=values`` options into a parameter grid.
+    
+    Args:
+        params: Items such as
+            ``"sustainability.fertilizer_adoption_curves.*.market_growth.min_percentage=5:15:5"``
+            
+    Returns:
+        Dictionary mapping dotted config paths to the values to sweep
+    """
+    grid = {}
+    for param in params:
+        path, sep, spec = param.partition("=")
+        if not sep or not path.strip():
+            raise ValueError(f"Invalid parameter '{param}', expected path=values")
+        grid[path.strip()] = parse_grid_values(spec)
+    return grid
+
+
+def set_config_value(config: Any, path: str, value: Any) -> None:
+    """Set a value in a nested scenario configuration in place.
+    
+    Path segments are separated by dots. Integer segments index into lists
+    and ``*`` applies the rest of the path to every list element.
+    
+    Args:
+        config: Scenario configuration (nested dicts and lists)
+        path: Dotted path of the value to set
+        value: New value
+    """
+    head, _, rest = path.partition(".")
+    if isinstance(config, list):
+        targets = range(len(config)) if head == "*" else [int(head)]
+    elif isinstance(config, dict):
+        if head not in config and rest:
+            raise KeyError(f"Unknown configuration key: {head}")
+        targets = [head]
+    else:
+        raise KeyError(f"Cannot descend into '{head}' of a {type(config).__name__}")
+    
+    for target in targets:
+        if rest:
+            set_config_value(config[target], rest, value)
+        else:
+            config[target] = value
+
+
+def _load_base_scenario(scenario: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Load a scenario with its validated models, if it validates as-is.
+    
+    Invalid base scenarios are still swept, since the swept parameters may
+    fix them; each variant then validates (and reports) on its own.
+    """
+    try:
+        return load_validated_scenario(scenario)
+    except ValidationError:
+        return load_scenario(scenario), {}
+
+
+def expand_variants(
+    scenarios: List[str],
+    grid: Dict[str, List[Any]]
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield every (scenario, parameter assignment) of the sweep."""
+    paths = list(grid)
+    for scenario in scenarios:
+        for values in itertools.product(*(grid[path] for path in paths)):
+            yield scenario, dict(zip(paths, values))
+
+
+def _run_variant(
+    variant: int,
+    scenario: str,
+    config: Dict[str, Any],
+    models: Dict[str, Any],
+    params: Dict[str, Any],
+    seed: Optional[int]
+) -> Dict[str, Any]:
+    """Run one sweep variant inside a worker process.
+    
+    Sub-models whose configuration section is not touched by the variant's
+    parameters are reused from the pre-validated base scenario.
+    """
+    from .runner import MODEL_SECTIONS, SimulationRunner
+    
+    record = {"variant": variant, "scenario": scenario, "params": params}
+    try:
+        config = copy.deepcopy(config)
+        for path, value in params.items():
+            set_config_value(config, path, value)
+        
+        touched = {path.split(".", 1)[0] for path in params}
+        reused = {
+            name: model for name, model in models.items()
+            if MODEL_SECTIONS[name][0] not in touched
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = SimulationRunner(config, seed=seed).run(models=reused)
+        record.update(status="ok", summary_metrics=results["summary_metrics"])
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    return record
+
+
+def run_sweep(
+    pattern: str,
+    grid: Dict[str, List[Any]],
+    output_path: Union[str, Path],
+    max_workers: Optional[int] = None,
+    seed: Optional[int] = None
+) -> int:
+    """Run every scenario variant of a sweep on a process pool.
+    
+    Results are streamed to a single JSON Lines file as soon as each
+    variant finishes, so the output order follows completion order. All
+    variants share the same root seed, so differences between them come from
+    the swept parameters rather than from sampling noise.
+    
+    Args:
+        pattern: Glob pattern of scenario names under ``simulations/scenarios``
+        grid: Parameter grid as returned by :func:`parse_param_grid`
+        output_path: JSON Lines file receiving one record per variant
+        max_workers: Number of worker processes (defaults to the CPU count)
+        seed: Root random seed (defaults to each scenario's ``seed`` or
+            ``settings.DEFAULT_SEED``)
+        
+    Returns:
+        Number of variants that failed
+    """
+    scenarios = sorted(list_scenarios(pattern))
+    if not scenarios:
+        raise FileNotFoundError(f"No scenarios match pattern: {pattern}")
+    base = {name: _load_base_scenario(name) for name in scenarios}
+    
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+            open(output_path, "w", encoding="utf-8") as f:
+        futures = [
+            executor.submit(_run_variant, i, scenario, *base[scenario], params, seed)
+            for i, (scenario, params) in enumerate(expand_variants(scenarios, grid))
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            failures += record["status"] != "ok"
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+    
+    return failures
@@ -0,0 +1,175 @@
+"""Market-size projections per segment and fertilizer type.
+
+The ``market_size`` block of a scenario gives the market value in a base
+year and its compound annual growth rate::
+
+    market_size:
+      base_year: 2024
+      base_value: 210.78        # billion USD
+      cagr: 2.72                # % per year (or projected_value and projected_year)
+      cagr_range: [1.72, 3.72]  # optional, range of the replicate CAGR draws
+      segments:                 # optional, % of the market
+        Nitrogen: 58
+        Phosphate: 24
+        Potash: 18
+
+Every Monte Carlo replicate draws its own CAGR. The paths of all replicates
+are a single broadcast power of shape [replicate, year], and the segment and
+fertilizer-type splits multiply it by share matrices of shape [split, year].
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.numerics import compound_growth_rate
+
+# Half-width of the default CAGR range of the replicates, in percentage points
+DEFAULT_CAGR_SPREAD = 1.0
+
+# Name of the market share not covered by any fertilizer adoption curve
+OTHER_TYPES = "Other"
+
+
+@dataclass
+class MarketSizeDrivers:
+    """Growth assumptions of the market size.
+    
+    Attributes:
+        base_year: Year of ``base_value``
+        base_value: Market value in the base year, in billion USD
+        cagr: Central compound annual growth rate in percent
+        cagr_range: Uniform (low, high) range of the replicate CAGRs
+        segments: Segment names
+        segment_shares: Share of the market of every segment (summing to 1)
+    """
+    
+    base_year: int
+    base_value: float
+    cagr: float
+    cagr_range: Tuple[float, float]
+    segments: List[str]
+    segment_shares: np.ndarray
+    
+    @classmethod
+    def from_config(cls, block: Mapping[str, Any], base_year: int) -> "MarketSizeDrivers":
+        """Read the ``market_size`` block of a scenario.
+        
+        Without a ``cagr``, the growth rate is implied by ``projected_value``
+        in ``projected_year``. Segment shares are rescaled to sum to 100%.
+        
+        Args:
+            block: ``market_size`` block
+            base_year: Base year when the block has none
+        
+        Raises:
+            ValueError: If the block has no base value, or neither a CAGR
+                nor a projected value and a year after the base year
+        """
+        if "base_value" not in block:
+            raise ValueError("market_size needs a base_value")
+        base_year = block.get("base_year", base_year)
+        cagr = block.get("cagr")
+        if cagr is None:
+            if "projected_value" not in block or "projected_year" not in block:
+                raise ValueError("market_size needs a cagr, or a projected_value and projected_year")
+            cagr = 100 * float(compound_growth_rate(
+                block["base_value"], block["projected_value"], block["projected_year"] - base_year
+            ))
+        low, high = block.get("cagr_range", (cagr - DEFAULT_CAGR_SPREAD, cagr + DEFAULT_CAGR_SPREAD))
+        
+        segments = dict(block.get("segments") or {})
+        shares = np.array(list(segments.values()), dtype=np.float64)
+        if (shares < 0).any() or (len(shares) and shares.sum() == 0):
+            raise ValueError("market_size segments need non-negative shares with a positive total")
+        return cls(
+            base_year=int(base_year),
+            base_value=float(block["base_value"]),
+            cagr=float(cagr),
+            cagr_range=(float(low), float(high)),
+            segments=list(segments),
+            segment_shares=shares / shares.sum() if len(shares) else shares
+        )
+    
+    def draw_cagr(self, uniforms: np.ndarray) -> np.ndarray:
+        """Map uniform draws in [0, 1) to CAGRs in ``cagr_range``."""
+        low, high = self.cagr_range
+        return low + (high - low) * np.asarray(uniforms, dtype=np.float64)
+    
+    def project(self, years: Sequence[int], cagr: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compound the base value over a range of years.
+        
+        Args:
+            years: Projected years
+            cagr: Growth rates in percent, of any shape (defaults to the
+                central ``cagr``)
+        
+        Returns:
+            Market value in billion USD, of shape [*cagr.shape, year]
+        """
+        cagr = np.asarray(self.cagr if cagr is None else cagr, dtype=np.float64)
+        elapsed = np.asarray(years) - self.base_year
+        return self.base_value * (1 + cagr[..., np.newaxis] / 100) ** elapsed
+
+
+def type_shares(names: Sequence[str], shares: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """Turn fertilizer adoption shares into a split of the whole market.
+    
+    Years in which the shares exceed 100% are scaled down proportionally,
+    and the share left over in the other years goes to ``OTHER_TYPES``.
+    
+    Args:
+        names: Fertilizer types
+        shares: Market shares in percent, of shape [type, year]
+    
+    Returns:
+        Type names followed by ``OTHER_TYPES`` and their shares as
+        fractions summing to 1 in every year, of shape [type + 1, year]
+    """
+    fractions = np.asarray(shares, dtype=np.float64) / 100
+    fractions = fractions / np.maximum(fractions.sum(axis=0), 1.0)
+    other = 1 - fractions.sum(axis=0)
+    return list(names) + [OTHER_TYPES], np.vstack([fractions, other])
+
+
+def project_market(
+    drivers: MarketSizeDrivers,
+    years: Sequence[int],
+    cagr: Optional[np.ndarray] = None,
+    types: Optional[Tuple[Sequence[str], np.ndarray]] = None
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Project the total market and its segment and fertilizer-type splits.
+    
+    Args:
+        drivers: Market growth assumptions
+        years: Projected years
+        cagr: Growth rate of every replicate, of shape [replicate]
+            (defaults to the central ``cagr``, without a replicate axis)
+        types: Fertilizer types and their shares as returned by
+            :func:`type_shares`
+    
+    Returns:
+        ``market_size`` (``total`` value and ``cagr``) and, when there are
+        segments and types, ``market_segments`` and
+        ``market_fertilizer_types``: mappings of name to arrays of shape
+        [replicate, year] (or [year] for the central projection)
+    """
+    total = drivers.project(years, cagr)
+    cagr = np.asarray(drivers.cagr if cagr is None else cagr, dtype=np.float64)
+    result = {
+        "market_size": {
+            "total": total,
+            "cagr": np.broadcast_to(cagr[..., np.newaxis], total.shape),
+        },
+    }
+    if drivers.segments:
+        result["market_segments"] = {
+            name: total * share for name, share in zip(drivers.segments, drivers.segment_shares)
+        }
+    if types is not None:
+        names, fractions = types
+        result["market_fertilizer_types"] = {
+            name: total * fraction for name, fraction in zip(names, fractions)
+        }
+    return result
@@ -0,0 +1,259 @@
+"""Regional projections of fertilizer application rates, demand and market size.
+
+Region names are mapped to integer indices once (:class:`RegionIndex`) and
+every regional quantity is held as a NumPy matrix of shape [region, year],
+so projecting hundreds of country-level regions is a handful of broadcast
+operations. Roll-ups to custom groupings are a product with a sparse
+[group, region] membership matrix.
+
+Regions are read from the ``regional_shifts`` block of a scenario's
+``sustainability`` section::
+
+    regional_shifts:
+      - region: "Africa"
+        current_application_rate: 120  # kg/ha
+        target_application_rate: 135   # kg/ha (optional)
+        growth_rate: 1.5               # % per year (or reduction_rate)
+        cropland_area: 250             # million ha (optional)
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+# Cropland of regions without a ``cropland_area``, in million hectares
+DEFAULT_CROPLAND_AREA = 1.0
+
+
+class RegionIndex:
+    """Mapping between region names and integer indices.
+    
+    Attributes:
+        names: Region names, in index order
+        positions: Index of every region name
+    """
+    
+    def __init__(self, names: Sequence[str]) -> None:
+        """Index a list of unique region names.
+        
+        Raises:
+            ValueError: If a name appears more than once
+        """
+        self.names: List[str] = list(names)
+        self.positions: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        if len(self.positions) != len(self.names):
+            duplicates = sorted({name for name in self.names if self.names.count(name) > 1})
+            raise ValueError(f"Duplicate regions: {duplicates}")
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self.positions
+    
+    def indices(self, names: Iterable[str]) -> np.ndarray:
+        """Return the indices of region names.
+        
+        Raises:
+            KeyError: If a region is not indexed
+        """
+        try:
+            return np.array([self.positions[name] for name in names], dtype=np.intp)
+        except KeyError as e:
+            raise KeyError(f"Unknown region {e.args[0]!r}") from None
+    
+    def membership(self, groups: Mapping[str, Sequence[str]]) -> sparse.csr_matrix:
+        """Build the membership matrix of region groups.
+        
+        Args:
+            groups: Member regions of every group; groups may overlap
+        
+        Returns:
+            Matrix of shape [group, region] with a one for every member
+        """
+        members = [self.indices(regions) for regions in groups.values()]
+        rows = np.repeat(np.arange(len(members)), [len(m) for m in members])
+        columns = np.concatenate(members) if members else np.empty(0, dtype=np.intp)
+        return sparse.csr_matrix(
+            (np.ones(len(columns)), (rows, columns)), shape=(len(members), len(self))
+        )
+
+
+def group_by(labels: Mapping[str, str]) -> Dict[str, List[str]]:
+    """Turn a region -> group labelling into the groups of :meth:`RegionIndex.membership`."""
+    groups: Dict[str, List[str]] = {}
+    for region, group in labels.items():
+        groups.setdefault(group, []).append(region)
+    return groups
+
+
+def _aggregate(membership: sparse.csr_matrix, values: np.ndarray) -> np.ndarray:
+    """Sum values of shape [..., region, year] over the members of every group."""
+    moved = np.moveaxis(values, -2, 0)
+    summed = membership @ moved.reshape(len(moved), -1)
+    return np.moveaxis(summed.reshape((membership.shape[0],) + moved.shape[1:]), 0, -2)
+
+
+@dataclass
+class RegionalProjection:
+    """Yearly regional quantities, one row per region.
+    
+    Attributes:
+        regions: Region index of the rows
+        years: Projected years
+        cropland_area: Cropland in million hectares, shape [region]
+        application_rate: Application rate in kg/ha, shape [region, year]
+        demand: Nutrient demand in Mt, shape [region, year]
+        market_size: Market value in billion USD, shape [..., region, year]
+            (leading axes, e.g. replicates, follow the market path passed
+            to :meth:`RegionalShifts.project`)
+    """
+    
+    regions: RegionIndex
+    years: np.ndarray
+    cropland_area: np.ndarray
+    application_rate: np.ndarray
+    demand: np.ndarray
+    market_size: Optional[np.ndarray] = None
+    
+    def rollup(self, groups: Mapping[str, Sequence[str]]) -> "RegionalProjection":
+        """Aggregate the regions into groups.
+        
+        Areas, demand and market size are summed, application rates are
+        averaged over the group's cropland.
+        
+        Args:
+            groups: Member regions of every group (see :func:`group_by`)
+        
+        Returns:
+            Projection with one row per group
+        """
+        membership = self.regions.membership(groups)
+        area = membership @ self.cropland_area
+        demand = _aggregate(membership, self.demand)
+        return RegionalProjection(
+            regions=RegionIndex(list(groups)),
+            years=self.years,
+            cropland_area=area,
+            application_rate=demand * 1000 / area[:, np.newaxis],
+            demand=demand,
+            market_size=None if self.market_size is None else _aggregate(membership, self.market_size)
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the projection as mappings of region name to yearly values."""
+        quantities = {"application_rate": self.application_rate, "demand": self.demand}
+        if self.market_size is not None and self.market_size.ndim == 2:
+            quantities["market_size"] = self.market_size
+        result: Dict[str, Any] = {"years": self.years.tolist()}
+        for key, values in quantities.items():
+            result[key] = dict(zip(self.regions.names, values.tolist()))
+        return result
+
+
+@dataclass
+class RegionalShifts:
+    """Application-rate trends of a set of regions, as parallel arrays.
+    
+    Attributes:
+        regions: Region index
+        application_rate: Current application rate in kg/ha, shape [region]
+        target_rate: Rate at which the trend stops, in kg/ha (NaN for none)
+        growth_rate: Annual change of the rate in percent (negative for
+            reductions)
+        cropland_area: Cropland in million hectares
+    """
+    
+    regions: RegionIndex
+    application_rate: np.ndarray
+    target_rate: np.ndarray
+    growth_rate: np.ndarray
+    cropland_area: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.regions)
+    
+    @classmethod
+    def from_config(cls, entries: Sequence[Mapping[str, Any]]) -> "RegionalShifts":
+        """Read the ``regional_shifts`` entries of a scenario.
+        
+        A ``reduction_rate`` is a negative ``growth_rate``. Regions without
+        a ``cropland_area`` weigh ``DEFAULT_CROPLAND_AREA`` each.
+        
+        Raises:
+            ValueError: If an entry has no region or current application
+                rate, or a non-positive cropland area
+        """
+        rows = []
+        for i, entry in enumerate(entries):
+            if "region" not in entry or "current_application_rate" not in entry:
+                raise ValueError(f"regional_shifts[{i}] needs a region and a current_application_rate")
+            growth = entry.get("growth_rate")
+            if growth is None:
+                growth = -entry.get("reduction_rate", 0.0)
+            rows.append((
+                entry["current_application_rate"],
+                entry.get("target_application_rate", np.nan),
+                growth,
+                entry.get("cropland_area", DEFAULT_CROPLAND_AREA),
+            ))
+        rate, target, growth, area = np.array(rows, dtype=np.float64).reshape(-1, 4).T
+        if (area <= 0).any():
+            raise ValueError("cropland_area must be positive")
+        return cls(
+            regions=RegionIndex([entry["region"] for entry in entries]),
+            application_rate=rate,
+            target_rate=target,
+            growth_rate=growth,
+            cropland_area=area
+        )
+    
+    def project(
+        self,
+        years: Sequence[int],
+        start_year: Optional[int] = None,
+        market_size: Optional[np.ndarray] = None
+    ) -> RegionalProjection:
+        """Project every region over a range of years.
+        
+        Rates compound at their growth rate from ``start_year`` and stop at
+        the target once they reach it. Demand is the rate applied to the
+        cropland, and the market is split between regions in proportion to
+        demand (not at all in years without any demand).
+        
+        Args:
+            years: Projected years
+            start_year: Year of the current rates (defaults to the first year)
+            market_size: Total market value per year, of shape [..., year]
+                (e.g. [replicate, year])
+        
+        Returns:
+            Projection of shape [region, year]
+        """
+        years = np.asarray(years)
+        elapsed = years - (years[0] if start_year is None else start_year)
+        current = self.application_rate[:, np.newaxis]
+        growth = self.growth_rate[:, np.newaxis]
+        target = self.target_rate[:, np.newaxis]
+        
+        rates = current * (1 + growth / 100) ** elapsed
+        # The target only binds for trends moving towards it
+        capped = np.where(growth > 0, np.minimum(rates, target), np.maximum(rates, target))
+        rates = np.where((target - current) * growth > 0, capped, rates)
+        
+        demand = rates * self.cropland_area[:, np.newaxis] / 1000
+        regional_market = None
+        if market_size is not None:
+            total = demand.sum(axis=0)
+            shares = np.divide(demand, total, out=np.zeros_like(demand), where=total > 0)
+            regional_market = np.asarray(market_size, dtype=np.float64)[..., np.newaxis, :] * shares
+        return RegionalProjection(
+            regions=self.regions,
+            years=years,
+            cropland_area=self.cropland_area,
+            application_rate=rates,
+            demand=demand,
+            market_size=regional_market
+        )
@@ -0,0 +1,48 @@
+"""Tests of memory-mapped Monte Carlo ensembles."""
+
+import numpy as np
+import pytest
+
+from simulation.runner import SimulationRunner, load_scenario
+
+
+@pytest.fixture(scope="module")
+def runner():
+    config = load_scenario("demo_simple")
+    config["market_size"] = {"base_year": 2024, "base_value": 210.78, "cagr": 2.72}
+    return SimulationRunner(config, seed=11).build().prepare()
+
+
+def _assert_same_results(actual, expected):
+    assert actual["metadata"]["n_simulations"] == expected["metadata"]["n_simulations"]
+    for section in ("metrics", "summary_metrics"):
+        assert actual[section].keys() == expected[section].keys()
+    for component, metrics in expected["metrics"].items():
+        for name, bands in metrics.items():
+            for key, values in bands.items():
+                np.testing.assert_allclose(actual["metrics"][component][name][key], values, rtol=1e-12)
+    for name, bands in expected["summary_metrics"].items():
+        for key, values in bands.items():
+            np.testing.assert_allclose(actual["summary_metrics"][name][key], values, rtol=1e-12)
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 333, 64])
+def test_ensemble_matches_run_monte_carlo(runner, tmp_path, chunk_size):
+    expected = runner.run_monte_carlo(1000)
+    ensemble = runner.write_ensemble(tmp_path / "ensemble", 1000, chunk_size=chunk_size)
+    
+    _assert_same_results(ensemble.to_results(), expected)
+
+
+def test_ensemble_reads_replicates_lazily(runner, tmp_path):
+    ensemble = runner.write_ensemble(tmp_path / "ensemble", 500, chunk_size=128)
+    samples = runner.draw_replicates(100, 200)
+    
+    np.testing.assert_array_equal(
+        ensemble.metric("production_tech.efficiency_gain", slice(100, 200)),
+        samples["production_tech"]["efficiency_gain"]
+    )
+    np.testing.assert_allclose(
+        ensemble.mean("market_size.total", chunk_size=64),
+        runner.draw_replicates(0, 500)["market_size"]["total"].mean(axis=0)
+    )
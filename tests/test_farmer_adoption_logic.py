@@ -0,0 +1,70 @@
+"""Tests of the agent-based farmer adoption simulator."""
+
+import warnings
+
+import numpy as np
+
+from industry_reconfiguration.farmer_adoption_logic import FarmerAdoptionSimulator
+from models.base_model import Trend
+from models.farmer_adoption_models import FarmerAdoptionAndDemandEvolution, SustainablePracticeAdoption
+
+PRECISION = [[2020, 5.0], [2025, 12.0], [2030, 25.0], [2035, 38.0], [2040, 45.0]]
+
+
+def _model(*practices):
+    return FarmerAdoptionAndDemandEvolution(
+        sustainable_practice_adoption=[
+            SustainablePracticeAdoption(
+                practice_type=name,
+                implementation_rate_or_penetration=Trend(name=name, trajectory=trajectory)
+            )
+            for name, trajectory in practices
+        ],
+        purchasing_behavior_evolution=[],
+        farm_operation_transformation=[],
+        crop_mix_evolution_impact=[],
+        financing_model_adaptation=[]
+    )
+
+
+def _aggregate_share(simulator, shares):
+    counts = np.bincount(simulator.population.region, minlength=len(simulator.population.regions))
+    return (shares * counts[:, np.newaxis]).sum(axis=1) / counts.sum()
+
+
+def test_practices_without_trend_points_are_skipped():
+    model = _model(("Precision", PRECISION), ("Unknown", None), ("Empty", []))
+    simulator = FarmerAdoptionSimulator.from_model(model, 2_000, 2025, seed=1)
+    
+    assert simulator.population.practices == ["Precision"]
+
+
+def test_single_point_practice_holds_its_share():
+    model = _model(("Precision", PRECISION), ("Single", [[2025, 8.0]]))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        simulator = FarmerAdoptionSimulator.from_model(model, 20_000, 2025, seed=1)
+        shares = _aggregate_share(simulator, simulator.run(2025, 2030))
+    
+    assert np.isfinite(simulator.innovation).all() and np.isfinite(simulator.imitation).all()
+    assert simulator.innovation[1] == 0 and simulator.imitation[1] == 0
+    np.testing.assert_allclose(shares[:, 1], shares[0, 1])
+    assert abs(shares[0, 1] - 8.0) < 1.0
+
+
+def test_aggregate_share_tracks_the_trajectory():
+    model = _model(("Precision", PRECISION), ("4R", [[2024, 10.0], [2030, 30.0]]))
+    simulator = FarmerAdoptionSimulator.from_model(model, 100_000, 2025, seed=7)
+    shares = _aggregate_share(simulator, simulator.run(2025, 2040))
+    
+    np.testing.assert_allclose(shares[[0, 5, 10, 15], 0], [12.0, 25.0, 38.0, 45.0], atol=2.0)
+    assert abs(shares[5, 1] - 30.0) < 2.0
+
+
+def test_uncalibrated_hazard_lags_the_trajectory():
+    model = _model(("Precision", PRECISION))
+    simulator = FarmerAdoptionSimulator.from_model(model, 100_000, 2025, seed=7, calibration_rounds=0)
+    shares = _aggregate_share(simulator, simulator.run(2025, 2035))
+    
+    # Adopters cluster in the peer graph, which slows down diffusion
+    assert shares[10, 0] < 38.0 - 2.0
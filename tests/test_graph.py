@@ -0,0 +1,42 @@
+"""Tests of the incremental scenario runner."""
+
+import doctest
+
+from simulation.graph import IncrementalRunner
+from simulation.runner import SimulationRunner, load_scenario
+
+
+def test_docstring_example():
+    test, = doctest.DocTestFinder(recurse=False).find(
+        IncrementalRunner, extraglobs={"config": load_scenario("demo_simple")}
+    )
+    
+    assert doctest.DocTestRunner().run(test).failed == 0
+
+
+def test_matches_a_full_run_after_an_edit():
+    config = load_scenario("demo_simple")
+    runner = IncrementalRunner(seed=42)
+    runner.run(config)
+    capacity = config["production_technology"]["production_capacity_evolution"][0]
+    capacity["pattern_or_assessment"]["trajectory"][-1][1] *= 2
+    results = runner.run(config)
+    expected = SimulationRunner(config, seed=42).run()
+    
+    assert "model:sustainability" not in runner.recomputed
+    assert results["summary_metrics"] == expected["summary_metrics"]
+    assert results["production_tech"] == expected["production_tech"]
+
+
+def test_results_do_not_alias_the_cache():
+    config = load_scenario("demo_simple")
+    runner = IncrementalRunner(seed=42)
+    first = runner.run(config)
+    expected = first["summary_metrics"]["overall_sustainability_score"]
+    first["summary_metrics"]["overall_sustainability_score"] = -1.0
+    first["sustainability"]["metrics"].clear()
+    
+    second = runner.run(config)
+    assert runner.recomputed == []
+    assert second["summary_metrics"]["overall_sustainability_score"] == expected
+    assert second["sustainability"]["metrics"]
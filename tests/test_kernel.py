@@ -0,0 +1,78 @@
+"""Tests of the time-stepping kernel."""
+
+import numpy as np
+import pytest
+
+from models.base_model import Trajectory
+from simulation.kernel import KernelResult, TimeSteppingKernel, interpolate_trajectories, parse_time_step
+from simulation.runner import SimulationRunner, load_scenario
+
+
+def test_integration_matches_the_first_order_response():
+    kernel = TimeSteppingKernel(2025, 2040, time_step="1Q", adjustment_time=3.0)
+    elapsed = kernel.time - kernel.time[0]
+    forcing = np.full((2, 3, len(kernel.time)), 80.0)
+    state = kernel.integrate(forcing, initial=np.full((2, 3), 20.0))
+    
+    # x(t) = F + (x0 - F) exp(-t / tau) for a constant forcing F
+    expected = 80.0 + (20.0 - 80.0) * np.exp(-elapsed / 3.0)
+    np.testing.assert_allclose(state, np.broadcast_to(expected, state.shape), rtol=1e-12)
+
+
+def test_integration_of_a_ramp():
+    kernel = TimeSteppingKernel(2025, 2035, adjustment_time=2.0)
+    forcing = (kernel.time - 2025.0)[np.newaxis]
+    state = kernel.integrate(forcing)
+    
+    a = np.exp(-1.0 / 2.0)
+    expected = [0.0]
+    for value in forcing[0, 1:]:
+        expected.append(a * expected[-1] + (1 - a) * value)
+    np.testing.assert_allclose(state[0], expected, rtol=1e-12)
+
+
+def test_interpolation_onto_a_finer_time_step():
+    kernel = TimeSteppingKernel(2025, 2030, time_step="1Q")
+    trajectories = [
+        Trajectory([[2025, 10.0], [2027, 30.0], [2030, 60.0]]),
+        Trajectory([[2026, 5.0], [2028, 15.0]]),
+        Trajectory([[2025, 42.0]]),
+    ]
+    values = interpolate_trajectories(trajectories, kernel.time)
+    
+    assert len(kernel.time) == 21 and kernel.dt == parse_time_step("3M")
+    for row, trajectory in zip(values, trajectories):
+        np.testing.assert_allclose(row, np.interp(kernel.time, trajectory.years, trajectory.values))
+
+
+def test_zero_reduction_keeps_the_emissions_index_at_100():
+    config = load_scenario("demo_simple")
+    for entry in config["sustainability"]["carbon_footprint_reduction_trajectories"]:
+        entry["reduction_trajectory"]["trajectory"] = [[2025, 0.0], [2040, 0.0]]
+    for entry in config["production_technology"]["ghg_emission_reduction_pathways"]:
+        entry["abatement_or_adoption_trajectory"]["trajectory"] = [[2025, 0.0], [2040, 0.0]]
+    runner = SimulationRunner(config, seed=1).build()
+    state = runner.kernel.run(runner.state_forcing())
+    
+    _, emissions = state.group("emissions")
+    assert emissions.size
+    np.testing.assert_allclose(emissions, 100.0)
+    assert state.summary_metrics()["emissions_reduction"] == 0.0
+
+
+def test_summary_metrics_of_the_final_state():
+    kernel = TimeSteppingKernel(2025, 2027)
+    forcing, layout = kernel.forcing({
+        "adoption": {"a": Trajectory([[2025, 10.0]]), "b": Trajectory([[2025, 30.0]])},
+        "capacity": {"c": Trajectory([[2025, 100.0]])},
+        "emissions": {"e": Trajectory([[2025, 100.0]]), "missing": None},
+    })
+    state = forcing.copy()
+    state[layout.groups["capacity"], -1] = 150.0
+    state[layout.groups["emissions"], -1] = 75.0
+    metrics = KernelResult(kernel.time, forcing, state, layout).summary_metrics()
+    
+    assert layout.names == ["a", "b", "c", "e"]
+    assert metrics == pytest.approx(
+        {"final_adoption_share": 20.0, "capacity_growth": 50.0, "emissions_reduction": 25.0}
+    )
@@ -0,0 +1,55 @@
+"""Tests of the command-line options."""
+
+import inspect
+
+import pytest
+import typer
+from typer.testing import CliRunner
+
+import main
+from config import settings
+
+cli = CliRunner()
+
+
+def test_ensemble_implies_monte_carlo(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ENSEMBLE_DIR", tmp_path)
+    result = cli.invoke(main.app, [
+        "run-simulation", "demo_simple", "--ensemble", "--n-simulations", "100",
+        "--no-visualize", "--no-save-results", "--no-cache",
+    ])
+    
+    assert result.exit_code == 0, result.output
+    assert "Completed 100 replicates" in result.output
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_streaming_implies_monte_carlo():
+    result = cli.invoke(main.app, [
+        "run-simulation", "demo_simple", "--streaming", "--n-simulations", "100",
+        "--no-visualize", "--no-save-results", "--no-cache",
+    ])
+    
+    assert result.exit_code == 0, result.output
+    assert "Completed 100 replicates" in result.output
+
+
+@pytest.mark.parametrize("options", [[], ["--monte-carlo"], ["--streaming", "--ensemble"]])
+def test_workers_need_a_streaming_run(options):
+    result = cli.invoke(main.app, ["run-simulation", "demo_simple", "--workers", "2", *options])
+    
+    assert result.exit_code == 1
+    assert "--workers only applies" in result.output
+
+
+def test_demo_passes_real_option_values(monkeypatch):
+    options = set(inspect.signature(main.run_simulation).parameters) - {"scenario"}
+    calls = []
+    monkeypatch.setattr(main, "run_simulation", lambda *args, **kwargs: calls.append((args, kwargs)))
+    main.demo()
+    
+    (args, kwargs), = calls
+    assert args == ("demo",)
+    assert set(kwargs) == options
+    assert not any(isinstance(value, typer.models.OptionInfo) for value in kwargs.values())
+    assert kwargs["workers"] == 1 and kwargs["streaming"] is False and kwargs["ensemble"] is False
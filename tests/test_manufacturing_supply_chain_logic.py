@@ -0,0 +1,65 @@
+"""Tests of the supply network flow solver."""
+
+import importlib.util
+
+import numpy as np
+import pytest
+
+from industry_reconfiguration.manufacturing_supply_chain_logic import (
+    SupplyChainSolver,
+    SupplyNetwork,
+    UNMET_DEMAND_PENALTY,
+)
+
+YEARS = range(2025, 2031)
+
+
+def test_two_plants_serve_demand_at_least_cost():
+    network = SupplyNetwork.from_config({
+        "nodes": [
+            {"name": "cheap", "type": "plant", "capacity": 60.0, "cost": 100.0},
+            {"name": "dear", "type": "plant", "capacity": 100.0, "cost": 200.0},
+            {"name": "region", "type": "region", "demand": 100.0},
+        ],
+        "arcs": [
+            {"from": "cheap", "to": "region", "cost": 10.0},
+            {"from": "dear", "to": "region", "cost": 10.0},
+        ],
+    })
+    solution = SupplyChainSolver(network, backend="scipy").solve([2025])[0]
+    
+    assert solution.status == "Optimal"
+    assert solution.total_cost == pytest.approx(60 * 110 + 40 * 210)
+    np.testing.assert_allclose(solution.production, [60.0, 40.0])
+    np.testing.assert_allclose(solution.unmet_demand, [0.0], atol=1e-9)
+
+
+def test_unserved_demand_is_penalized():
+    network = SupplyNetwork.from_config({
+        "nodes": [
+            {"name": "plant", "type": "plant", "capacity": 30.0, "cost": 100.0},
+            {"name": "region", "type": "region", "demand": 50.0},
+        ],
+        "arcs": [{"from": "plant", "to": "region", "cost": 10.0}],
+    })
+    solution = SupplyChainSolver(network, backend="scipy").solve([2025])[0]
+    
+    assert solution.status == "Optimal"
+    np.testing.assert_allclose(solution.unmet_demand, [20.0])
+    assert solution.total_cost == pytest.approx(30 * 110 + 20 * UNMET_DEMAND_PENALTY)
+
+
+def test_solve_needs_years():
+    solver = SupplyChainSolver(SupplyNetwork.synthetic(2, 1, 1, 2, seed=0), backend="scipy")
+    with pytest.raises(ValueError, match="At least one year"):
+        solver.solve([])
+
+
+@pytest.mark.skipif(importlib.util.find_spec("highspy") is None, reason="highspy is not installed")
+def test_backends_agree():
+    network = SupplyNetwork.synthetic(8, 4, 10, 40, seed=3)
+    warm = SupplyChainSolver(network, backend="highspy").solve(YEARS)
+    cold = SupplyChainSolver(network, backend="scipy").solve(YEARS)
+    
+    assert [s.status for s in warm] == [s.status for s in cold] == ["Optimal"] * len(YEARS)
+    np.testing.assert_allclose([s.total_cost for s in warm], [s.total_cost for s in cold], rtol=1e-8)
@@ -0,0 +1,51 @@
+"""Tests of the market-size projections of a run."""
+
+import numpy as np
+
+from simulation.runner import SimulationRunner, load_scenario
+
+MARKET = {
+    "base_year": 2024,
+    "base_value": 210.78,
+    "cagr": 2.72,
+    "cagr_range": [1.72, 3.72],
+    "segments": {"Nitrogen": 58, "Phosphate": 24, "Potash": 18},
+}
+REGIONS = [
+    {"region": "Africa", "current_application_rate": 20, "growth_rate": 3.0, "cropland_area": 250},
+    {"region": "Europe", "current_application_rate": 150, "reduction_rate": 1.0, "cropland_area": 120},
+]
+
+
+def _config():
+    config = load_scenario("demo_simple")
+    config["market_size"] = MARKET
+    config["sustainability"]["regional_shifts"] = REGIONS
+    return config
+
+
+def test_single_run_is_replicate_zero():
+    runner = SimulationRunner(_config(), seed=3)
+    results = runner.run()
+    replicate = runner.draw_replicates(0, 1)
+    
+    np.testing.assert_allclose(results["market_size"]["total"], replicate["market_size"]["total"][0])
+    assert results["market_size"]["metrics"]["cagr"] == replicate["market_size"]["cagr"][0, 0]
+    assert results["market_size"]["metrics"]["cagr"] != MARKET["cagr"]
+    for name, values in results["market_size"]["segments"].items():
+        np.testing.assert_allclose(values, replicate["market_segments"][name][0])
+    
+    regional = np.sum(list(results["regional_markets"]["market_size"].values()), axis=0)
+    np.testing.assert_allclose(regional, results["market_size"]["total"])
+
+
+def test_splits_add_up_to_the_total():
+    runner = SimulationRunner(_config(), seed=3).build()
+    samples = runner.draw_replicates(0, 100)
+    total = samples["market_size"]["total"]
+    
+    assert total.shape == (100, len(runner.years))
+    np.testing.assert_allclose(sum(samples["market_segments"].values()), total)
+    np.testing.assert_allclose(sum(samples["market_fertilizer_types"].values()), total)
+    cagr = samples["market_size"]["cagr"][:, 0]
+    assert (cagr >= 1.72).all() and (cagr < 3.72).all()
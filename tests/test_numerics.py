@@ -0,0 +1,43 @@
+"""Tests of the array numerics and the list helpers built on them."""
+
+import numpy as np
+import pytest
+
+from utils import (
+    calculate_compound_growth_rate,
+    calculate_moving_average,
+    interpolate_values,
+    normalize_values,
+)
+from utils.numerics import compound_growth_rate
+
+
+def test_compound_growth_rate():
+    assert calculate_compound_growth_rate(100.0, 121.0, 2) == pytest.approx(0.1)
+    assert calculate_compound_growth_rate(0.0, 50.0, 5) == 0.0
+    np.testing.assert_allclose(
+        compound_growth_rate([100.0, 0.0, 50.0], [121.0, 10.0, 50.0], [2, 3, 4]), [0.1, 0.0, 0.0]
+    )
+
+
+@pytest.mark.parametrize("periods", [0, -1, [1, 0]])
+def test_compound_growth_rate_needs_positive_periods(periods):
+    with pytest.raises(ValueError, match="periods"):
+        compound_growth_rate(100.0, 121.0, periods)
+
+
+def test_calculate_compound_growth_rate_rejects_zero_periods():
+    with pytest.raises(ValueError):
+        calculate_compound_growth_rate(100.0, 121.0, 0)
+
+
+def test_list_helpers_match_their_definitions():
+    values = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0]
+    expected = [sum(values[max(0, i - 2):i + 1]) / min(3, i + 1) for i in range(len(values))]
+    
+    np.testing.assert_allclose(calculate_moving_average(values, 3), expected)
+    assert calculate_moving_average([], 3) == []
+    np.testing.assert_allclose(normalize_values(values), [(v - 1.0) / 8.0 for v in values])
+    assert normalize_values([2.0, 2.0]) == [0.5, 0.5]
+    assert interpolate_values(0.0, 1.0, 5) == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert interpolate_values(2.0, 5.0, 1) == [2.0]
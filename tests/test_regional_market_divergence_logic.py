@@ -0,0 +1,85 @@
+"""Tests of the regional application-rate, demand and market projections."""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from simulation.runner import SimulationRunner, load_scenario
+from strategic_scenarios.regional_market_divergence_logic import RegionalShifts, group_by
+
+YEARS = np.arange(2025, 2041)
+ENTRIES = [
+    {"region": "Kenya", "current_application_rate": 20, "growth_rate": 5.0,
+     "target_application_rate": 30, "cropland_area": 6},
+    {"region": "Nigeria", "current_application_rate": 15, "growth_rate": 4.0, "cropland_area": 35},
+    {"region": "France", "current_application_rate": 160, "reduction_rate": 2.0,
+     "target_application_rate": 140, "cropland_area": 18},
+    {"region": "Germany", "current_application_rate": 150, "cropland_area": 12},
+]
+GROUPS = {"Africa": ["Kenya", "Nigeria"], "Europe": ["France", "Germany"]}
+
+
+def test_target_rate_stops_the_trend():
+    rates = RegionalShifts.from_config(ENTRIES).project(YEARS).application_rate
+    
+    growth = 20 * 1.05 ** (YEARS - 2025)
+    np.testing.assert_allclose(rates[0], np.minimum(growth, 30))
+    assert rates[0, -1] == 30 and rates[0, 5] < 30
+    np.testing.assert_allclose(rates[1], 15 * 1.04 ** (YEARS - 2025))
+    np.testing.assert_allclose(rates[2], np.maximum(160 * 0.98 ** (YEARS - 2025), 140))
+    np.testing.assert_allclose(rates[3], 150)
+
+
+def test_regions_roll_up_to_the_total_market():
+    market = np.linspace(200, 260, len(YEARS)) * np.array([[1.0], [1.5]])  # [replicate, year]
+    projection = RegionalShifts.from_config(ENTRIES).project(YEARS, market_size=market)
+    groups = projection.rollup(GROUPS)
+    
+    assert projection.market_size.shape == (2, len(ENTRIES), len(YEARS))
+    np.testing.assert_allclose(projection.market_size.sum(axis=-2), market)
+    np.testing.assert_allclose(groups.market_size.sum(axis=-2), market)
+    np.testing.assert_allclose(groups.demand.sum(axis=0), projection.demand.sum(axis=0))
+    # Group rates are averaged over cropland
+    europe = (projection.demand[2] + projection.demand[3]) * 1000 / (18 + 12)
+    np.testing.assert_allclose(groups.application_rate[1], europe)
+    assert group_by({"Kenya": "Africa", "France": "Europe", "Nigeria": "Africa"}) == {
+        "Africa": ["Kenya", "Nigeria"], "Europe": ["France"]
+    }
+
+
+def test_years_without_demand_get_no_market():
+    entries = [dict(entry, current_application_rate=0) for entry in ENTRIES]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        projection = RegionalShifts.from_config(entries).project(
+            YEARS, market_size=np.full(len(YEARS), 200.0)
+        )
+    
+    assert np.isfinite(projection.market_size).all()
+    np.testing.assert_array_equal(projection.market_size, 0.0)
+
+
+def test_invalid_entries_are_rejected():
+    with pytest.raises(ValueError, match="needs a region"):
+        RegionalShifts.from_config([{"region": "Kenya"}])
+    with pytest.raises(ValueError, match="Duplicate regions"):
+        RegionalShifts.from_config([ENTRIES[0], ENTRIES[0]])
+    with pytest.raises(KeyError, match="Atlantis"):
+        RegionalShifts.from_config(ENTRIES).project(YEARS).rollup({"Sea": ["Atlantis"]})
+
+
+def test_runner_projects_and_groups_regions():
+    config = load_scenario("demo_simple")
+    config["sustainability"]["regional_shifts"] = ENTRIES
+    config["region_groups"] = GROUPS
+    config["market_size"] = {"base_year": 2024, "base_value": 210.78, "cagr": 2.72}
+    runner = SimulationRunner(config, seed=2)
+    regional = runner.run()["regional_markets"]
+    
+    assert regional["years"] == runner.years.tolist()
+    assert list(regional["application_rate"]) == [entry["region"] for entry in ENTRIES]
+    total = runner.market_size_path()
+    np.testing.assert_allclose(np.sum(list(regional["market_size"].values()), axis=0), total)
+    groups = regional["groups"]["market_size"]
+    np.testing.assert_allclose(np.sum(list(groups.values()), axis=0), total)
@@ -0,0 +1,69 @@
+"""Tests of the build/prepare/execute lifecycle of the simulation runner."""
+
+import pytest
+
+from models.base_model import to_json_bytes
+from simulation.runner import MODEL_SECTIONS, SimulationRunner, load_scenario
+
+MARKET = {
+    "base_year": 2024,
+    "base_value": 210.78,
+    "cagr": 2.72,
+    "cagr_range": [1.72, 3.72],
+    "segments": {"Nitrogen": 58, "Phosphate": 24, "Potash": 18},
+}
+
+
+def dump(results):
+    """Serialize results without the run timestamp."""
+    metadata = {**results["metadata"], "simulation_timestamp": None}
+    return to_json_bytes({**results, "metadata": metadata})
+
+
+@pytest.fixture(scope="module")
+def config():
+    config = load_scenario("demo_simple")
+    config["market_size"] = MARKET
+    return config
+
+
+@pytest.fixture(scope="module")
+def expected(config):
+    return dump(SimulationRunner(config, seed=11).run())
+
+
+@pytest.fixture(scope="module")
+def models(config):
+    return dict(SimulationRunner(config, seed=11).build()._models)
+
+
+def test_run_with_prebuilt_models(config, expected, models):
+    runner = SimulationRunner(config, seed=11)
+    results = runner.run(models=models)
+    
+    assert dump(results) == expected
+    assert all(getattr(runner, name) is model for name, model in models.items())
+
+
+def test_use_models_then_execute(config, expected, models):
+    runner = SimulationRunner(config, seed=11).use_models(models)
+    
+    assert runner.is_built
+    assert dump(runner.prepare().execute()) == expected
+
+
+def test_partial_models_are_completed(config, expected, models):
+    runner = SimulationRunner(config, seed=11).build({"sustainability": models["sustainability"]})
+    
+    assert runner.is_built
+    assert runner.sustainability is models["sustainability"]
+    assert dump(runner.prepare().execute()) == expected
+
+
+def test_repeated_executions_match(config, expected, models):
+    runner = SimulationRunner(config, seed=11).use_models(models)
+    runner.prepare().execute()
+    
+    assert dump(runner.prepare().execute()) == expected
+    assert dump(runner.run()) == expected
+    assert set(runner._models) == set(MODEL_SECTIONS)
@@ -0,0 +1,22 @@
+"""Tests of the scenario cache."""
+
+from simulation.scenario_cache import ScenarioCache
+
+
+def test_write_replaces_only_entries_of_the_same_scenario(tmp_path):
+    stale = tmp_path / f"demo_simple-{'0' * 64}.pkl"
+    other = tmp_path / f"demo_simple-v2-{'1' * 64}.pkl"
+    for path in (stale, other):
+        path.write_bytes(b"")
+    
+    cache = ScenarioCache(tmp_path)
+    config, models = cache.load("demo_simple")
+    
+    assert not stale.exists()
+    assert other.exists()
+    entries = sorted(path.name for path in tmp_path.glob("*.pkl"))
+    assert len(entries) == 2
+    
+    cached_config, cached_models = cache.load("demo_simple")
+    assert cached_config == config
+    assert set(cached_models) == set(models)
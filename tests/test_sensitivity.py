@@ -0,0 +1,62 @@
+"""Tests of the Sobol and Morris sensitivity analyses."""
+
+import numpy as np
+
+from analysis.sensitivity import (
+    Parameter,
+    morris_design,
+    morris_indices,
+    run_sensitivity,
+    saltelli_design,
+    sobol_indices,
+)
+from simulation.runner import load_scenario
+
+# Analytic indices of the Ishigami function with a = 7, b = 0.1
+ISHIGAMI_S1 = [0.3139, 0.4424, 0.0]
+ISHIGAMI_ST = [0.5576, 0.4424, 0.2437]
+
+
+def _ishigami(x, a=7.0, b=0.1):
+    return np.sin(x[:, 0]) + a * np.sin(x[:, 1]) ** 2 + b * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+
+def test_sobol_indices_of_ishigami():
+    parameters = [Parameter(f"x{i}", 0.0, -np.pi, np.pi) for i in range(3)]
+    design = saltelli_design(parameters, 2 ** 14, seed=0)
+    indices = sobol_indices(_ishigami(design), len(parameters), n_bootstrap=50, seed=0)
+    
+    np.testing.assert_allclose(indices["S1"][:, 0], ISHIGAMI_S1, atol=0.02)
+    np.testing.assert_allclose(indices["ST"][:, 0], ISHIGAMI_ST, atol=0.02)
+    assert (indices["S1_conf"] < 0.05).all()
+
+
+def test_morris_effects_of_a_known_function():
+    parameters = [Parameter("linear", 1.0, 0.0, 2.0), Parameter("inert", 1.0, 0.0, 1.0),
+                  Parameter("square", 0.5, 0.0, 1.0)]
+    design = morris_design(parameters, 50, seed=1)
+    outputs = 3 * design[:, 0] + design[:, 2] ** 2
+    indices = morris_indices(design, outputs, parameters)
+    
+    # Effects are per unit of the normalized range (a span of 2 for "linear")
+    np.testing.assert_allclose(indices["mu"][:2, 0], [6.0, 0.0], atol=1e-9)
+    np.testing.assert_allclose(indices["sigma"][:2, 0], 0.0, atol=1e-9)
+    assert indices["mu_star"][2, 0] > 0 and indices["sigma"][2, 0] > 0
+
+
+def test_state_metrics_respond_to_scenario_inputs():
+    results = run_sensitivity(
+        load_scenario("demo_simple"), method="morris", n=2,
+        include=["sustainability.fertilizer_adoption_curves.*",
+                 "sustainability.precision_application_tech_adoption.*"],
+        max_workers=1, seed=0
+    )
+    
+    assert results["n_failed"] == 0
+    effects = {
+        path.split(".")[1]: index["mu_star"]
+        for path, index in results["indices"]["final_adoption_share"].items()
+    }
+    # Only the adoption trends force the adoption state
+    assert effects["precision_application_tech_adoption"] > 0
+    assert effects["fertilizer_adoption_curves"] == 0
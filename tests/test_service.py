@@ -0,0 +1,96 @@
+"""Tests for the HTTP interface of the simulation service."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from simulation.service import SimulationService, create_app
+
+
+def serve(check):
+    """Run ``check(client)`` against an app backed by a one-worker service."""
+    async def main():
+        app = create_app(SimulationService(max_workers=1, scenarios=["demo_simple"]))
+        async with TestClient(TestServer(app)) as client:
+            await check(client)
+    
+    asyncio.run(main())
+
+
+async def poll(client, job_id, timeout=120.0):
+    """Poll a job until it finishes and return its final status."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        response = await client.get(f"/jobs/{job_id}")
+        assert response.status == 200
+        data = await response.json()
+        if data["status"] in ("done", "failed"):
+            return data
+        assert asyncio.get_running_loop().time() < deadline, f"job still {data['status']}"
+        await asyncio.sleep(0.1)
+
+
+def test_submit_and_poll():
+    async def check(client):
+        response = await client.post("/jobs", json={"scenario": "demo_simple", "seed": 7})
+        assert response.status == 202
+        submitted = await response.json()
+        assert submitted["status"] == "queued"
+        assert submitted["events"] == f"/jobs/{submitted['job_id']}/events"
+        
+        data = await poll(client, submitted["job_id"])
+        
+        assert data["status"] == "done", data.get("error")
+        assert data["result"]
+        events = [event["event"] for event in data["events"]]
+        assert events[0] == "queued"
+        assert events[-1] == "done"
+        
+        health = await (await client.get("/health")).json()
+        assert health["workers"] == 1
+        assert health["jobs"] == {"done": 1}
+    
+    serve(check)
+
+
+@pytest.mark.parametrize("body", [
+    {"scenario": "no_such_scenario"},
+    {"scenario": "../config/default"},
+    {"scenario": "demo_simple", "unknown": 1},
+    {"scenario": "demo_simple", "params": [1, 2]},
+    ["demo_simple"],
+])
+def test_invalid_request_is_rejected(body):
+    async def check(client):
+        response = await client.post("/jobs", json=body)
+        
+        assert response.status == 400
+        assert "error" in await response.json()
+        assert (await (await client.get("/health")).json())["jobs"] == {}
+    
+    serve(check)
+
+
+@pytest.mark.parametrize("path", ["/jobs/unknown", "/jobs/unknown/events"])
+def test_unknown_job_is_not_found(path):
+    async def check(client):
+        response = await client.get(path)
+        
+        assert response.status == 404
+        assert await response.json() == {"error": "Unknown job"}
+    
+    serve(check)
+
+
+def test_scenarios_lists_demo():
+    async def check(client):
+        response = await client.get("/scenarios")
+        
+        assert response.status == 200
+        assert "demo_simple" in await response.json()
+    
+    serve(check)
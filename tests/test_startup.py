@@ -0,0 +1,19 @@
+"""Tests that lightweight CLI commands do not load the heavy stack."""
+
+import pytest
+
+from benchmarks.startup_importtime import COMMANDS, FORBIDDEN_MODULES, leaked_modules, measure
+
+
+@pytest.mark.parametrize("args", COMMANDS, ids=" ".join)
+def test_command_imports_no_heavy_modules(args):
+    _, modules = measure(args)
+    
+    assert modules
+    assert leaked_modules(modules) == []
+
+
+def test_leaked_modules_matches_submodules():
+    modules = {"numpy": 1.0, "scipy.sparse": 2.0, "plotlyx": 0.5, FORBIDDEN_MODULES[0]: 3.0}
+    
+    assert leaked_modules(modules) == sorted([FORBIDDEN_MODULES[0], "scipy.sparse"])
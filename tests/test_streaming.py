@@ -0,0 +1,80 @@
+"""Tests of the streaming ensemble aggregators."""
+
+import numpy as np
+import pytest
+
+from simulation.runner import SimulationRunner, load_scenario
+from utils.streaming import QuantileDigest, RunningMoments, StreamingBands
+
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+def _draws(n=200_000, n_years=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.normal(size=n), rng.lognormal(sigma=1.0, size=n), rng.uniform(size=n), rng.exponential(size=n)
+    ])[:, :n_years]
+
+
+def test_moments_are_exact_across_batches():
+    draws = _draws(10_000)
+    moments = RunningMoments((4,))
+    for start in range(0, len(draws), 999):
+        moments.update(draws[start:start + 999])
+    
+    np.testing.assert_allclose(moments.mean, draws.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(moments.std, draws.std(axis=0, ddof=1), rtol=1e-10)
+    np.testing.assert_array_equal(moments.min, draws.min(axis=0))
+    np.testing.assert_array_equal(moments.max, draws.max(axis=0))
+
+
+def test_bands_match_np_percentile():
+    draws = _draws()
+    bands = StreamingBands(4)
+    for start in range(0, len(draws), 65536):
+        bands.update({"x": draws[start:start + 65536]})
+    result = bands.bands(PERCENTILES)["x"]
+    
+    spread = draws.max(axis=0) - draws.min(axis=0)
+    for q in PERCENTILES:
+        exact = np.percentile(draws, q, axis=0)
+        np.testing.assert_array_less(np.abs(np.array(result[f"p{q}"]) - exact), 2e-3 * spread)
+
+
+def test_merged_partials_match_a_single_stream():
+    draws = _draws(50_000)
+    single = StreamingBands(4).update({"x": draws})
+    merged = StreamingBands(4)
+    for part in np.array_split(draws, 3):
+        merged.merge(StreamingBands(4).update({"x": part}))
+    
+    assert merged.count == single.count == len(draws)
+    expected, actual = single.bands(PERCENTILES)["x"], merged.bands(PERCENTILES)["x"]
+    np.testing.assert_allclose(actual["mean"], expected["mean"], rtol=1e-12)
+    spread = draws.max(axis=0) - draws.min(axis=0)
+    for q in PERCENTILES:
+        np.testing.assert_array_less(
+            np.abs(np.subtract(actual[f"p{q}"], expected[f"p{q}"])), 2e-3 * spread
+        )
+
+
+def test_constant_samples_weigh_every_replicate():
+    digest = QuantileDigest((2,)).add([1.0, 2.0], 99).update(np.array([[5.0, 0.0]]))
+    
+    assert digest.count == 100
+    # The median falls inside the centroid of the 99 identical samples
+    np.testing.assert_allclose(digest.quantile([0.5])[0], [1.0, 2.0], atol=0.05)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_stream_monte_carlo_matches_run_monte_carlo(max_workers):
+    runner = SimulationRunner(load_scenario("demo_simple"), seed=5).build().prepare()
+    exact = runner.run_monte_carlo(5000)
+    streamed = runner.stream_monte_carlo(5000, chunk_size=1024, max_workers=max_workers)
+    
+    for component, metrics in exact["metrics"].items():
+        for name, bands in metrics.items():
+            stream_bands = streamed["metrics"][component][name]
+            np.testing.assert_allclose(stream_bands["mean"], bands["mean"], rtol=1e-10)
+            for q in exact["metadata"]["percentiles"]:
+                np.testing.assert_allclose(stream_bands[f"p{q}"], bands[f"p{q}"], rtol=1e-2)
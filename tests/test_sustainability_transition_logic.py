@@ -0,0 +1,85 @@
+"""Tests of the diffusion curve fits."""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from industry_transformation.sustainability_transition_logic import fit_curves, technology_penetration_curves
+from models.base_model import Trajectory, Trend
+from models.sustainability_transition_models import TechnologyPenetration
+from simulation.runner import SimulationRunner, load_scenario
+
+YEARS = [2025, 2030, 2035, 2040]
+
+
+def _shares(curves, years=YEARS):
+    return curves.evaluate(years)[:, 0, :, 0]
+
+
+@pytest.mark.parametrize("method", ["logistic", "bass"])
+def test_short_trajectories_fit_without_nan(method):
+    trajectories = [Trajectory([[2025, 12.0]]), Trajectory([[2025, 10.0], [2030, 30.0]])]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        curves = fit_curves(["single", "pair"], trajectories, method=method)
+        shares = _shares(curves)
+    
+    assert np.isfinite(curves.rate).all()
+    assert np.isfinite(shares).all()
+    # A single observation holds its value
+    np.testing.assert_allclose(shares[0], 12.0)
+    np.testing.assert_allclose(shares[1, :2], [10.0, 30.0], atol=0.5)
+
+
+def test_bass_pure_innovation_passes_through_both_points():
+    curves = fit_curves(["pair"], [Trajectory([[2025, 10.0], [2030, 30.0]])], method="bass")
+    
+    assert curves.imitation[0] == pytest.approx(0.0, abs=1e-9)
+    np.testing.assert_allclose(_shares(curves, [2025, 2030])[0], [10.0, 30.0], rtol=1e-6)
+
+
+def test_bass_fit_tracks_every_observation():
+    observed = np.array([[10.0, 30.0, 50.0, 70.0], [5.0, 10.0, 25.0, 45.0], [0.0, 3.0, 20.0, 30.0]])
+    trajectories = [Trajectory(np.column_stack((YEARS, row))) for row in observed]
+    curves = fit_curves(["a", "b", "c"], trajectories, method="bass")
+    
+    assert (curves.innovation > 0).all() and (curves.imitation >= 0).all()
+    np.testing.assert_allclose(_shares(curves), observed, atol=3.0)
+
+
+def test_bass_recovers_known_coefficients():
+    ceiling, p, q, launch = 60.0, 0.01, 0.4, 2020.0
+    years = np.arange(2022, 2041, 3, dtype=np.float64)
+    decay = np.exp(-(p + q) * (years - launch))
+    values = ceiling * (1 - decay) / (1 + q / p * decay)
+    curves = fit_curves(
+        ["known"], [Trajectory(np.column_stack((years, values)))], forecast=[ceiling], method="bass"
+    )
+    
+    assert curves.innovation[0] == pytest.approx(p, rel=0.05)
+    assert curves.imitation[0] == pytest.approx(q, rel=0.05)
+
+
+@pytest.mark.parametrize("method", ["logistic", "bass"])
+def test_trends_without_trajectory_are_skipped(method):
+    penetrations = [
+        TechnologyPenetration(technology_name="Sensors", category="All", adoption_rate=Trend(name="no traj")),
+        TechnologyPenetration(technology_name="Drones", category="All"),
+        TechnologyPenetration(
+            technology_name="VRA", category="All",
+            adoption_rate=Trend(name="VRA", trajectory=[[2025, 10.0], [2030, 30.0]])
+        ),
+    ]
+    curves = technology_penetration_curves(penetrations, method)
+    
+    assert curves.names == ["VRA (All)"]
+
+
+def test_run_with_a_trend_without_trajectory():
+    config = load_scenario("demo_simple")
+    entries = config["sustainability"]["precision_application_tech_adoption"]
+    entries.append(dict(entries[0], technology_name="Untracked", adoption_rate={"name": "no traj"}))
+    results = SimulationRunner(config, seed=1).run()
+    
+    assert np.isfinite(results["summary_metrics"]["final_adoption_share"])
@@ -4,8 +4,9 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 import json
 import yaml
-import numpy as np
-import pandas as pd
+
+from models.base_model import write_json
+from utils import numerics
 
 
 def ensure_directory_exists(directory: Union[str, Path]) -> Path:
@@ -63,12 +64,11 @@ def save_json(data: Any, file_path: Union[str, Path], indent: int = 2) -> None:
     """Save data to a JSON file.
     
     Args:
-        data: Data to save (should be JSON-serializable)
+        data: Data to save (models, NumPy values and JSON-serializable data)
         file_path: Path to save the JSON file to
         indent: Indentation level for the output file
     """
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=indent)
+    write_json(data, file_path, indent=indent)
 
 
 def calculate_compound_growth_rate(
@@ -85,10 +85,11 @@ def calculate_compound_growth_rate(
         
     Returns:
         The compound growth rate as a decimal
+        
+    Raises:
+        ValueError: If ``periods`` is not positive
     """
-    if start_value == 0:
-        return 0.0
-    return (end_value / start_value) ** (1.0 / periods) - 1
+    return float(numerics.compound_growth_rate(start_value, end_value, periods))
 
 
 def interpolate_values(
@@ -106,12 +107,7 @@ def interpolate_values(
     Returns:
         List of interpolated values
     """
-    if num_points <= 0:
-        return []
-    if num_points == 1:
-        return [start_value]
-    return [start_value + (end_value - start_value) * i / (num_points - 1) 
-            for i in range(num_points)]
+    return numerics.interpolate(start_value, end_value, num_points).tolist()
 
 
 def format_percentage(value: float, decimals: int = 1) -> str:
@@ -152,7 +148,7 @@ def generate_timeline(start_year: int, end_year: int, interval: int = 1) -> List
     Returns:
         List of years
     """
-    return list(range(start_year, end_year + 1, interval))
+    return numerics.timeline(start_year, end_year, interval).tolist()
 
 
 def calculate_moving_average(values: List[float], window: int = 3) -> List[float]:
@@ -165,14 +161,9 @@ def calculate_moving_average(values: List[float], window: int = 3) -> List[float
     Returns:
         List of moving average values
     """
-    if not values or window <= 0:
+    if not values:
         return []
-    
-    window = min(window, len(values))
-    return [
-        sum(values[max(0, i - window + 1):i + 1]) / min(window, i + 1)
-        for i in range(len(values))
-    ]
+    return numerics.moving_average(values, window).tolist()
 
 
 def normalize_values(
@@ -192,11 +183,4 @@ def normalize_values(
     """
     if not values:
         return []
-    
-    min_val = min(values) if min_val is None else min_val
-    max_val = max(values) if max_val is None else max_val
-    
-    if min_val == max_val:
-        return [0.5] * len(values)  # All values are the same
-    
-    return [(x - min_val) / (max_val - min_val) for x in values]
+    return numerics.normalize(values, min_val, max_val).tolist()
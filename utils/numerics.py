@@ -0,0 +1,117 @@
+"""Array-native numerical helpers.
+
+Each function accepts scalars, 1-D series or 2-D arrays of shape
+[series, time] and works along the last axis, so thousands of trajectories
+are processed in a single call. The list-based helpers in ``utils`` wrap
+these functions.
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+
+
+def compound_growth_rate(start_value: Any, end_value: Any, periods: Any) -> np.ndarray:
+    """Calculate compound growth rates element-wise.
+    
+    Args:
+        start_value: Starting values
+        end_value: Ending values
+        periods: Number of periods
+    
+    Returns:
+        Growth rates as decimals, broadcast over the inputs (0.0 where the
+        starting value is zero)
+    
+    Raises:
+        ValueError: If any number of periods is not positive
+    """
+    start = np.asarray(start_value, dtype=np.float64)
+    end = np.asarray(end_value, dtype=np.float64)
+    periods = np.asarray(periods, dtype=np.float64)
+    if np.any(periods <= 0):
+        raise ValueError("periods must be positive")
+    zero = start == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = (end / np.where(zero, 1.0, start)) ** (1.0 / periods) - 1
+    return np.where(zero, 0.0, rates)
+
+
+def interpolate(start_value: Any, end_value: Any, num_points: int) -> np.ndarray:
+    """Linearly interpolate between start and end values.
+    
+    Args:
+        start_value: Starting values
+        end_value: Ending values
+        num_points: Number of points to generate
+    
+    Returns:
+        Array of shape [*broadcast(start, end).shape, num_points]
+    """
+    start = np.asarray(start_value, dtype=np.float64)[..., np.newaxis]
+    end = np.asarray(end_value, dtype=np.float64)[..., np.newaxis]
+    steps = np.arange(max(num_points, 0)) / max(num_points - 1, 1)
+    return start + (end - start) * steps
+
+
+def timeline(start_year: int, end_year: int, interval: int = 1) -> np.ndarray:
+    """Return the years from ``start_year`` to ``end_year`` (inclusive)."""
+    return np.arange(start_year, end_year + 1, interval)
+
+
+def moving_average(values: Any, window: int = 3) -> np.ndarray:
+    """Calculate trailing moving averages along the last axis.
+    
+    The first ``window - 1`` points average over the points available so
+    far. Sums come from a cumulative sum, so the cost does not depend on the
+    window size.
+    
+    Args:
+        values: Series of shape [time] or [series, time]
+        window: Size of the moving window
+    
+    Returns:
+        Moving averages with the shape of ``values`` (empty if ``values`` is
+        empty or ``window`` is not positive)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1] if values.ndim else 0
+    if n == 0 or window <= 0:
+        return np.empty(values.shape[:-1] + (0,))
+    
+    window = min(window, n)
+    padded = np.zeros(values.shape[:-1] + (n + 1,))
+    np.cumsum(values, axis=-1, out=padded[..., 1:])
+    ends = np.arange(1, n + 1)
+    starts = np.maximum(ends - window, 0)
+    return (padded[..., ends] - padded[..., starts]) / (ends - starts)
+
+
+def normalize(
+    values: Any,
+    min_val: Optional[Any] = None,
+    max_val: Optional[Any] = None
+) -> np.ndarray:
+    """Normalize each series to the range [0, 1] along the last axis.
+    
+    Args:
+        values: Series of shape [time] or [series, time]
+        min_val: Minimum for normalization, a scalar or one per series
+            (defaults to each series' minimum)
+        max_val: Maximum for normalization, a scalar or one per series
+            (defaults to each series' maximum)
+    
+    Returns:
+        Normalized values with the shape of ``values``, 0.5 for series whose
+        minimum and maximum are equal
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values
+    
+    low = values.min(axis=-1) if min_val is None else np.asarray(min_val, dtype=np.float64)
+    high = values.max(axis=-1) if max_val is None else np.asarray(max_val, dtype=np.float64)
+    low, high = low[..., np.newaxis], high[..., np.newaxis]
+    span = high - low
+    flat = span == 0
+    return np.where(flat, 0.5, (values - low) / np.where(flat, 1.0, span))
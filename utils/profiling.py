@@ -0,0 +1,215 @@
+"""Span timers and counters exported as Chrome trace events.
+
+Instrumented code wraps its stages in ``profiler.span(...)`` and bumps
+counters with ``profiler.count(...)``. Both are no-ops until the profiler
+is enabled (``run-simulation --profile``), after which every span becomes a
+complete ("X") event and every counter update a counter ("C") event. The
+trace can be opened in ``chrome://tracing`` or https://ui.perfetto.dev.
+
+Example:
+    >>> from utils.profiling import profiler
+    >>> profiler.enable()
+    >>> with profiler.span("simulate", component="sustainability"):
+    ...     run()
+    >>> profiler.write("trace.json")
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional, Union
+
+from models.base_model import write_json
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Category of the events recorded by the simulation stages
+DEFAULT_CATEGORY = "simulation"
+
+_NULL_SPAN = nullcontext()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Return the peak resident set size of the process in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+class _Span:
+    """Context manager recording one complete event."""
+    
+    __slots__ = ("profiler", "name", "category", "args", "start")
+    
+    def __init__(self, profiler: "Profiler", name: str, category: str, args: Dict[str, Any]) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+    
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        end = time.perf_counter_ns()
+        self.profiler._record_span(self, end)
+
+
+class Profiler:
+    """Collects span timings, counters and peak memory of a run.
+    
+    Attributes:
+        enabled: Whether spans and counters are recorded
+        events: Recorded Chrome trace events
+        counters: Current value of every counter
+    """
+    
+    def __init__(self, enabled: bool = False) -> None:
+        """Initialize an empty profiler.
+        
+        Args:
+            enabled: Start recording immediately
+        """
+        self.enabled = enabled
+        self.events: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = defaultdict(float)
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+    
+    def enable(self) -> "Profiler":
+        """Clear previous recordings and start recording.
+        
+        Returns:
+            The profiler, for chaining
+        """
+        self.reset()
+        self.enabled = True
+        return self
+    
+    def disable(self) -> None:
+        """Stop recording, keeping what was recorded."""
+        self.enabled = False
+    
+    def reset(self) -> None:
+        """Drop every recorded event and counter."""
+        with self._lock:
+            self.events = []
+            self.counters = defaultdict(float)
+            self._origin = time.perf_counter_ns()
+    
+    def _timestamp(self, ns: int) -> float:
+        """Microseconds since the profiler was reset."""
+        return (ns - self._origin) / 1000
+    
+    def span(self, name: str, category: str = DEFAULT_CATEGORY, **args: Any) -> ContextManager[Any]:
+        """Time a block of code.
+        
+        Args:
+            name: Span name shown in the trace
+            category: Event category
+            **args: Values attached to the event
+        
+        Returns:
+            A context manager (a shared no-op while disabled)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+    
+    def _record_span(self, span: _Span, end: int) -> None:
+        args = dict(span.args)
+        memory = peak_rss_mb()
+        if memory is not None:
+            args["peak_rss_mb"] = round(memory, 1)
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": self._timestamp(span.start),
+            "dur": (end - span.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+            if memory is not None:
+                self.events.append(self._counter_event("peak_rss_mb", {"MB": round(memory, 1)}, end))
+    
+    def _counter_event(self, name: str, values: Dict[str, float], ns: int) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "cat": DEFAULT_CATEGORY,
+            "ph": "C",
+            "ts": self._timestamp(ns),
+            "pid": os.getpid(),
+            "args": values,
+        }
+    
+    def count(self, name: str, value: float = 1) -> None:
+        """Add to a counter.
+        
+        Args:
+            name: Counter name
+            value: Amount added
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        with self._lock:
+            self.counters[name] += value
+            self.events.append(self._counter_event(name, {name: self.counters[name]}, now))
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Aggregate the recorded spans by name.
+        
+        Returns:
+            Mapping of span name to its number of calls and total and
+            maximum duration in milliseconds, in order of first occurrence
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for event in sorted(self.events, key=lambda event: event["ts"]):
+            if event["ph"] != "X":
+                continue
+            stats = totals.setdefault(event["name"], {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            duration = event["dur"] / 1000
+            stats["calls"] += 1
+            stats["total_ms"] += duration
+            stats["max_ms"] = max(stats["max_ms"], duration)
+        return totals
+    
+    def to_trace(self) -> Dict[str, Any]:
+        """Return the recordings in Chrome trace-event format."""
+        return {
+            "traceEvents": list(self.events),
+            "displayTimeUnit": "ms",
+            "otherData": {"counters": dict(self.counters)},
+        }
+    
+    def write(self, path: Union[str, Path]) -> Path:
+        """Write the trace to a JSON file.
+        
+        Args:
+            path: Output file
+        
+        Returns:
+            Path of the written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return write_json(self.to_trace(), path)
+
+
+# Process-wide profiler used by the simulation stages
+profiler = Profiler()
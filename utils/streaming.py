@@ -0,0 +1,319 @@
+"""Mergeable online aggregators for ensemble summaries.
+
+Every aggregator summarizes a stream of batches of shape [n, *cells] (for
+ensembles: replicates x years) in memory proportional to the number of
+cells, whatever the number of samples. Aggregators are plain NumPy state,
+so partial aggregates computed in worker processes can be pickled back and
+combined with ``merge``.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Compression of the quantile digests (about compression / 2 centroids per cell)
+DEFAULT_COMPRESSION = 500
+
+
+class RunningMoments:
+    """Streaming count, mean, variance, minimum and maximum per cell.
+    
+    Batches are folded in with the pairwise update of Chan et al., which is
+    numerically stable and also merges two partial aggregates exactly.
+    """
+    
+    def __init__(self, shape: Tuple[int, ...] = ()) -> None:
+        """Initialize an empty aggregate.
+        
+        Args:
+            shape: Shape of the cells (e.g. ``(n_years,)``)
+        """
+        self.shape = tuple(shape)
+        self.count = 0
+        self.mean = np.zeros(self.shape)
+        self.m2 = np.zeros(self.shape)
+        self.min = np.full(self.shape, np.inf)
+        self.max = np.full(self.shape, -np.inf)
+    
+    def update(self, batch: np.ndarray) -> "RunningMoments":
+        """Add a batch of samples of shape [n, *shape].
+        
+        Returns:
+            The aggregate, for chaining
+        """
+        batch = np.asarray(batch, dtype=np.float64)
+        if len(batch) == 0:
+            return self
+        other = RunningMoments(self.shape)
+        other.count = len(batch)
+        other.mean = batch.mean(axis=0)
+        other.m2 = ((batch - other.mean) ** 2).sum(axis=0)
+        other.min = batch.min(axis=0)
+        other.max = batch.max(axis=0)
+        return self.merge(other)
+    
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Fold another aggregate of the same shape into this one.
+        
+        Returns:
+            The aggregate, for chaining
+        """
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / total)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.count = total
+        return self
+    
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance (NaN with fewer than two samples)."""
+        if self.count < 2:
+            return np.full(self.shape, np.nan)
+        return self.m2 / (self.count - 1)
+    
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+
+class QuantileDigest:
+    """Mergeable t-digest quantile sketch, one digest per cell.
+    
+    Each cell keeps at most ``compression / 2 + 1`` centroids (weight and
+    mean). Centroids are assigned to buckets of the arcsine scale function
+    k(q) = compression / (2 pi) * asin(2q - 1), which makes centroids small
+    near the tails, so extreme percentiles stay accurate. Updates and merges
+    sort the centroids of all cells at once and pool each bucket with a
+    single ``bincount``.
+    """
+    
+    def __init__(self, shape: Tuple[int, ...] = (), compression: int = DEFAULT_COMPRESSION) -> None:
+        """Initialize empty digests.
+        
+        Args:
+            shape: Shape of the cells (e.g. ``(n_years,)``)
+            compression: Accuracy parameter; memory per cell grows linearly
+        """
+        self.shape = tuple(shape)
+        self.compression = compression
+        self.n_buckets = compression // 2 + 1
+        cells = int(np.prod(self.shape, dtype=np.int64))
+        self.weights = np.zeros((cells, 0))
+        self.means = np.zeros((cells, 0))
+        self.min = np.full(cells, np.inf)
+        self.max = np.full(cells, -np.inf)
+    
+    @property
+    def count(self) -> float:
+        """Number of samples in each cell."""
+        return float(self.weights[0].sum()) if len(self.weights) else 0.0
+    
+    def update(self, batch: np.ndarray) -> "QuantileDigest":
+        """Add a batch of samples of shape [n, *shape].
+        
+        The batch is sorted and pooled into centroids on its own (all cells
+        share the bucket boundaries, since every sample weighs one), then
+        merged with the current centroids.
+        
+        Returns:
+            The digests, for chaining
+        """
+        batch = np.asarray(batch, dtype=np.float64)
+        n = len(batch)
+        if n == 0:
+            return self
+        values = np.sort(batch.reshape(n, -1).T, axis=1)
+        buckets = self._buckets((np.arange(n) + 0.5) / n)
+        starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+        weights = np.diff(np.append(starts, n)).astype(np.float64)
+        means = np.add.reduceat(values, starts, axis=1) / weights
+        self._compress(
+            np.concatenate([self.weights, np.broadcast_to(weights, means.shape)], axis=1),
+            np.concatenate([self.means, means], axis=1)
+        )
+        self.min = np.minimum(self.min, values[:, 0])
+        self.max = np.maximum(self.max, values[:, -1])
+        return self
+    
+    def add(self, values: np.ndarray, weight: float) -> "QuantileDigest":
+        """Add ``weight`` samples of the same value to every cell.
+        
+        Args:
+            values: Value of every cell, of shape ``shape`` (or broadcastable)
+            weight: Number of samples
+        
+        Returns:
+            The digests, for chaining
+        """
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), self.shape).reshape(-1, 1)
+        self._compress(
+            np.concatenate([self.weights, np.full(values.shape, float(weight))], axis=1),
+            np.concatenate([self.means, values], axis=1)
+        )
+        self.min = np.minimum(self.min, values[:, 0])
+        self.max = np.maximum(self.max, values[:, 0])
+        return self
+    
+    def merge(self, other: "QuantileDigest") -> "QuantileDigest":
+        """Fold other digests of the same shape into these.
+        
+        Returns:
+            The digests, for chaining
+        """
+        self._compress(
+            np.concatenate([self.weights, other.weights], axis=1),
+            np.concatenate([self.means, other.means], axis=1)
+        )
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+    
+    def _buckets(self, q: np.ndarray) -> np.ndarray:
+        """Bucket of the scale function k(q) that quantiles fall into."""
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        return np.clip(np.floor(k + self.compression / 4), 0, self.n_buckets - 1).astype(np.int64)
+    
+    def _compress(self, weights: np.ndarray, means: np.ndarray) -> None:
+        """Pool sorted centroids that fall into the same scale-function bucket."""
+        cells = len(weights)
+        order = np.argsort(means, axis=1, kind="stable")
+        weights = np.take_along_axis(weights, order, axis=1)
+        means = np.take_along_axis(means, order, axis=1)
+        
+        # Quantile at the middle of each centroid
+        totals = weights.sum(axis=1, keepdims=True)
+        q = (np.cumsum(weights, axis=1) - weights / 2) / np.where(totals > 0, totals, 1)
+        index = (self._buckets(q) + np.arange(cells)[:, np.newaxis] * self.n_buckets).ravel()
+        
+        size = cells * self.n_buckets
+        pooled = np.bincount(index, weights=weights.ravel(), minlength=size).reshape(cells, -1)
+        sums = np.bincount(index, weights=(weights * means).ravel(), minlength=size).reshape(cells, -1)
+        self.weights = pooled
+        self.means = np.divide(sums, pooled, out=np.zeros_like(sums), where=pooled > 0)
+    
+    def quantile(self, q: Sequence[float]) -> np.ndarray:
+        """Estimate quantiles of every cell.
+        
+        Centroid means are placed at the middle of their cumulative weight
+        and interpolated linearly, with the exact minimum and maximum as
+        end points.
+        
+        Args:
+            q: Quantiles in the range 0-1
+        
+        Returns:
+            Array of shape [len(q), *shape] (NaN for empty digests)
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        result = np.full((len(q), len(self.weights)), np.nan)
+        for cell, (weights, means) in enumerate(zip(self.weights, self.means)):
+            present = weights > 0
+            if not present.any():
+                continue
+            weights, means = weights[present], means[present]
+            total = weights.sum()
+            centers = np.cumsum(weights) - weights / 2
+            positions = np.concatenate([[0.0], centers, [total]])
+            values = np.concatenate([[self.min[cell]], means, [self.max[cell]]])
+            result[:, cell] = np.interp(q * total, positions, values)
+        return result.reshape((len(q),) + self.shape)
+
+
+class StreamingBands:
+    """Streaming mean, spread and percentile bands of named ensemble metrics.
+    
+    Example:
+        >>> bands = StreamingBands(n_years=16)
+        >>> for start in range(0, n, chunk):
+        ...     bands.update({"score": draws[start:start + chunk]})  # [chunk, year]
+        >>> bands.bands((5, 50, 95))["score"]["p95"]
+    """
+    
+    def __init__(self, n_years: int, compression: int = DEFAULT_COMPRESSION) -> None:
+        """Initialize empty aggregates.
+        
+        Args:
+            n_years: Number of yearly cells of every metric
+            compression: Compression of the quantile digests
+        """
+        self.n_years = n_years
+        self.compression = compression
+        self.moments: Dict[str, RunningMoments] = {}
+        self.digests: Dict[str, QuantileDigest] = {}
+    
+    @property
+    def count(self) -> int:
+        """Number of replicates aggregated."""
+        return next(iter(self.moments.values())).count if self.moments else 0
+    
+    def update(self, samples: Dict[str, Any]) -> "StreamingBands":
+        """Add a batch of replicates.
+        
+        Args:
+            samples: Mapping of metric name to draws of shape [n, n_years]
+                (or scalars, broadcast to every replicate and year)
+        
+        Returns:
+            The aggregate, for chaining
+        """
+        n = max((np.shape(values)[0] for values in samples.values() if np.ndim(values) == 2), default=1)
+        for name, values in samples.items():
+            if name not in self.moments:
+                self.moments[name] = RunningMoments((self.n_years,))
+                self.digests[name] = QuantileDigest((self.n_years,), self.compression)
+            self.moments[name].update(np.broadcast_to(values, (n, self.n_years)))
+            if np.ndim(values) == 2:
+                self.digests[name].update(values)
+            else:
+                # Identical in every replicate: a single centroid per year
+                self.digests[name].add(values, n)
+        return self
+    
+    def merge(self, other: "StreamingBands") -> "StreamingBands":
+        """Fold the aggregates of another stream (e.g. a worker's) into this one.
+        
+        Returns:
+            The aggregate, for chaining
+        """
+        for name, moments in other.moments.items():
+            if name not in self.moments:
+                self.moments[name] = RunningMoments((self.n_years,))
+                self.digests[name] = QuantileDigest((self.n_years,), self.compression)
+            self.moments[name].merge(moments)
+            self.digests[name].merge(other.digests[name])
+        return self
+    
+    def bands(
+        self,
+        percentiles: Sequence[float],
+        names: Optional[Sequence[str]] = None
+    ) -> Dict[str, Dict[str, list]]:
+        """Summarize every metric like ``simulation.runner.percentile_bands``.
+        
+        Args:
+            percentiles: Percentiles to report, in the range 0-100
+            names: Metrics to summarize (defaults to all)
+        
+        Returns:
+            Mapping of metric name to its yearly ``mean``, ``std``, ``min``,
+            ``max`` and one ``p<q>`` entry per percentile
+        """
+        result = {}
+        for name in (self.moments if names is None else names):
+            moments = self.moments[name]
+            bands = {
+                "mean": moments.mean.tolist(),
+                "std": moments.std.tolist(),
+                "min": moments.min.tolist(),
+                "max": moments.max.tolist(),
+            }
+            quantiles = self.digests[name].quantile(np.asarray(percentiles, dtype=np.float64) / 100)
+            for q, values in zip(percentiles, quantiles):
+                bands[f"p{q:g}"] = values.tolist()
+            result[name] = bands
+        return result